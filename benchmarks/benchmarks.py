@@ -0,0 +1,205 @@
+# benchmarks of gamba's key entry points at several data scales
+
+# the classes below follow airspeed velocity's conventions (https://asv.readthedocs.io), so they can be run
+# with 'asv run', or without any extra dependencies using 'python benchmarks/run.py' (see that file for details)
+
+# all data is generated by gamba.data.generate_transactions, so the benchmarks run offline
+
+import os, tempfile, importlib.util
+import numpy as np
+
+import gamba.data as gd
+import gamba.measures as gm
+import gamba.tests as gt
+import gamba.machine_learning as gml
+
+
+# the number of bets and players at each scale
+transaction_scales = {
+    "1e3_bets_1e2_players": (10 ** 3, 10 ** 2),
+    "1e5_bets_1e3_players": (10 ** 5, 10 ** 3),
+    "1e6_bets_1e4_players": (10 ** 6, 10 ** 4),
+    "1e7_bets_1e5_players": (10 ** 7, 10 ** 5),
+    "1e7_bets_1e6_players": (10 ** 7, 10 ** 6),
+}
+
+# the number of players in the measures tables used by the statistical tests
+player_scales = {
+    "1e2_players": 10 ** 2,
+    "1e4_players": 10 ** 4,
+    "1e6_players": 10 ** 6,
+}
+
+# silhouette scores compare every pair of players, so clustering is only benchmarked on smaller cohorts
+clustering_scales = {
+    "1e2_players": 10 ** 2,
+    "1e3_players": 10 ** 3,
+    "1e4_players": 10 ** 4,
+}
+
+_transactions = {}
+_files = {}
+
+
+def transactions(scale, daily=True):
+    """
+    The generated transactions for a scale, created once per process (with a fixed seed, so every run uses the same bets).
+    Players bet on half of the days of their careers, five times on average, with careers long enough to reach the scale's number of bets.
+    Only the most recent scale is kept, as the largest scales take several GB of memory between them.
+    """
+    if (scale, daily) not in _transactions:
+        _transactions.clear()
+        bets, players = transaction_scales[scale]
+        bets_per_player = bets / players
+        _transactions[(scale, daily)] = gd.generate_transactions(
+            players=players,
+            career_length=max(2 * bets_per_player / 5, 1),
+            active_probability=0.5,
+            bets_per_day=5,
+            daily=daily,
+            random_state=0,
+            chunksize=100000,
+        )
+    return _transactions[(scale, daily)]
+
+
+def transaction_files(scale):
+    """
+    The generated transactions for a scale saved as a CSV file, a partitioned store (if pyarrow is installed), and a binary store.
+    """
+    if scale not in _files:
+        _files.clear()
+        directory = tempfile.mkdtemp(prefix="gamba_benchmark_")
+        bets = transactions(scale)
+        files = {"csv": os.path.join(directory, "transactions.csv")}
+        bets.to_csv(files["csv"], index=False)
+        if importlib.util.find_spec("pyarrow") is not None:
+            files["store"] = os.path.join(directory, "store")
+            gd.save_store(bets, files["store"])
+        files["binary"] = os.path.join(directory, "binary")
+        gd.save_binary_store(bets, files["binary"])
+        _files[scale] = files
+    return _files[scale]
+
+
+def measures_table(players):
+    """
+    A dummy measures table with a label marking the top 10% of players by each measure.
+    """
+    np.random.seed(0)
+    table = gd.dummy_measures_table(players)
+    for measure in ["duration", "frequency", "total_wagered", "num_bets"]:
+        table["top_" + measure] = (table[measure] >= table[measure].quantile(0.9)).astype(int)
+    return table
+
+
+class DataLoading:
+    params = list(transaction_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.files = transaction_files(scale)
+
+    def time_read_csv(self, scale):
+        gd.read_csv(self.files["csv"], parse_dates=["bet_time"])
+
+    def peakmem_read_csv(self, scale):
+        gd.read_csv(self.files["csv"], parse_dates=["bet_time"])
+
+    def time_read_csv_compact(self, scale):
+        gd.compact_transactions(gd.read_csv(self.files["csv"], parse_dates=["bet_time"]), loud=False)
+
+    def time_open_store(self, scale):
+        gd.open_store(self.files["binary"]).player_index
+
+
+class StoreLoading:
+    params = list(transaction_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.files = transaction_files(scale)
+        # asv skips a benchmark when its setup raises NotImplementedError
+        if "store" not in self.files:
+            raise NotImplementedError("pyarrow is not installed")
+
+    def time_load_store(self, scale):
+        gd.load_store(self.files["store"], as_table=True)
+
+
+class LabrieMeasures:
+    params = list(transaction_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.bets = transactions(scale)
+        self.table = gd.TransactionTable(self.bets)
+        self.savedir = tempfile.mkdtemp(prefix="gamba_benchmark_") + "/"
+
+    def time_calculate_labrie_measures(self, scale):
+        gm.calculate_labrie_measures(self.bets, savedir=self.savedir)
+
+    def peakmem_calculate_labrie_measures(self, scale):
+        gm.calculate_labrie_measures(self.bets, savedir=self.savedir)
+
+    def time_calculate_labrie_measures_table(self, scale):
+        gm.calculate_labrie_measures(self.table, savedir=self.savedir)
+
+
+class BravermanMeasures:
+    params = list(transaction_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.bets = transactions(scale)
+        self.table = gd.TransactionTable(self.bets)
+        self.savedir = tempfile.mkdtemp(prefix="gamba_benchmark_") + "/"
+
+    def time_calculate_braverman_measures(self, scale):
+        gm.calculate_braverman_measures(self.bets, savedir=self.savedir)
+
+    def peakmem_calculate_braverman_measures(self, scale):
+        gm.calculate_braverman_measures(self.bets, savedir=self.savedir)
+
+    def time_calculate_braverman_measures_table(self, scale):
+        gm.calculate_braverman_measures(self.table, savedir=self.savedir)
+
+
+class StatisticalTests:
+    params = list(player_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.measures_table = measures_table(player_scales[scale])
+
+    def time_spearmans_r(self, scale):
+        gt.spearmans_r(self.measures_table[["player_ids", "duration", "frequency", "total_wagered", "num_bets"]])
+
+    def peakmem_spearmans_r(self, scale):
+        gt.spearmans_r(self.measures_table[["player_ids", "duration", "frequency", "total_wagered", "num_bets"]])
+
+    def time_label_overlap_table(self, scale):
+        gt.label_overlap_table(self.measures_table, ["top_duration", "top_frequency", "top_total_wagered"])
+
+    def peakmem_label_overlap_table(self, scale):
+        gt.label_overlap_table(self.measures_table, ["top_duration", "top_frequency", "top_total_wagered"])
+
+
+class Clustering:
+    params = list(clustering_scales)
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.measures_table = measures_table(clustering_scales[scale])[["player_ids", "duration", "frequency", "total_wagered", "num_bets"]]
+
+    def time_k_means_ensemble(self, scale):
+        gml.k_means_ensemble(self.measures_table, ensemble_size=5, max_clusters=6)
+
+    def peakmem_k_means_ensemble(self, scale):
+        gml.k_means_ensemble(self.measures_table, ensemble_size=5, max_clusters=6)
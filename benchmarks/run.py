@@ -0,0 +1,189 @@
+# runs the benchmarks in benchmarks.py without airspeed velocity, comparing the results to a stored baseline
+
+# usage:
+#   python benchmarks/run.py                      run the benchmarks up to 10^6 bets and compare them to baseline.json
+#   python benchmarks/run.py --scales all         include the 10^7 bet scales (slow, needs several GB of memory)
+#   python benchmarks/run.py --filter Labrie      only run benchmarks whose name contains 'Labrie'
+#   python benchmarks/run.py --save-baseline      store the results as the new baseline
+#
+# times are the fastest of several runs (in seconds), and peak memory is the most memory allocated
+# during a single run as traced by tracemalloc (in megabytes), so results are comparable between runs on
+# the same machine - a baseline recorded on another machine is only a rough guide
+
+import argparse, datetime, inspect, json, os, platform, sys, time, tracemalloc
+
+# the repository (for gamba) and then this directory (for benchmarks.py) are searched first
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np, pandas as pd
+import benchmarks
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# the scales run unless '--scales all' is given
+default_scales = [
+    "1e3_bets_1e2_players",
+    "1e5_bets_1e3_players",
+    "1e6_bets_1e4_players",
+    "1e2_players",
+    "1e3_players",
+    "1e4_players",
+    "1e6_players",
+]
+
+
+def time_benchmark(method, scale, repeat, max_time):
+    """
+    The fastest of up to repeat runs of a benchmark, stopping early once the runs have taken max_time seconds.
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat and (len(times) == 0 or time.perf_counter() - started < max_time):
+        start = time.perf_counter()
+        method(scale)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory_benchmark(method, scale):
+    """
+    The most memory allocated at once during a run of a benchmark, in megabytes.
+    """
+    tracemalloc.start()
+    try:
+        method(scale)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def run_benchmarks(scales, name_filter=None, repeat=5, max_time=10):
+    """
+    Runs every benchmark class in benchmarks.py at each of the given scales, returning a dictionary of results keyed by 'Class.method[scale]'.
+    """
+    results = {}
+    for class_name, benchmark_class in inspect.getmembers(benchmarks, inspect.isclass):
+        if benchmark_class.__module__ != benchmarks.__name__:
+            continue
+        for scale in benchmark_class.params:
+            if scale not in scales:
+                continue
+            names = [
+                name
+                for name in dir(benchmark_class)
+                if name.startswith(("time_", "peakmem_"))
+                and (name_filter is None or name_filter in class_name + "." + name)
+            ]
+            if not names:
+                continue
+
+            benchmark = benchmark_class()
+            try:
+                benchmark.setup(scale)
+            except NotImplementedError as skipped:
+                print("skipped", class_name + "[" + scale + "]:", skipped)
+                continue
+            for name in names:
+                key = class_name + "." + name + "[" + scale + "]"
+                method = getattr(benchmark, name)
+                try:
+                    if name.startswith("time_"):
+                        results[key] = {"time": time_benchmark(method, scale, repeat, max_time)}
+                    else:
+                        results[key] = {"peak_memory": peak_memory_benchmark(method, scale)}
+                except NotImplementedError as skipped:
+                    print("skipped", key + ":", skipped)
+                    continue
+                print(key, _describe(results[key]))
+            # free the benchmark's data before the next scale is set up
+            del benchmark
+    return results
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Compares results to a baseline, returning the keys of benchmarks which got slower or used more memory by more than the tolerance (a fraction).
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        for measurement, value in result.items():
+            baseline_value = baseline[key].get(measurement)
+            if not baseline_value:
+                continue
+            ratio = value / baseline_value
+            if ratio > 1 + tolerance:
+                regressions.append(key)
+                print("REGRESSION", key, measurement, _describe({measurement: baseline_value}), "->", _describe({measurement: value}), "({:.2f}x)".format(ratio))
+            elif ratio < 1 / (1 + tolerance):
+                print("improved  ", key, measurement, _describe({measurement: baseline_value}), "->", _describe({measurement: value}), "({:.2f}x)".format(ratio))
+    return regressions
+
+
+def _describe(result):
+    if "time" in result:
+        return "{:.4f}s".format(result["time"])
+    return "{:.1f}MB".format(result["peak_memory"])
+
+
+def _machine():
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run gamba's benchmarks and compare them to a stored baseline.")
+    parser.add_argument("--scales", nargs="+", default=default_scales, help="the scales to run, or 'all'")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of times to run each timing benchmark")
+    parser.add_argument("--baseline", default=default_baseline, help="the baseline file to compare with (or save to)")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="the fraction a result can grow by before it is a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--output", default=None, help="a file to save the results to")
+    arguments = parser.parse_args()
+
+    scales = arguments.scales
+    if scales == ["all"]:
+        scales = list(benchmarks.transaction_scales) + list(benchmarks.player_scales) + list(benchmarks.clustering_scales)
+
+    results = run_benchmarks(scales, arguments.filter, arguments.repeat)
+    report = {"machine": _machine(), "results": results}
+
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=1, sort_keys=True)
+
+    if arguments.save_baseline:
+        baseline = {"machine": report["machine"], "results": {}}
+        if os.path.exists(arguments.baseline):
+            with open(arguments.baseline) as baseline_file:
+                baseline["results"] = json.load(baseline_file)["results"]
+        baseline["results"].update(results)
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=1, sort_keys=True)
+        print("baseline saved to", arguments.baseline)
+        return 0
+
+    if not os.path.exists(arguments.baseline):
+        print("no baseline found at", arguments.baseline)
+        return 0
+
+    with open(arguments.baseline) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    regressions = compare_results(results, baseline, arguments.tolerance)
+    print(len(regressions), "regressions found")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,90 +4,160 @@
 # when adding features to modules, remember to update this file to allow
 # them to be accessed - also remember to check for name conflicts!
 
+# the modules are only imported the first time one of their methods is used, so
+# 'import gamba' stays fast and doesn't load pandas, scikit-learn, or matplotlib
+# until they are needed - nothing here should run code with side effects
+
+
+import importlib
 
 __version__ = "0.2.0"
 
-from gamba.data import (
-    prepare_labrie_data,
-    prepare_braverman_data,
-    prepare_philander_data,
-    split_individual_transactions,
-    load_directory,
-    read_csv,
-    concat,
-    summarise_app,
-    summarise_dgapp_providers,
-
-    plot_player_career,
-    plot_player_career_split,
-
-    visualise_provider_dates,
-)
-
-from gamba.measures import (
-    duration,
-    frequency,
-    number_of_bets,
-    average_bets_per_day,
-    average_bet_size,
-    total_wagered,
-    net_loss,
-    percent_loss,
-    number_of_bets_daily,
-    average_bets_per_day_daily,
-    average_bet_size_daily,
-    intensity_daily,
-    frequency_daily,
-    variability_daily,
-    check_measure_data,
-    standardise_measures_table,
-    split_measures_table,
-
-    calculate_labrie_measures, 
-    calculate_braverman_measures,
-
-    plot_measure_hist,
-    plot_measure_centile,
-    plot_measure_pair_plot,
-    plot_player_radar,
-)
-
-from gamba.labels import (
-    top_split, 
-    get_labelled_groups
-)
-
-from gamba.tests import (
-    descriptive_table,
-    ks_test,
-    cohens_d,
-    spearmans_r,
-    label_overlap_table,
-    calculate_walker_matrix,
-    add_tables,
-)
-
-from gamba.machine_learning import (
-    k_means,
-    k_means_range,
-    k_means_ensemble,
-
-    agglomerative_cluster,
-    describe_clusters,
-
-    logistic_regression,
-    lasso_logistic_regression,
-
-    svm_eps_regression,
-    svm_c_classification,
-    svm_one_classification,
-
-    rf_regression,
-    rf_classification,
-
-    plot_agglomeration_dendrogram,
-    plot_cluster_sizes,
-    
-)
-
-print("gamba ready.")
+_module_names = {
+    "gamba.data": (
+        "prepare_labrie_data",
+        "prepare_braverman_data",
+        "prepare_philander_data",
+        "split_individual_transactions",
+        "load_directory",
+        "save_store",
+        "load_store",
+        "save_binary_store",
+        "open_store",
+        "convert_store",
+        "save_transaction_chunks",
+        "read_csv",
+        "concat",
+        "compact_transactions",
+        "generate_transactions",
+        "summarise_app",
+        "summarise_dgapp_providers",
+        "TransactionTable",
+        "PlayerIndex",
+
+        "plot_player_career",
+        "plot_player_career_split",
+
+        "visualise_provider_dates",
+    ),
+
+    "gamba.measures": (
+        "duration",
+        "frequency",
+        "duration_batch",
+        "frequency_batch",
+        "number_of_bets",
+        "average_bets_per_day",
+        "average_bet_size",
+        "total_wagered",
+        "net_loss",
+        "percent_loss",
+        "number_of_bets_daily",
+        "average_bets_per_day_daily",
+        "average_bet_size_daily",
+        "intensity_daily",
+        "frequency_daily",
+        "variability_daily",
+        "trajectory_daily",
+        "trajectory_daily_batch",
+        "calculate_first_window_measures",
+        "check_measure_data",
+        "standardise_measures_table",
+        "split_measures_table",
+        "register_measure",
+        "calculate_measures",
+        "measure_centiles",
+
+        "calculate_labrie_measures",
+        "labrie_measure_names",
+        "calculate_braverman_measures",
+        "braverman_measure_names",
+        "MeasureAccumulator",
+        "calculate_labrie_measures_chunked",
+
+        "plot_measure_hist",
+        "plot_measure_centile",
+        "plot_measure_pair_plot",
+        "plot_player_radar",
+    ),
+
+    "gamba.cache": (
+        "clear_cache",
+    ),
+
+    "gamba.profiling": (
+        "profile",
+    ),
+
+    "gamba.reporting": (
+        "set_reporter",
+        "report_to",
+    ),
+
+    "gamba.labels": (
+        "top_split",
+        "get_labelled_groups",
+    ),
+
+    "gamba.tests": (
+        "descriptive_table",
+        "ks_test",
+        "cohens_d",
+        "spearmans_r",
+        "label_overlap_table",
+        "calculate_walker_matrix",
+        "add_tables",
+    ),
+
+    "gamba.machine_learning": (
+        "k_means",
+        "k_means_range",
+        "k_means_ensemble",
+
+        "agglomerative_cluster",
+        "describe_clusters",
+        "linkage_matrix",
+
+        "logistic_regression",
+        "lasso_logistic_regression",
+
+        "svm_eps_regression",
+        "svm_c_classification",
+        "svm_one_classification",
+
+        "rf_regression",
+        "rf_classification",
+
+        "plot_agglomeration_dendrogram",
+        "plot_cluster_sizes",
+    ),
+}
+
+# the module each top level name is found in
+_lazy_names = {
+    name: module_name
+    for module_name, names in _module_names.items()
+    for name in names
+}
+
+# the plotting module's methods share names with the methods which call them, so it is only available as gb.plotting
+_submodules = [module_name.split(".")[1] for module_name in _module_names] + ["plotting"]
+
+__all__ = list(_lazy_names)
+
+
+def __getattr__(name):
+    if name in _lazy_names:
+        value = getattr(importlib.import_module(_lazy_names[name]), name)
+    elif name in _submodules:
+        value = importlib.import_module("gamba." + name)
+    else:
+        raise AttributeError("module 'gamba' has no attribute '" + name + "'")
+
+    # store the value so the module is only looked up once
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_submodules))
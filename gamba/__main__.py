@@ -0,0 +1,6 @@
+# allows the command line to be run as 'python -m gamba', see gamba.cli
+import sys
+
+from gamba.cli import main
+
+sys.exit(main())
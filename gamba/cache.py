@@ -0,0 +1,159 @@
+# measures table caching module
+
+# this module stores computed measures tables on disk, keyed by a fingerprint
+# of the bets and the measures requested, so repeated runs can skip the calculation
+
+# dependencies
+import hashlib, os, glob, weakref, pandas as pd, numpy as np
+from gamba.data import TransactionTable
+
+# the directory used when caching is turned on without naming one
+default_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "gamba")
+
+# the total size of the cache in megabytes, least recently used tables are removed beyond this
+max_cache_size = 1024
+
+# transaction tables don't change, so each one only needs to be fingerprinted once
+_table_fingerprints = weakref.WeakKeyDictionary()
+
+
+def fingerprint(all_player_bets):
+	"""
+	Creates a fingerprint of a collection of bets by hashing every value in every column (and the column names and types).
+	Any change to the bets gives a different fingerprint.
+	The fingerprint of a :class:`gamba.data.TransactionTable` is only calculated once, so repeated cached calculations on the same table return almost immediately.
+
+	Args:
+		all_player_bets (Dataframe or TransactionTable): All of the bets made by all of the players in the data set.
+
+	Returns:
+		String of hexadecimal digits.
+
+	"""
+	if isinstance(all_player_bets, TransactionTable) and all_player_bets in _table_fingerprints:
+		return _table_fingerprints[all_player_bets]
+
+	digest = hashlib.blake2b(digest_size=20)
+	for column in all_player_bets.columns:
+		values = all_player_bets[column]
+		digest.update(str(column).encode())
+		digest.update(str(values.dtype).encode())
+		if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+			# numbers and times can be hashed directly from memory, which is much faster than hashing each value
+			digest.update(np.ascontiguousarray(values).view(np.uint8))
+		else:
+			digest.update(pd.util.hash_array(np.asarray(values)).view(np.uint8))
+
+	if isinstance(all_player_bets, TransactionTable):
+		_table_fingerprints[all_player_bets] = digest.hexdigest()
+	return digest.hexdigest()
+
+
+def cache_key(bets_fingerprint, definitions, parameters):
+	"""
+	Combines the fingerprint of a collection of bets with the definitions of the measures calculated from them and any other parameters into a single key.
+
+	Args:
+		bets_fingerprint (String): The fingerprint of the bets, see :meth:`fingerprint`.
+		definitions (Dictionary): The column names of the measures table mapped to a description of how each is calculated.
+		parameters (Dictionary): Any other values which change the measures table.
+
+	Returns:
+		String of hexadecimal digits.
+
+	"""
+	digest = hashlib.blake2b(digest_size=20)
+	digest.update(bets_fingerprint.encode())
+	digest.update(repr(sorted(definitions.items())).encode())
+	digest.update(repr(sorted(parameters.items())).encode())
+	return digest.hexdigest()
+
+
+def _cache_file(key, cache_dir):
+	return os.path.join(cache_dir, key + ".pkl")
+
+
+def load(key, cache_dir=None):
+	"""
+	Loads a cached measures table, marking it as recently used.
+
+	Args:
+		key (String): The table's key, see :meth:`cache_key`.
+		cache_dir (String): The directory containing the cache, default is '~/.cache/gamba'.
+
+	Returns:
+		The cached dataframe, or None if it isn't in the cache.
+
+	"""
+	filename = _cache_file(key, cache_dir or default_cache_dir)
+	if not os.path.exists(filename):
+		return None
+
+	os.utime(filename)
+	return pd.read_pickle(filename)
+
+
+def store(key, measures_table, cache_dir=None, max_size=None):
+	"""
+	Saves a measures table in the cache, then removes the least recently used tables until the cache is within its size limit.
+
+	Args:
+		key (String): The table's key, see :meth:`cache_key`.
+		measures_table (Dataframe): The measures table to save.
+		cache_dir (String): The directory containing the cache, default is '~/.cache/gamba'.
+		max_size (Integer): The maximum size of the cache in megabytes, default is the module's max_cache_size.
+
+	"""
+	cache_dir = cache_dir or default_cache_dir
+	os.makedirs(cache_dir, exist_ok=True)
+
+	filename = _cache_file(key, cache_dir)
+	# write to a temporary file first so that other processes never load half a table
+	temporary_filename = filename + "." + str(os.getpid()) + ".tmp"
+	measures_table.to_pickle(temporary_filename)
+	os.replace(temporary_filename, filename)
+
+	_evict(cache_dir, max_cache_size if max_size is None else max_size)
+
+
+def _evict(cache_dir, max_size):
+	"""
+	Removes the least recently used tables from a cache directory until its total size is within the limit (in megabytes).
+	"""
+	cached_files = []
+	for filename in glob.glob(os.path.join(cache_dir, "*.pkl")):
+		try:
+			file_stats = os.stat(filename)
+		except FileNotFoundError:
+			continue
+		cached_files.append((file_stats.st_mtime, file_stats.st_size, filename))
+
+	total_size = sum(size for _, size, _ in cached_files)
+	for _, size, filename in sorted(cached_files):
+		if total_size <= max_size * 1024 ** 2:
+			break
+		try:
+			os.remove(filename)
+		except FileNotFoundError:
+			pass
+		total_size -= size
+
+
+def clear_cache(cache_dir=None, key=None):
+	"""
+	Removes cached measures tables, either all of them or the single table with the given key.
+
+	Args:
+		cache_dir (String): The directory containing the cache, default is '~/.cache/gamba'.
+		key (String): The key of a single table to remove, default is None (remove every table).
+
+	"""
+	cache_dir = cache_dir or default_cache_dir
+	if key is not None:
+		filenames = [_cache_file(key, cache_dir)]
+	else:
+		filenames = glob.glob(os.path.join(cache_dir, "*.pkl"))
+
+	for filename in filenames:
+		if os.path.exists(filename):
+			os.remove(filename)
@@ -0,0 +1,311 @@
+# command line module
+
+# this module provides the 'gamba' command, which runs the steps of a study from start to finish
+# (loading, measures, labelling, and clustering) so batch jobs don't need their own scripts, e.g.
+#
+#   gamba measures --input RawDataSet2_DailyAggregation.txt --study labrie --workers 16 --out measures.parquet
+#   gamba prepare --input RawDataSet2_DailyAggregation.txt --study labrie --output-format binary --out labrie_binary/
+
+# dependencies
+import argparse, os, sys, tempfile
+
+# the other modules (and pandas, scikit-learn, etc.) are only imported by the commands which use them,
+# so 'gamba --help' and 'gamba prepare' start quickly
+import gamba.profiling, gamba.reporting
+
+
+studies = ["labrie", "braverman"]
+
+input_formats = ["auto", "raw", "csv", "directory", "store", "binary"]
+
+# the number of rows read at a time when converting raw data or large CSV files
+default_chunksize = 1000000
+
+
+def _input_format(path):
+	"""
+	Works out the format of an input from its name and contents, see :meth:`load_transactions`.
+	"""
+	if os.path.isdir(path):
+		if os.path.exists(os.path.join(path, "gamba_binary.json")):
+			return "binary"
+		if os.path.exists(os.path.join(path, "gamba_store.json")):
+			return "store"
+		return "directory"
+	if path.endswith(".csv"):
+		return "csv"
+	return "raw"
+
+
+def load_transactions(path, study, input_format="auto", year=2008, chunksize=None, workers=1, temporary_dir=None):
+	"""
+	Loads the transactions for a study as a :class:`gamba.data.TransactionTable`, from any of the formats gamba can read or write.
+	Raw data sets and large CSV files are streamed a chunk at a time into a temporary binary store (see :meth:`gamba.data.open_store`), so they never need to fit in memory.
+
+	Args:
+		path (String): The file or directory to load.
+		study (String): The study the data is from, 'labrie' or 'braverman', used to prepare raw data sets.
+		input_format (String): One of 'raw' (the study's original data file, see :meth:`gamba.data.prepare_labrie_data`), 'csv' (a single file of transactions), 'directory' (one CSV file per player), 'store' (see :meth:`gamba.data.save_store`), 'binary' (see :meth:`gamba.data.save_binary_store`), or 'auto' (work it out from the path), default is 'auto'.
+		year (Integer): The year of the LaBrie data set when preparing raw data, 2007 or 2008, default is 2008.
+		chunksize (Integer): The number of rows to read at a time from raw and CSV files, default is None (1000000 rows for raw data, and the whole file at once for CSV files).
+		workers (Integer): The number of processes reading files in a directory, default is 1.
+		temporary_dir (String): The directory to stream raw and CSV files into, which must exist until the table is no longer used, default is None (a new temporary directory).
+
+	Returns:
+		TransactionTable.
+
+	"""
+	import gamba.data
+
+	if input_format == "auto":
+		input_format = _input_format(path)
+	if input_format not in input_formats:
+		raise Exception("Input format '" + input_format + "' is not one of " + ", ".join(input_formats) + ".")
+
+	if input_format == "binary":
+		return gamba.data.open_store(path)
+	if input_format == "store":
+		return gamba.data.load_store(path, as_table=True)
+	if input_format == "directory":
+		return gamba.data.load_directory(os.path.join(path, ""), workers=workers, as_table=True)
+	if input_format == "csv" and chunksize is None:
+		return gamba.data.TransactionTable(gamba.data.read_csv(path, parse_dates=["bet_time"]))
+
+	if temporary_dir is None:
+		temporary_dir = tempfile.mkdtemp(prefix="gamba_")
+	binary_dir = os.path.join(temporary_dir, "transactions_binary")
+
+	if input_format == "csv":
+		import pandas as pd
+
+		chunks = pd.read_csv(path, parse_dates=["bet_time"], chunksize=chunksize)
+		gamba.data.save_transaction_chunks(chunks, binary_dir, "binary")
+	elif study == "labrie":
+		gamba.data.prepare_labrie_data(path, year=year, chunksize=chunksize or default_chunksize, output_format="binary", output=binary_dir)
+	elif study == "braverman":
+		gamba.data.prepare_braverman_data(path, chunksize=chunksize or default_chunksize, output_format="binary", output=binary_dir)
+	else:
+		raise Exception("Study '" + study + "' is not one of " + ", ".join(studies) + ".")
+
+	return gamba.data.open_store(binary_dir)
+
+
+def calculate_study_measures(table, study, workers=1, daily=True, window=30):
+	"""
+	Calculates a study's measures table (without saving it), see :meth:`gamba.measures.calculate_labrie_measures` and :meth:`gamba.measures.calculate_braverman_measures`.
+	"""
+	import gamba.measures
+
+	if study == "labrie":
+		measure_names = gamba.measures.labrie_measure_names(daily)
+		window = None
+	elif study == "braverman":
+		measure_names = gamba.measures.braverman_measure_names()
+	else:
+		raise Exception("Study '" + study + "' is not one of " + ", ".join(studies) + ".")
+	return gamba.measures.calculate_measures(table, measure_names, workers=workers, window=window)
+
+
+def save_table(table, filename, output_format="auto"):
+	"""
+	Saves a measures table as a CSV or Parquet file.
+
+	Args:
+		table (Dataframe): The table to save.
+		filename (String): The name of the file to save, e.g. 'measures.parquet'.
+		output_format (String): 'csv', 'parquet', or 'auto' (parquet if the filename ends in '.parquet', otherwise csv), default is 'auto'.
+
+	"""
+	if output_format == "auto":
+		output_format = "parquet" if filename.endswith(".parquet") else "csv"
+	if output_format == "parquet":
+		table.to_parquet(filename, index=False)
+	elif output_format == "csv":
+		table.to_csv(filename, index=False)
+	else:
+		raise Exception("Output format '" + output_format + "' is not one of 'csv', 'parquet', or 'auto'.")
+
+
+def cluster_players(measures_table, clusters):
+	"""
+	Finds the k-means cluster of each player in a measures table, see :meth:`gamba.machine_learning.k_means`.
+	The measures are standardised first so that no measure dominates the distances, and players missing a measure
+	(e.g. the variability of a player who only bet on one day) are left out of the clustering.
+
+	Args:
+		measures_table (Dataframe): A measures table, with the player_id in the first column.
+		clusters (Integer): The number of clusters to find.
+
+	Returns:
+		A nullable integer Series of each player's cluster, in the order of the measures table, which is missing for the players left out.
+
+	"""
+	# imported here (as names, so 'gamba' stays the package in this function) as they load scipy and scikit-learn
+	import pandas as pd
+	from gamba import machine_learning, measures
+
+	complete = measures_table.dropna()
+	if len(complete) < clusters:
+		raise Exception(str(len(complete)) + " players have every measure, fewer than the " + str(clusters) + " clusters.")
+
+	# a measure which is the same for every player standardises to NaN, and can't separate them anyway
+	standardised = measures.standardise_measures_table(complete).fillna(0)
+	clustered = machine_learning.k_means(standardised, clusters=clusters, data_only=True)
+
+	cluster = pd.Series(clustered["cluster"].values, index=complete.index, dtype="Int64")
+	return cluster.reindex(measures_table.index)
+
+
+def _top_split(value):
+	"""
+	Parses a --top argument, 'measure' or 'measure:percentile', into the measure and percentile (95 by default).
+	"""
+	measure, _, percentile = value.partition(":")
+	try:
+		return measure, float(percentile) if percentile else 95
+	except ValueError:
+		raise argparse.ArgumentTypeError("'" + value + "' is not a measure or measure:percentile")
+
+
+def run_measures(arguments):
+	"""
+	Runs the 'gamba measures' pipeline (load, measures, labels, clusters, write) with parsed command line arguments, returning the number of players in the measures table.
+	"""
+	with tempfile.TemporaryDirectory(prefix="gamba_", dir=arguments.temp_dir) as temporary_dir:
+		with gamba.profiling.stage("load"):
+			table = load_transactions(
+				arguments.input,
+				arguments.study,
+				input_format=arguments.input_format,
+				year=arguments.year,
+				chunksize=arguments.chunksize,
+				workers=arguments.workers,
+				temporary_dir=temporary_dir,
+			)
+		gamba.reporting.message("loaded", len(table), "bets made by", len(table.player_ids), "players")
+
+		with gamba.profiling.stage("measures"):
+			measures_table = calculate_study_measures(
+				table, arguments.study, workers=arguments.workers, daily=arguments.daily, window=arguments.window
+			)
+		# release the (possibly memory-mapped) bets before the temporary directory is removed
+		del table
+
+	measure_columns = list(measures_table.columns)
+
+	if arguments.top:
+		# imported here (as names, so 'gamba' stays the package in this function) as they load statsmodels and scikit-learn
+		from gamba import labels
+
+		with gamba.profiling.stage("labels"):
+			for measure, percentile in arguments.top:
+				measures_table = labels.top_split(measures_table, measure, percentile=percentile)
+
+	cluster_error = None
+	if arguments.clusters:
+		with gamba.profiling.stage("clusters"):
+			try:
+				measures_table["cluster"] = cluster_players(measures_table[measure_columns], arguments.clusters)
+			except Exception as error:
+				# the measures are still saved, as they can take much longer to calculate than to cluster
+				cluster_error = error
+
+	with gamba.profiling.stage("write"):
+		save_table(measures_table, arguments.out, arguments.output_format)
+	gamba.reporting.message("measures for", len(measures_table), "players saved to", arguments.out)
+
+	if cluster_error is not None:
+		raise Exception("measures saved to " + arguments.out + " without clusters, " + str(cluster_error))
+
+	return len(measures_table)
+
+
+def run_prepare(arguments):
+	"""
+	Runs the 'gamba prepare' command, converting a study's raw data set into transactions gamba can read, returning None.
+	"""
+	import gamba.data
+
+	chunksize = arguments.chunksize or default_chunksize
+	with gamba.profiling.stage("prepare"):
+		if arguments.study == "labrie":
+			gamba.data.prepare_labrie_data(
+				arguments.input, year=arguments.year, chunksize=chunksize, output_format=arguments.output_format, output=arguments.out
+			)
+		else:
+			gamba.data.prepare_braverman_data(arguments.input, chunksize=chunksize, output_format=arguments.output_format, output=arguments.out)
+	gamba.reporting.message("transactions saved to", arguments.out)
+
+
+def _parser():
+	"""
+	Creates the parser for the 'gamba' command's arguments, with a subcommand for each pipeline.
+	"""
+	parser = argparse.ArgumentParser(prog="gamba", description="Run gambling transaction analyses from the command line.")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	shared = argparse.ArgumentParser(add_help=False)
+	shared.add_argument("--input", required=True, help="the data to read, a file or directory")
+	shared.add_argument("--study", required=True, choices=studies, help="the study whose data and measures are used")
+	shared.add_argument("--year", type=int, default=2008, choices=[2007, 2008], help="the year of the LaBrie data set (default 2008)")
+	shared.add_argument("--chunksize", type=int, default=None, help="the number of rows read at a time from raw and CSV files (default 1000000 for raw data)")
+	shared.add_argument("--reporter", default="tqdm", help="where progress goes, 'tqdm', 'logging', 'null', or a .jsonl file (default tqdm)")
+	shared.add_argument("--profile", default=None, help="a JSON file to save the time (and memory) of every stage to")
+	shared.add_argument("--trace-memory", action="store_true", help="also record the peak memory of each stage (slower)")
+
+	measures = commands.add_parser("measures", parents=[shared], help="calculate a study's measures, then optionally label and cluster the players")
+	measures.add_argument("--input-format", default="auto", choices=input_formats, help="the format of the input (default auto)")
+	measures.add_argument("--out", required=True, help="the file to save the measures table to, e.g. measures.parquet")
+	measures.add_argument("--output-format", default="auto", choices=["auto", "csv", "parquet"], help="the format of the measures table (default: from the file name)")
+	measures.add_argument("--workers", type=int, default=1, help="the number of processes used to read files and calculate measures (default 1)")
+	measures.add_argument("--individual", dest="daily", action="store_false", help="the bets are individual transactions rather than daily aggregates (LaBrie only)")
+	measures.add_argument("--window", type=int, default=30, help="the length of the Braverman measures' first month in days (default 30)")
+	measures.add_argument("--top", type=_top_split, action="append", metavar="MEASURE[:PERCENTILE]", help="label the players above a percentile (default 95) of a measure, can be repeated")
+	measures.add_argument("--clusters", type=int, default=None, help="add the k-means cluster of each player, using this many clusters")
+	measures.add_argument("--temp-dir", default=None, help="the directory to stream raw and CSV files into (default: the system's temporary directory)")
+	measures.set_defaults(run=run_measures)
+
+	prepare = commands.add_parser("prepare", parents=[shared], help="convert a study's raw data set into gamba's transaction formats")
+	prepare.add_argument("--out", required=True, help="the file or directory to save the transactions to")
+	prepare.add_argument("--output-format", default="csv", choices=["csv", "store", "binary"], help="the format to save the transactions in (default csv)")
+	prepare.set_defaults(run=run_prepare)
+
+	return parser
+
+
+def _print_timings(profiler, file=None):
+	"""
+	Writes the time taken by each top level stage of a profile (and its peak memory, if traced) to standard error.
+	"""
+	file = file or sys.stderr
+	results = profiler.to_dataframe()
+	stages = results[~results["stage"].str.contains("/")]
+	for _, stage in stages.iterrows():
+		line = "{:<10} {:>9.2f}s".format(stage["stage"], stage["time"])
+		if profiler.memory:
+			line += " {:>10.1f}MB".format(stage["peak_memory"])
+		print(line, file=file)
+	print("{:<10} {:>9.2f}s".format("total", profiler.total_time), file=file)
+
+
+def main(argv=None):
+	"""
+	Runs the 'gamba' command with the given arguments (the command line's by default), returning its exit code.
+	When it finishes, the time taken by each stage is written to standard error.
+	"""
+	arguments = _parser().parse_args(argv)
+
+	try:
+		with gamba.reporting.report_to(arguments.reporter):
+			with gamba.profiling.profile(arguments.profile, memory=arguments.trace_memory) as profiler:
+				arguments.run(arguments)
+	except Exception as error:
+		print("gamba: error:", error, file=sys.stderr)
+		return 1
+
+	_print_timings(profiler)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
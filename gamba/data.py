@@ -1,8 +1,9 @@
 # data loading and storage module
 
 # dependencies
-import pandas as pd, os, glob, numpy as np, datetime, warnings
-from tqdm import tqdm
+import pandas as pd, os, glob, numpy as np, datetime, warnings, json, shutil, tempfile
+import concurrent.futures
+import gamba.plotting, gamba.profiling, gamba.reporting
 
 
 def help(advanced=False):
@@ -41,87 +42,197 @@ def help(advanced=False):
     print(extra_column_names)
 
 
-def prepare_labrie_data(filename, savedir="labrie_individuals/", loud=False, year=2008):
+@gamba.profiling.profiled
+def prepare_labrie_data(filename, savedir="labrie_individuals/", loud=False, year=2008, compact=False, chunksize=None, output_format="csv", output=None):
     """
 	Splits the original labrie data into CSV files for each individual's transactions and renames the columns to be compatable with the rest of the gamba library.
+	If a chunksize is given, the file is converted a chunk at a time and the name of the output is returned instead of the data.
+	Converting to CSV or a store then holds around one chunk (or a million rows, whichever is more) in memory, and converting to a binary store also holds one partition of a temporary store (around 1/64 of the bets) at a time.
 	
 	Args:
 		filename (String): The name of the file downloaded from the transparency project's website, e.g. 'home/data/DailyData.txt'.
 		loud (Boolean): Whether or not to output status updates as the function progresses, default is False.
 		year (Integer): The year of the publication the data was used in (this method works for either the 2007 or 2008 paper's data).
+		compact (Boolean): Whether or not to return the data with its columns in smaller types to save memory (see :meth:`compact_transactions`), default is False. Can't be used with a chunksize, as nothing is returned.
+		chunksize (Integer): The number of rows to read and write at a time, default is None (convert the whole file at once).
+		output_format (String): The format to save the data in, one of 'csv', 'store' (see :meth:`save_store`), or 'binary' (see :meth:`save_binary_store`), default is 'csv'.
+		output (String): The file (or directory for 'store' and 'binary' formats) to save the data to, default is 'gamba_ready_labrie_data_<year>.csv' (or '_store/' or '_binary/').
 	
 	"""
-
-    labrie_data = None
-
     if year == 2008:
-        labrie_data = pd.read_csv(filename, delimiter="\t", parse_dates=["Date"])
+        read_options = {"delimiter": "\t", "parse_dates": ["Date"]}
+        column_names = ["player_id", "bet_time", "bet_size", "payout_size", "bet_count"]
     elif year == 2007:
-        labrie_data = pd.read_csv(filename, parse_dates=["Date"])
+        read_options = {"parse_dates": ["Date"]}
+        column_names = ["player_id", "bet_time", "product_id", "bet_size", "payout_size", "bet_count"]
+    else:
+        raise Exception("Year '" + str(year) + "' is not 2007 or 2008.")
+
+    if output is None:
+        output = _default_output("gamba_ready_labrie_data_" + str(year), output_format)
+
+    if chunksize is not None:
+        if compact:
+            raise Exception("Data converted in chunks is saved rather than returned, so it can't be compacted (use compact_transactions when loading it).")
+        _convert_transactions(filename, read_options, column_names, output, output_format, chunksize, loud)
+        if loud:
+            gamba.reporting.message("LaBrie data ready to use!")
+        return output
+
+    labrie_data = pd.read_csv(filename, **read_options)
 
     # rename columns to make them compatable with gamba.measures
     if loud:
-        print("original columns:", list(labrie_data.columns))
+        gamba.reporting.message("original columns:", list(labrie_data.columns))
 
-    if year == 2008:
-        labrie_data.columns = [
-            "player_id",
-            "bet_time",
-            "bet_size",
-            "payout_size",
-            "bet_count",
-        ]
-        labrie_data.to_csv("gamba_ready_labrie_data_2008.csv", index=False)
-    elif year == 2007:
-        labrie_data.columns = [
-            "player_id",
-            "bet_time",
-            "product_id",
-            "bet_size",
-            "payout_size",
-            "bet_count",
-        ]
-        labrie_data.to_csv("gamba_ready_labrie_data_2007.csv", index=False)
+    labrie_data.columns = column_names
+    _save_transactions(labrie_data, output, output_format)
 
     if loud:
-        print("better columns:", list(labrie_data.columns))
+        gamba.reporting.message("better columns:", list(labrie_data.columns))
 
     # split_individual_transactions(labrie_data, savedir)
 
+    if compact:
+        labrie_data = compact_transactions(labrie_data)
+
     if loud:
-        print("LaBrie data ready to use!")
+        gamba.reporting.message("LaBrie data ready to use!")
 
     return labrie_data
 
 
-def prepare_braverman_data(filename, loud=False):
+@gamba.profiling.profiled
+def prepare_braverman_data(filename, loud=False, compact=False, chunksize=None, output_format="csv", output=None):
     """
 	Splits the original Braverman and Shaffer data into CSV files for each indivdiual's transactions, and renames the columns to be compatable with the rest of the gamba library.
+	If a chunksize is given, the file is converted a chunk at a time and the name of the output is returned instead of the data.
+	Converting to CSV or a store then holds around one chunk (or a million rows, whichever is more) in memory, and converting to a binary store also holds one partition of a temporary store (around 1/64 of the bets) at a time.
 
 	Args:
 		filename (String): The name of the file downloaded from the transparency project's website, e.g. 'home/data/DailyData.txt'.
 		loud (Boolean): Whether or not to output status updates as the function progresses, default is False.
+		compact (Boolean): Whether or not to return the data with its columns in smaller types to save memory (see :meth:`compact_transactions`), default is False. Can't be used with a chunksize, as nothing is returned.
+		chunksize (Integer): The number of rows to read and write at a time, default is None (convert the whole file at once).
+		output_format (String): The format to save the data in, one of 'csv', 'store' (see :meth:`save_store`), or 'binary' (see :meth:`save_binary_store`), default is 'csv'.
+		output (String): The file (or directory for 'store' and 'binary' formats) to save the data to, default is 'gamba_ready_braverman_data.csv' (or '_store/' or '_binary/').
 	
 	"""
-    braverman_data = pd.read_csv(filename, parse_dates=["TimeDATE"], delimiter="\t")
-
-    braverman_data.columns = [
-        "player_id",
-        "bet_time",
-        "bet_size",
-        "payout_size",
-        "bet_count",
-    ]
+    read_options = {"delimiter": "\t", "parse_dates": ["TimeDATE"]}
+    column_names = ["player_id", "bet_time", "bet_size", "payout_size", "bet_count"]
+
+    if output is None:
+        output = _default_output("gamba_ready_braverman_data", output_format)
+
+    if chunksize is not None:
+        if compact:
+            raise Exception("Data converted in chunks is saved rather than returned, so it can't be compacted (use compact_transactions when loading it).")
+        _convert_transactions(filename, read_options, column_names, output, output_format, chunksize, loud)
+        if loud:
+            gamba.reporting.message("Braverman data ready to use!")
+        return output
+
+    braverman_data = pd.read_csv(filename, **read_options)
+
+    braverman_data.columns = column_names
 
     # split_individual_transactions(raw_data, 'braverman_individuals/')
 
     if loud:
-        print("Braverman data ready to use!")
+        gamba.reporting.message("Braverman data ready to use!")
+
+    _save_transactions(braverman_data, output, output_format)
 
-    braverman_data.to_csv("gamba_ready_braverman_data.csv", index=False)
+    if compact:
+        braverman_data = compact_transactions(braverman_data)
     return braverman_data
 
 
+def _default_output(name, output_format):
+    if output_format == "csv":
+        return name + ".csv"
+    return name + "_" + output_format + "/"
+
+
+def _save_transactions(transactions, output, output_format):
+    if output_format == "csv":
+        transactions.to_csv(output, index=False)
+    elif output_format == "store":
+        save_store(transactions, output)
+    elif output_format == "binary":
+        save_binary_store(transactions, output)
+    else:
+        raise Exception("Output format '" + output_format + "' is not one of 'csv', 'store', or 'binary'.")
+
+
+def _convert_transactions(filename, read_options, column_names, output, output_format, chunksize, loud):
+    """
+	Reads a file of transactions a chunk at a time, renaming the columns of each chunk and adding it to the output before reading the next.
+	"""
+
+    def renamed_chunks():
+        for chunk in pd.read_csv(filename, chunksize=chunksize, **read_options):
+            chunk.columns = column_names
+            yield chunk
+
+    save_transaction_chunks(renamed_chunks(), output, output_format, loud)
+
+
+# the fewest rows added to a store at a time when saving chunks, so small chunks don't each write a file to every partition
+_store_write_rows = 1000000
+
+
+@gamba.profiling.profiled
+def save_transaction_chunks(chunks, output, output_format="csv", loud=False):
+    """
+	Saves a sequence of transaction dataframes (e.g. the chunks of pd.read_csv(..., chunksize=...)) to a single output, adding each chunk before the next is created so the whole data set is never in memory.
+	Chunks added to a store are collected until they reach a million rows (or the chunks end), so each partition gets one file per write rather than one per chunk.
+	A binary output is built from a temporary partitioned store once every chunk has been saved (see :meth:`convert_store`).
+
+	Args:
+		chunks (Iterable of Dataframes): The transactions to save, with the same columns in every chunk.
+		output (String): The file (or directory for 'store' and 'binary' formats) to save the transactions to.
+		output_format (String): The format to save the transactions in, one of 'csv', 'store' (see :meth:`save_store`), or 'binary' (see :meth:`save_binary_store`), default is 'csv'.
+		loud (Boolean): Whether or not to output the number of transactions saved after each chunk, default is False.
+
+	"""
+    if output_format not in ["csv", "store", "binary"]:
+        raise Exception("Output format '" + output_format + "' is not one of 'csv', 'store', or 'binary'.")
+
+    store_dir = output
+    if output_format == "binary":
+        store_dir = tempfile.mkdtemp(prefix="gamba_store_", dir=os.path.dirname(os.path.abspath(output)))
+
+    rows = 0
+    pending = []
+    stored = False
+
+    def store_pending():
+        save_store(pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0], store_dir, append=stored)
+        del pending[:]
+
+    with gamba.reporting.stage("save_transactions", unit="chunks") as progress:
+        for number, chunk in enumerate(chunks):
+            if output_format == "csv":
+                chunk.to_csv(output, mode="w" if number == 0 else "a", header=number == 0, index=False)
+            else:
+                pending.append(chunk)
+                if sum(len(pending_chunk) for pending_chunk in pending) >= _store_write_rows:
+                    store_pending()
+                    stored = True
+            rows += len(chunk)
+            progress.update(rows=len(chunk))
+            if loud:
+                gamba.reporting.message(rows, "transactions saved")
+        if pending:
+            store_pending()
+
+    if output_format == "binary":
+        convert_store(store_dir, output)
+        shutil.rmtree(store_dir)
+
+
+@gamba.profiling.profiled
 def prepare_philander_data(filename, loud=False):
     """
     Loads in the analytic data set of high-risk internet gamblers and removes the UserID, Sereason, random, and clustering columns as described in Philander's 2014 study.
@@ -139,47 +250,659 @@ def prepare_philander_data(filename, loud=False):
                               'intensity','variability','frequency_1m','trajectory',
                               'z_intensity','z_variability','z_frequency','z_trajectory','self_exclude']
     if loud:
-        print(len(philander_data), 'players loaded')
+        gamba.reporting.message(len(philander_data), 'players loaded')
 
     return philander_data
 
-def split_individual_transactions(matched_df, savedir):
+@gamba.profiling.profiled
+def split_individual_transactions(matched_df, savedir, workers=8, append=False):
     """
 	Seperates all transactions from each unique player from the matched bet-payout dataframe of a single application.
 	A CSV file is created in a new directory 'individuals/' containing each player's bets.
+	The transactions are grouped by player once, and the files are written concurrently by a pool of threads.
 
 	Args:
 		matched_df_csv (Dataframe): A collection of matched bet-payout transactions.
 		savedir (Dataframe): The directory to save each individual's transaction dataframes.
+		workers (Integer): The number of threads writing files at the same time, default is 8.
+		append (Boolean): Whether to add the transactions to any existing player files in the directory instead of clearing it first, default is False.
 
 	"""
-    unique_players = list(set(matched_df["player_id"]))
-
     if not os.path.exists(savedir):
         os.makedirs(savedir)
-        print("Directory ", savedir, " Created ")
+        gamba.reporting.message("Directory ", savedir, " Created ")
+    elif append:
+        gamba.reporting.message("Directory ", savedir, " already exists, appending to files...")
     else:
-        print("Directory ", savedir, " already exists, clearing files...")
+        gamba.reporting.message("Directory ", savedir, " already exists, clearing files...")
         files = glob.glob(savedir + "*")
         for f in files:
             os.remove(f)
-        print("Directory ", savedir, " cleared.")
+        gamba.reporting.message("Directory ", savedir, " cleared.")
+
+    # sort once so that each player's transactions are one contiguous block (in their original order)
+    sorted_df = matched_df.sort_values("player_id", kind="stable")
+    player_ids = sorted_df["player_id"].values
+    new_player = np.ones(len(player_ids), dtype=bool)
+    new_player[1:] = player_ids[1:] != player_ids[:-1]
+    starts = np.flatnonzero(new_player)
+    stops = np.append(starts[1:], len(sorted_df))
+
+    gamba.reporting.message("extracting individual transactions for", len(starts), "players...")
+
+    def write_player(start, stop):
+        filename = savedir + str(player_ids[start]) + ".csv"
+        player_bets = sorted_df.iloc[start:stop]
+        if append and os.path.exists(filename):
+            player_bets.to_csv(filename, mode="a", index=None, header=False)
+        else:
+            player_bets.to_csv(filename, index=None, header=True)
 
-    print("extracting individual transactions for", len(unique_players), "players...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(write_player, start, stop): stop - start for start, stop in zip(starts, stops)}
+        with gamba.reporting.stage("split_individual_transactions", total=len(futures)) as progress:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                progress.update(rows=futures[future], players=1)
 
-    for i in tqdm(range(len(unique_players))):
-        player_bets = matched_df[matched_df["player_id"] == unique_players[i]]
-        player_bets.to_csv(
-            savedir + str(unique_players[i]) + ".csv", index=None, header=True
-        )
+    gamba.reporting.message("all individual transaction files saved.")
+
+
+# transaction tables
+
+
+def _block_starts(values):
+    """
+	The positions at which each block of equal values starts in an array.
+	"""
+    new_block = np.ones(len(values), dtype=bool)
+    new_block[1:] = values[1:] != values[:-1]
+    return np.flatnonzero(new_block)
+
+
+class TransactionTable:
+    """
+	A collection of bets sorted once by player and bet time, so that each player's bets form one contiguous block of rows.
+	Columns are held as numpy arrays and the day of each bet is cached, so the measures in :mod:`gamba.measures` can use a table repeatedly without sorting, copying, or changing it.
+	A table can be passed to any function in :mod:`gamba.measures` in place of a dataframe of bets, either for a whole cohort of players or for a single player (see :meth:`TransactionTable.player`).
+
+	Args:
+		all_player_bets (Dataframe): Bets made by any number of players, with at least the columns 'player_id' and 'bet_time'.
+
+	Attributes:
+		columns (List of Strings): The names of the table's columns.
+		player_ids (Array): The id of each player in the table, in the order their bets appear.
+		starts (Array): The row at which each player's bets start.
+		stops (Array): The row after each player's last bet.
+
+	"""
+
+    def __init__(self, all_player_bets):
+        for column in ["player_id", "bet_time"]:
+            if column not in all_player_bets.columns:
+                raise Exception("Column '" + column + "' missing from provided dataframe.")
+
+        player_ids = all_player_bets["player_id"]
+        if isinstance(player_ids.dtype, pd.CategoricalDtype) and not player_ids.cat.categories.is_monotonic_increasing:
+            # categories are sorted by their order, so put them in the same order as their ids would be sorted
+            all_player_bets = all_player_bets.assign(player_id=player_ids.cat.reorder_categories(player_ids.cat.categories.sort_values()))
+
+        sorted_bets = all_player_bets.sort_values(["player_id", "bet_time"], kind="mergesort")
+        bet_times = sorted_bets["bet_time"]
+        if bet_times.dt.tz is not None:
+            # keep the local date and time of each bet
+            bet_times = bet_times.dt.tz_localize(None)
+
+        arrays = {column: sorted_bets[column].values for column in sorted_bets.columns}
+        arrays["bet_time"] = bet_times.values
+        player_ids = sorted_bets["player_id"]
+        if isinstance(player_ids.dtype, pd.CategoricalDtype):
+            # find each player's bets from the category codes, keeping one id per player instead of one per bet
+            del arrays["player_id"]
+            codes = player_ids.cat.codes.values
+            starts = _block_starts(codes)
+            self._set_arrays(arrays, starts, np.asarray(player_ids.cat.categories)[codes[starts]])
+        else:
+            self._set_arrays(arrays)
+
+    @classmethod
+    def from_arrays(cls, arrays, starts=None, player_ids=None):
+        """
+		Creates a table from a dictionary of column arrays without copying them (so the arrays can be memory-mapped files, see :meth:`open_store`).
+		The arrays must already have each player's bets in one contiguous block, sorted by bet time.
+
+		Args:
+			arrays (Dictionary): The column names mapped to their values, including 'bet_time' (datetime64) and 'player_id' (unless player_ids is given).
+			starts (Array): The row at which each player's bets start, found from the 'player_id' column if not given.
+			player_ids (Array): The id of each player in the table, if given the 'player_id' column can be left out of the arrays and is only created when used.
+
+		Returns:
+			TransactionTable containing the arrays.
+
+		"""
+        table = cls.__new__(cls)
+        table._set_arrays(dict(arrays), starts, player_ids)
+        return table
+
+    def _set_arrays(self, arrays, starts=None, player_ids=None):
+        if player_ids is None or starts is None:
+            if "player_id" not in arrays:
+                raise Exception("Column 'player_id' missing from provided arrays.")
+            row_player_ids = arrays["player_id"]
+            if starts is None:
+                starts = _block_starts(row_player_ids)
+            player_ids = row_player_ids[starts]
+
+        self._arrays = arrays
+        self._bet_days = None
+        self._player_index = None
+        self.columns = list(arrays) if "player_id" in arrays else ["player_id"] + list(arrays)
+        self.starts = np.asarray(starts, dtype=np.intp)
+        # each player's bets stop where the next player's start, and an empty table has no players (so no stops)
+        self.stops = np.append(self.starts[1:], len(arrays["bet_time"]) if len(self.starts) != 0 else []).astype(np.intp)
+        self.player_ids = np.asarray(player_ids)
+
+    def __len__(self):
+        return len(self._arrays["bet_time"])
+
+    def __getitem__(self, column):
+        if column == "player_id" and column not in self._arrays:
+            return np.repeat(self.player_ids, self.stops - self.starts)
+        if column not in self._arrays:
+            raise Exception("Column '" + column + "' missing from provided transaction table.")
+        return self._arrays[column]
+
+    @property
+    def bet_days(self):
+        """
+		The day of each bet as an integer number of days since the epoch (1970-01-01), calculated once when first used.
+		"""
+        if self._bet_days is None:
+            self._bet_days = self._arrays["bet_time"].astype("datetime64[D]").astype(np.int64)
+        return self._bet_days
+
+    def head(self, n):
+        """
+		The first n bets of the table as a new table sharing the same arrays (e.g. the first bets of a single player).
+		"""
+        arrays = {column: values[:n] for column, values in self._arrays.items()}
+        players = self.starts < n
+        table = TransactionTable.from_arrays(arrays, starts=self.starts[players], player_ids=self.player_ids[players])
+        if self._bet_days is not None:
+            table._bet_days = self._bet_days[:n]
+        return table
+
+    def player(self, player_id):
+        """
+		The bets made by a single player as a new table sharing the same arrays.
+
+		Args:
+			player_id (String or Integer): The id of the player.
+
+		Returns:
+			TransactionTable containing only the player's bets.
+
+		"""
+        return self._player_rows(self.player_index.position(player_id))
+
+    def _player_rows(self, position):
+        start, stop = self.starts[position], self.stops[position]
+        arrays = {column: values[start:stop] for column, values in self._arrays.items()}
+        table = TransactionTable.from_arrays(arrays, starts=np.zeros(1, dtype=np.intp), player_ids=self.player_ids[position : position + 1])
+        if self._bet_days is not None:
+            table._bet_days = self._bet_days[start:stop]
+        return table
+
+    def players(self, player_ids=None):
+        """
+		Iterates over the table one player at a time, yielding a table of each player's bets.
+
+		Args:
+			player_ids (List): The ids of the players to iterate over (in that order), default is None (every player in the table).
+
+		"""
+        if player_ids is None:
+            positions = range(len(self.starts))
+        else:
+            positions = self.player_index.positions(player_ids)
+        for position in positions:
+            yield self._player_rows(position)
+
+    @property
+    def player_index(self):
+        """
+		The :class:`PlayerIndex` of the table's players, built once when first used.
+		"""
+        if self._player_index is None:
+            self._player_index = PlayerIndex(self.player_ids, self.starts, self.stops)
+        return self._player_index
+
+    def select_players(self, player_ids):
+        """
+		Creates a new table containing only the bets of the given players, in the same order as this table.
+
+		Args:
+			player_ids (List): The ids of the players to keep.
+
+		Returns:
+			TransactionTable containing the players' bets.
+
+		"""
+        players = np.zeros(len(self.starts), dtype=bool)
+        players[self.player_index.positions(player_ids)] = True
+        return self.select(players)
 
-    print("all individual transaction files saved.")
+    def select(self, players):
+        """
+		Creates a new table containing only some of the players.
 
+		Args:
+			players (Array of Booleans): Whether or not to keep each player, in the same order as player_ids.
+
+		Returns:
+			TransactionTable containing the selected players' bets.
+
+		"""
+        starts = self.starts[players]
+        lengths = self.stops[players] - starts
+        new_starts = np.cumsum(lengths) - lengths
+        rows = np.arange(lengths.sum()) - np.repeat(new_starts - starts, lengths)
+
+        arrays = {column: values[rows] for column, values in self._arrays.items()}
+        return TransactionTable.from_arrays(arrays, starts=new_starts, player_ids=self.player_ids[players])
+
+    def to_dataframe(self):
+        """
+		Converts the table back to a dataframe of bets, sorted by player and bet time.
+		"""
+        return pd.DataFrame({column: self[column] for column in self.columns})
+
+
+class PlayerIndex:
+    """
+	Maps the id of each player in a collection of bets sorted by player to the rows their bets start and stop at.
+	The map is built once, after which finding any player's rows takes the same (short) time however many players there are.
+	Every :class:`TransactionTable` has one (see :attr:`TransactionTable.player_index`).
+
+	Args:
+		player_ids (Array): The id of each player, in the order their bets appear.
+		starts (Array): The row at which each player's bets start.
+		stops (Array): The row after each player's last bet.
+
+	"""
+
+    def __init__(self, player_ids, starts, stops):
+        self.player_ids = np.asarray(player_ids)
+        self.starts = np.asarray(starts)
+        self.stops = np.asarray(stops)
+        self._positions = {player_id: position for position, player_id in enumerate(self.player_ids.tolist())}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, player_id):
+        return player_id in self._positions
+
+    def __getitem__(self, player_id):
+        position = self.position(player_id)
+        return self.starts[position], self.stops[position]
+
+    def position(self, player_id):
+        """
+		The position of a player in the index (and in the player_ids of its table).
+		"""
+        if player_id not in self._positions:
+            raise Exception("Player '" + str(player_id) + "' not found in transaction table.")
+        return self._positions[player_id]
+
+    def positions(self, player_ids):
+        """
+		The positions of many players in the index, as an array.
+		"""
+        return np.array([self.position(player_id) for player_id in player_ids], dtype=np.intp)
+
+    def rows(self, player_ids):
+        """
+		The rows at which many players' bets start and stop.
+
+		Args:
+			player_ids (List): The ids of the players.
+
+		Returns:
+			Tuple of two arrays, the start and stop rows of each player's bets.
+
+		"""
+        positions = self.positions(player_ids)
+        return self.starts[positions], self.stops[positions]
+
+
+# partitioned columnar store
+
+
+def _player_partitions(player_ids, partitions):
+    """
+	The partition each player's bets are stored in, from a hash of their player_id (as a string, so integer and string ids are treated the same).
+	"""
+    player_ids = np.asarray(player_ids).astype(str)
+    return pd.util.hash_array(player_ids.astype(object)) % np.uint64(partitions)
+
+
+def _partition_dir(savedir, partition):
+    return os.path.join(savedir, "partition_" + str(partition).zfill(5))
+
+
+@gamba.profiling.profiled
+def save_store(matched_df, savedir, partitions=64, append=False):
+    """
+	Saves a collection of transactions to a partitioned columnar store, where each player's bets are kept in one of a fixed number of partitions (chosen by a hash of their player_id) as Parquet files.
+	This is the recommended way of storing large data sets for :mod:`gamba.measures`, as it is much faster to write and read than one CSV file per player, and subsets of players or columns can be loaded using :meth:`load_store`.
+	Requires the pyarrow library (pip install pyarrow).
+
+	Args:
+		matched_df (Dataframe): A collection of matched bet-payout transactions, including a 'player_id' column.
+		savedir (String): The directory to save the store to, e.g. 'transactions_store/'.
+		partitions (Integer): The number of partitions to split the players between, default is 64. Ignored when appending to an existing store.
+		append (Boolean): Whether to add the transactions to an existing store instead of replacing it, default is False.
+
+	"""
+    metadata_file = os.path.join(savedir, "gamba_store.json")
+    if append and os.path.exists(metadata_file):
+        with open(metadata_file) as metadata:
+            partitions = json.load(metadata)["partitions"]
+    else:
+        # only remove a previous store's files, leaving anything else in the directory
+        for partition_dir in glob.glob(os.path.join(savedir, "partition_*")):
+            shutil.rmtree(partition_dir)
+        os.makedirs(savedir, exist_ok=True)
+        with open(metadata_file, "w") as metadata:
+            json.dump({"partitions": partitions}, metadata)
+
+    player_partitions = _player_partitions(matched_df["player_id"].values, partitions)
+    order = np.argsort(player_partitions, kind="stable")
+    sorted_partitions = player_partitions[order]
+    boundaries = np.flatnonzero(np.diff(sorted_partitions)) + 1
+
+    for rows in np.split(order, boundaries):
+        if len(rows) == 0:
+            continue
+        partition_dir = _partition_dir(savedir, int(player_partitions[rows[0]]))
+        os.makedirs(partition_dir, exist_ok=True)
+        part_number = len(glob.glob(os.path.join(partition_dir, "*.parquet")))
+        part_file = os.path.join(partition_dir, "part_" + str(part_number).zfill(5) + ".parquet")
+        part_bets = matched_df.iloc[rows]
+        if isinstance(part_bets["player_id"].dtype, pd.CategoricalDtype):
+            # otherwise every part stores the ids of every player in the data set
+            part_bets = part_bets.assign(player_id=part_bets["player_id"].cat.remove_unused_categories())
+        part_bets.to_parquet(part_file, index=False)
+
+
+@gamba.profiling.profiled
+def load_store(savedir, players=None, columns=None, as_table=False):
+    """
+	Loads transactions from a partitioned columnar store created by :meth:`save_store`.
+	Only the partitions containing the requested players, and only the requested columns, are read from disk.
+
+	Args:
+		savedir (String): The directory containing the store, e.g. 'transactions_store/'.
+		players (List): The player_ids of the players to load, default is None (load every player).
+		columns (List of Strings): The columns to load, default is None (load every column).
+		as_table (Boolean): Whether to return a :class:`TransactionTable` instead of a dataframe, default is False.
+
+	Returns:
+		Dataframe (or TransactionTable) containing the requested transactions.
+
+	"""
+    with open(os.path.join(savedir, "gamba_store.json")) as metadata:
+        partitions = json.load(metadata)["partitions"]
+
+    if players is None:
+        partition_dirs = sorted(glob.glob(os.path.join(savedir, "partition_*")))
+    else:
+        players = [str(player_id) for player_id in players]
+        partition_dirs = [_partition_dir(savedir, int(partition)) for partition in np.unique(_player_partitions(players, partitions))]
+
+    read_columns = columns
+    if columns is not None and players is not None and "player_id" not in columns:
+        read_columns = list(columns) + ["player_id"]
+
+    partition_bets = []
+    for partition_dir in partition_dirs:
+        for part_file in sorted(glob.glob(os.path.join(partition_dir, "*.parquet"))):
+            part_bets = pd.read_parquet(part_file, columns=read_columns)
+            if players is not None:
+                part_bets = part_bets[part_bets["player_id"].astype(str).isin(players)]
+            partition_bets.append(part_bets)
+
+    if len(partition_bets) == 0:
+        all_player_bets = pd.DataFrame(columns=read_columns)
+    else:
+        all_player_bets = pd.concat(partition_bets, ignore_index=True)
+    if columns is not None:
+        all_player_bets = all_player_bets[list(columns)]
+
+    if as_table:
+        return TransactionTable(all_player_bets)
+    return all_player_bets
+
+
+
+# memory-mapped binary store
+
+
+@gamba.profiling.profiled
+def save_binary_store(all_player_bets, savedir):
+    """
+	Saves a collection of transactions in a compact binary format which can be opened instantly using :meth:`open_store`.
+	Each bet is stored as a fixed-width record (player index, bet time, and the bet_size, payout_size, and bet_count columns if present) with each player's bets together in one block, sorted by bet time.
+	The id of each player and the rows their bets start and stop at are stored alongside the records.
+
+	Args:
+		all_player_bets (Dataframe or TransactionTable): Bets made by any number of players, with at least the columns 'player_id' and 'bet_time'.
+		savedir (String): The directory to save the store to, e.g. 'transactions_binary/'.
+
+	"""
+    if not isinstance(all_player_bets, TransactionTable):
+        all_player_bets = TransactionTable(all_player_bets)
+    _write_binary_store(savedir, [all_player_bets], len(all_player_bets))
+
+
+@gamba.profiling.profiled
+def convert_store(store_dir, savedir):
+    """
+	Converts a partitioned columnar store created by :meth:`save_store` into a binary store which can be opened using :meth:`open_store`, with its players sorted by player_id.
+	The store is converted one partition at a time into a temporary binary store next to the new one, which is then copied into player_id order a batch of bets at a time.
+	Only one partition's bets (or one batch) and the ids of every player are held in memory at once, but twice the size of the binary store is needed on disk while converting.
+	Requires the pyarrow library (pip install pyarrow).
+
+	Args:
+		store_dir (String): The directory containing the partitioned store, e.g. 'transactions_store/'.
+		savedir (String): The directory to save the binary store to, e.g. 'transactions_binary/'.
+
+	"""
+    partition_files = [
+        sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))
+        for partition_dir in sorted(glob.glob(os.path.join(store_dir, "partition_*")))
+    ]
+    # reading no columns only reads the number of rows in each file
+    bets = sum(len(pd.read_parquet(part_file, columns=[])) for part_files in partition_files for part_file in part_files)
+
+    def partition_tables():
+        for part_files in partition_files:
+            partition_bets = pd.concat([pd.read_parquet(part_file) for part_file in part_files], ignore_index=True)
+            yield TransactionTable(partition_bets)
+
+    os.makedirs(os.path.dirname(os.path.abspath(savedir)), exist_ok=True)
+    partitioned_dir = tempfile.mkdtemp(prefix="gamba_binary_", dir=os.path.dirname(os.path.abspath(savedir)))
+    try:
+        _write_binary_store(partitioned_dir, partition_tables(), bets)
+        _sort_binary_store(partitioned_dir, savedir)
+    finally:
+        shutil.rmtree(partitioned_dir)
+
+
+def _sort_binary_store(source_dir, savedir, batch_rows=1000000):
+    """
+	Copies a binary store into a new one with its players sorted by player_id (as a :class:`TransactionTable` sorts them), reading around batch_rows bets at a time.
+	"""
+    with open(os.path.join(source_dir, "gamba_binary.json")) as metadata_file:
+        metadata = json.load(metadata_file)
+    records = np.load(os.path.join(source_dir, "transactions.npy"), mmap_mode="r")
+    player_ids = np.load(os.path.join(source_dir, "players.npy"))
+    offsets = np.load(os.path.join(source_dir, "offsets.npy"))
+
+    order = np.argsort(player_ids, kind="stable")
+    lengths = np.diff(offsets)[order]
+    sorted_offsets = np.append(0, np.cumsum(lengths)).astype(np.int64)
+
+    os.makedirs(savedir, exist_ok=True)
+    sorted_records = np.lib.format.open_memmap(os.path.join(savedir, "transactions.npy"), mode="w+", dtype=records.dtype, shape=records.shape)
+    first = 0
+    while first < len(order):
+        # the players whose bets fit in the batch (always at least one player)
+        last = np.searchsorted(sorted_offsets, sorted_offsets[first] + batch_rows, side="right") - 1
+        last = min(max(last, first + 1), len(order))
+        batch_lengths = lengths[first:last]
+        batch_starts = sorted_offsets[first:last] - sorted_offsets[first]
+        rows = np.repeat(offsets[order[first:last]] - batch_starts, batch_lengths) + np.arange(batch_lengths.sum())
+        batch = records[rows]
+        batch["player"] = np.repeat(np.arange(first, last, dtype=np.int32), batch_lengths)
+        sorted_records[sorted_offsets[first] : sorted_offsets[last]] = batch
+        first = last
+    sorted_records.flush()
+    del sorted_records, records
+
+    np.save(os.path.join(savedir, "players.npy"), player_ids[order])
+    np.save(os.path.join(savedir, "offsets.npy"), sorted_offsets)
+    with open(os.path.join(savedir, "gamba_binary.json"), "w") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+
+def _write_binary_store(savedir, tables, bets):
+    """
+	Writes a sequence of transaction tables one after another into a binary store holding the given total number of bets.
+	Each player's bets must all be in the same table.
+	"""
+    os.makedirs(savedir, exist_ok=True)
+    filename = os.path.join(savedir, "transactions.npy")
+
+    records = None
+    time_unit = "ns"
+    row = 0
+    all_player_ids = []
+    all_starts = []
+    for table in tables:
+        if records is None:
+            time_unit = np.datetime_data(table["bet_time"].dtype)[0]
+            columns = [column for column in transaction_dtypes if column in table.columns]
+            record_type = [("player", np.int32), ("bet_time", np.int64)]
+            record_type += [(column, transaction_dtypes[column]) for column in columns]
+            records = np.lib.format.open_memmap(filename, mode="w+", dtype=record_type, shape=(bets,))
+
+        table_records = records[row : row + len(table)]
+        first_player = sum(len(player_ids) for player_ids in all_player_ids)
+        table_records["player"] = first_player + np.repeat(np.arange(len(table.starts), dtype=np.int32), table.stops - table.starts)
+        table_records["bet_time"] = table["bet_time"].astype("datetime64[" + time_unit + "]").view(np.int64)
+        for column in columns:
+            table_records[column] = table[column]
+
+        all_player_ids.append(table.player_ids)
+        all_starts.append(row + table.starts)
+        row += len(table)
+
+    if records is None:
+        records = np.lib.format.open_memmap(filename, mode="w+", dtype=[("player", np.int32), ("bet_time", np.int64)], shape=(0,))
+    records.flush()
+    del records
+
+    player_ids = np.concatenate(all_player_ids) if all_player_ids else np.array([], dtype=str)
+    if player_ids.dtype.kind not in "iu":
+        player_ids = player_ids.astype(str)
+    starts = np.concatenate(all_starts) if all_starts else np.array([], dtype=np.int64)
+    np.save(os.path.join(savedir, "players.npy"), player_ids)
+    np.save(os.path.join(savedir, "offsets.npy"), np.append(starts, row).astype(np.int64))
+
+    with open(os.path.join(savedir, "gamba_binary.json"), "w") as metadata:
+        json.dump({"time_unit": time_unit, "players": len(player_ids), "bets": row}, metadata)
+
+
+@gamba.profiling.profiled
+def open_store(savedir):
+    """
+	Opens a binary store created by :meth:`save_binary_store` as a :class:`TransactionTable` without reading the bets into memory.
+	The bets are memory-mapped, so only the parts of the file used by a calculation are read from disk, e.g. measuring a single player using :meth:`TransactionTable.player` only reads that player's bets.
+
+	Args:
+		savedir (String): The directory containing the store, e.g. 'transactions_binary/'.
+
+	Returns:
+		TransactionTable of the memory-mapped bets.
+
+	"""
+    with open(os.path.join(savedir, "gamba_binary.json")) as metadata:
+        time_unit = json.load(metadata)["time_unit"]
+
+    records = np.load(os.path.join(savedir, "transactions.npy"), mmap_mode="r")
+    player_ids = np.load(os.path.join(savedir, "players.npy"))
+    offsets = np.load(os.path.join(savedir, "offsets.npy"))
+
+    arrays = {"bet_time": records["bet_time"].view("datetime64[" + time_unit + "]")}
+    for column in records.dtype.names[2:]:
+        arrays[column] = records[column]
+    return TransactionTable.from_arrays(arrays, starts=offsets[:-1], player_ids=player_ids)
+
+
+# compact transactions
+
+
+def _megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+@gamba.profiling.profiled
+def compact_transactions(transactions, loud=True):
+    """
+	Reduces the memory used by a dataframe of transactions by storing each standard column in a smaller type.
+	Player ids become categories (or the smallest integer type if they are integers), bet and payout sizes become 32-bit floats (accurate to around 7 significant figures), bet counts become the smallest integer type, and bet and payout times are parsed as datetimes.
+	Other columns are left unchanged, and every function in :mod:`gamba.measures` works on the compact dataframe.
+
+	Args:
+		transactions (Dataframe): A collection of transactions using the standard column names (see :meth:`help`).
+		loud (Boolean): Whether or not to print the memory used before and after compacting, default is True.
+
+	Returns:
+		Dataframe containing the compacted transactions.
+
+	"""
+    compact_columns = {}
+    for column in transactions.columns:
+        values = transactions[column]
+        if column == "player_id":
+            if values.dtype.kind in "iu":
+                values = pd.to_numeric(values, downcast="integer")
+            else:
+                values = values.astype("category")
+        elif column in ["bet_size", "payout_size"]:
+            values = values.astype(np.float32)
+        elif column == "bet_count":
+            values = pd.to_numeric(values, downcast="integer")
+        elif column in ["bet_time", "payout_time"]:
+            values = pd.to_datetime(values)
+        compact_columns[column] = values
+
+    compact = pd.DataFrame(compact_columns, index=transactions.index)
+    if loud:
+        gamba.reporting.message(
+            "memory used: {:.1f}MB -> {:.1f}MB".format(
+                _megabytes(transactions), _megabytes(compact)
+            )
+        )
+    return compact
 
 # pandas wrapper methods (for convenience)
 
 
-def read_csv(file, parse_dates=[], index_col=None, delimiter=",", dummy_data=False):
+@gamba.profiling.profiled
+def read_csv(file, parse_dates=[], index_col=None, delimiter=",", dummy_data=False, compact=False):
     """
 	This method is a simple wrapper of pandas' **read_csv** function which only includes its date parsing, index_col, and delimiter functionality.
 	Feel free to use pd.read_csv in place of this method if more specific paremeters are required.
@@ -191,27 +914,20 @@ def read_csv(file, parse_dates=[], index_col=None, delimiter=",", dummy_data=Fal
 		parse_dates (List of Strings): The names of the columns containing datetime data types, e.g. ['bet_time','payout_time']
 		index_col (String): Which column to be used as the index, default is None.
 		delimiter (String): The delimiter used in the file being read, default is ',' (CSV format).
-		dummy_data (Boolean): Whether or not to ignore the other parameters and return dummy data.
+		dummy_data (Boolean): Whether or not to ignore the other parameters and return dummy transactions for 10 players (see :meth:`generate_transactions`).
+		compact (Boolean): Whether or not to store the standard columns in smaller types to save memory (see :meth:`compact_transactions`), default is False.
 	"""
 
     if dummy_data:
-        print("todo: add dummy data gen code")
-
-        df = pd.DataFrame(
-            {
-                "USERID": ["2345345", "2153674", "2364565"],
-                "DATETIME": ["this", "is", "unfinished"],  # todo
-                "ROUL_STAKE": [10, 22, 15],
-                "RETURN": [0, 44, 0],
-            }
-        )
-
-        return df
+        return generate_transactions(players=10)
 
     df = pd.read_csv(
         file, parse_dates=parse_dates, index_col=index_col, delimiter=delimiter
     )
 
+    if compact:
+        df = compact_transactions(df)
+
     return df
 
 
@@ -229,21 +945,92 @@ def concat(dfs, axis=0):
     return df
 
 
-def load_directory(directory):
+# the types of the standard transaction columns, used by the binary store
+transaction_dtypes = {
+    "bet_size": "float64",
+    "payout_size": "float64",
+    "bet_count": "int64",
+}
+
+# the types of the columns in player files, where a missing bet_count is allowed (and makes the column float64)
+player_file_dtypes = {
+    "bet_size": "float64",
+    "payout_size": "float64",
+}
+
+
+def _read_player_files(filenames, dtype):
+    """
+	Reads a batch of player files, returning a list of their dataframes.
+	Bet times are parsed once for the whole batch when they're all ISO 8601 times with the same UTC offset (or none), which is much faster than parsing them file by file.
+	Otherwise they're parsed file by file, so files in different formats are each read as they would be on their own.
+	"""
+    all_player_bets = [pd.read_csv(f, dtype=dtype) for f in filenames]
+    if not all_player_bets:
+        return all_player_bets
+
+    try:
+        bet_times = pd.to_datetime(pd.concat([player_bets["bet_time"] for player_bets in all_player_bets], ignore_index=True), format="ISO8601").array
+    except (ValueError, TypeError):
+        for player_bets in all_player_bets:
+            player_bets["bet_time"] = pd.to_datetime(player_bets["bet_time"])
+        return all_player_bets
+
+    start = 0
+    for player_bets in all_player_bets:
+        player_bets["bet_time"] = bet_times[start : start + len(player_bets)]
+        start += len(player_bets)
+    return all_player_bets
+
+
+@gamba.profiling.profiled
+def load_directory(directory, workers=1, dtype=None, concatenate=False, as_table=False):
     """
 	Loads a directory containing a collection of CSV files in as dataframes, returning a list of dataframes.
 	This is useful for calculating behavioural measures on collections of players by iterating over the returned list.
+	Files can be read concurrently by a pool of processes, and combined into a single dataframe sorted by player and bet time along with the rows of each player's bets.
 
 	Args:
 		directory (String): The directory containing player CSV files, e.g. 'fixed_odds_players/'.
+		workers (Integer): The number of processes reading files at the same time, default is 1.
+		dtype (Dictionary): The types of the columns in the files, default is float64 for 'bet_size' and 'payout_size' (other columns' types are inferred from each file).
+		concatenate (Boolean): Whether to return a single dataframe sorted by player_id and bet_time and a :class:`PlayerIndex` of each player's rows in it, default is False.
+		as_table (Boolean): Whether to return a single :class:`TransactionTable` (which holds each player's rows itself), default is False.
 
 	Returns:
-		List of dataframes where each dataframe is one player's transaction data.
+		List of dataframes where each dataframe is one player's transaction data (by default), which is empty if the directory has no bets.
+		A single dataframe or table can't be created without any bets, so an exception is raised instead.
 
 	"""
-    all_filenames = glob.glob(directory + "*.csv")
-    all_player_bets = [read_csv(f, parse_dates=["bet_time"]) for f in all_filenames]
-    return all_player_bets
+    if dtype is None:
+        dtype = player_file_dtypes
+
+    all_filenames = sorted(glob.glob(directory + "*.csv"))
+
+    # each process reads a consecutive batch of files, so the cost of sending work between processes is paid once per batch
+    batches = [list(batch) for batch in np.array_split(np.array(all_filenames, dtype=object), max(workers, 1))]
+    with gamba.reporting.stage("load_directory", total=len(all_filenames)) as progress:
+        if workers == 1:
+            all_player_bets = _read_player_files(batches[0], dtype)
+            progress.update(len(batches[0]), rows=sum(len(player_bets) for player_bets in all_player_bets), players=len(batches[0]))
+        else:
+            all_player_bets = []
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, **gamba.reporting.worker_options()) as executor:
+                for batch, result in zip(batches, executor.map(_read_player_files, batches, [dtype] * len(batches))):
+                    all_player_bets += result
+                    progress.update(len(batch), rows=sum(len(player_bets) for player_bets in result), players=len(batch))
+
+    if not (concatenate or as_table):
+        return all_player_bets
+
+    all_player_bets = [player_bets for player_bets in all_player_bets if len(player_bets)]
+    if not all_player_bets:
+        raise Exception("No bets found in the CSV files in directory '" + directory + "'.")
+    table = TransactionTable(pd.concat(all_player_bets, ignore_index=True))
+    if as_table:
+        return table
+
+    return table.to_dataframe(), table.player_index
 
 
 def summarise_app(player_bets):
@@ -255,8 +1042,8 @@ def summarise_app(player_bets):
 		player_bets (Dataframe): Dataframe containing bets to a gambling application.
 	
 	"""
-    users = set(player_bets["player_id"].values)
-    games = set(player_bets["game_type"].values)
+    users = player_bets["player_id"].unique()
+    games = player_bets["game_type"].unique()
     bets = player_bets["bet_size"].sum()
     payouts = player_bets["payout_size"].sum()
     start_block = player_bets["block_number"].min()
@@ -286,67 +1073,241 @@ def dummy_measures_table(size=100):
     measures_table = pd.DataFrame()
 
     # generate some player ids
-    player_ids = []
-    for x in range(size):
-        player_ids.append("anon_" + str(x))
-    measures_table["player_ids"] = player_ids
+    measures_table["player_ids"] = "anon_" + pd.Series(np.arange(size)).astype(str)
 
     # make some durations (exponentially distributed)
-    measures_table["duration"] = [
-        int(x) for x in np.random.exponential(scale=1, size=(size, 10)).sum(axis=1)
-    ]
+    measures_table["duration"] = (
+        np.random.exponential(scale=1, size=(size, 10)).sum(axis=1).astype(int)
+    )
 
     # make some frequencies (normally distributed)
-    measures_table["frequency"] = [
-        int(sorted((10, x, 100))[1]) for x in np.random.normal(scale=60, size=size)
-    ]
+    measures_table["frequency"] = (
+        np.clip(np.random.normal(scale=60, size=size), 10, 100).astype(int)
+    )
 
     # make some total_wagered (also exponential but not integer)
-    measures_table["total_wagered"] = [
-        round(x, 2)
-        for x in np.random.exponential(scale=200, size=(size, 2)).sum(axis=1)
-    ]
+    measures_table["total_wagered"] = np.round(
+        np.random.exponential(scale=200, size=(size, 2)).sum(axis=1), 2
+    )
 
     # finally some num_bets (uniform)
-    measures_table["num_bets"] = [
-        int(x) for x in np.random.uniform(low=10, high=200, size=size)
-    ]
+    measures_table["num_bets"] = np.random.uniform(
+        low=10, high=200, size=size
+    ).astype(int)
 
     return measures_table
 
 
+@gamba.profiling.profiled
+def generate_transactions(
+    players=1000,
+    career_length=90,
+    active_probability=0.3,
+    bets_per_day=5,
+    bet_size=10.0,
+    bet_size_sigma=1.0,
+    win_probability=0.45,
+    payout_multiplier=2.0,
+    daily=False,
+    start="2020-01-01",
+    start_days=365,
+    random_state=None,
+    chunksize=10000,
+    output=None,
+    output_format="csv",
+    loud=False,
+):
+    """
+	Generates synthetic gambling transactions for any number of players, for testing new functionality or sizing hardware for large data sets.
+	Each player's career starts on a random day and lasts a random number of days, during which they bet on some days and not others.
+	Bets are individual transactions (with the columns 'player_id', 'bet_time', 'bet_size', and 'payout_size'), or daily aggregates with an additional 'bet_count' column, sorted by player and bet time.
+	Players are generated a chunk at a time, so very large data sets can be saved straight to disk without being held in memory.
+
+	Args:
+		players (Integer): The number of players to generate bets for, default is 1000.
+		career_length (Float): The mean number of days from a player's first bet to their last, default is 90.
+		active_probability (Float): The probability that a player bets on any given day of their career (they always bet on the first), default is 0.3.
+		bets_per_day (Float): The mean number of bets a player makes on the days they bet, default is 5.
+		bet_size (Float): The median size of a bet, default is 10.0.
+		bet_size_sigma (Float): How much bet sizes vary between players (bets vary half as much around each player's typical bet size), as the standard deviation of their logarithm, default is 1.0.
+		win_probability (Float): The probability that a bet wins, default is 0.45.
+		payout_multiplier (Float): The size of a winning bet's payout relative to the bet, default is 2.0.
+		daily (Boolean): Whether to aggregate each player's bets into daily totals, default is False.
+		start (String): The date of the earliest possible first bet, default is '2020-01-01'.
+		start_days (Integer): The number of days after the start over which players' first bets are spread, default is 365.
+		random_state (Integer): A seed for the random number generator, so the same transactions can be generated again (with any chunk size), default is None.
+		chunksize (Integer): The number of players to generate at a time, rounded up to a whole number of blocks of 1000 players, default is 10000.
+		output (String): If given, the file (or directory for 'store' and 'binary' formats) to save the transactions to instead of returning them.
+		output_format (String): The format to save the transactions in, one of 'csv', 'store' (see :meth:`save_store`), or 'binary' (see :meth:`save_binary_store`), default is 'csv'.
+		loud (Boolean): Whether or not to output status updates as the transactions are saved, default is False.
+
+	Returns:
+		Dataframe of transactions (with player_id as a category), or the name of the output if one is given.
+
+	"""
+    seed = np.random.SeedSequence(random_state)
+    # pad the numbers so that sorting the ids as strings keeps the players in order
+    player_names = "player_" + pd.Series(np.arange(players)).astype(str).str.zfill(len(str(max(players - 1, 0))))
+    settings = {
+        "career_length": career_length,
+        "active_probability": active_probability,
+        "bets_per_day": bets_per_day,
+        "bet_size": bet_size,
+        "bet_size_sigma": bet_size_sigma,
+        "win_probability": win_probability,
+        "payout_multiplier": payout_multiplier,
+        "daily": daily,
+        "start": np.datetime64(start, "D"),
+        "start_days": start_days,
+    }
+    # each chunk is a whole number of blocks of players, so every block is generated the same way whatever the chunk size
+    chunksize = max(1, -(-chunksize // _players_per_seed)) * _players_per_seed
+    chunks = (
+        _generate_transaction_blocks(seed, first, min(first + chunksize, players), player_names, settings)
+        for first in range(0, players, chunksize)
+    )
+
+    if output is not None:
+        save_transaction_chunks(chunks, output, output_format, loud)
+        return output
+    return pd.concat(chunks, ignore_index=True)
+
+
+# the number of players generated from each seed, see _generate_transaction_blocks
+_players_per_seed = 1000
+
+
+def _generate_transaction_blocks(seed, first, stop, player_names, settings):
+    """
+	Generates the transactions of the players numbered from first to stop, a block of players at a time (see :meth:`generate_transactions`).
+	Each block has its own seed made from the block's number, so a player's transactions don't depend on which chunk they're generated in.
+	"""
+    blocks = []
+    for block_first in range(first, stop, _players_per_seed):
+        rng = np.random.default_rng(np.random.SeedSequence(seed.entropy, spawn_key=(block_first // _players_per_seed,)))
+        player_numbers = np.arange(block_first, min(block_first + _players_per_seed, stop))
+        blocks.append(_generate_transaction_chunk(rng, player_numbers, player_names, settings))
+    return pd.concat(blocks, ignore_index=True)
+
 
-def summarise_dgapp_providers(player_bets, providers, game_types=['coinflip','onedice','twodice','roll']):
+def _generate_transaction_chunk(rng, player_numbers, player_names, settings):
+    """
+	Generates the transactions of a chunk of players at once (see :meth:`generate_transactions`).
+	"""
+    players = len(player_numbers)
+    career_days = rng.geometric(1 / max(settings["career_length"], 1), players)
+    first_days = rng.integers(0, settings["start_days"], players)
+
+    # choose the days each player bets on, always including the first day of their career
+    career_starts = np.cumsum(career_days) - career_days
+    day_players = np.repeat(np.arange(players), career_days)
+    career_day = np.arange(len(day_players)) - career_starts[day_players]
+    active = rng.random(len(day_players)) < settings["active_probability"]
+    active[career_starts] = True
+    day_players = day_players[active]
+    days = first_days[day_players] + career_day[active]
+
+    # each player has a typical bet size, and their bets vary around it
+    day_bet_counts = 1 + rng.poisson(max(settings["bets_per_day"] - 1, 0), len(days))
+    bet_days = np.repeat(np.arange(len(days)), day_bet_counts)
+    player_bet_sizes = settings["bet_size"] * rng.lognormal(0, settings["bet_size_sigma"], players)
+    bet_sizes = player_bet_sizes[day_players[bet_days]] * rng.lognormal(0, settings["bet_size_sigma"] / 2, len(bet_days))
+    bet_sizes = np.maximum(np.round(bet_sizes, 2), 0.01)
+    wins = rng.random(len(bet_days)) < settings["win_probability"]
+    payout_sizes = np.where(wins, np.round(bet_sizes * settings["payout_multiplier"], 2), 0.0)
+
+    if settings["daily"]:
+        day_starts = np.cumsum(day_bet_counts) - day_bet_counts
+        bet_times = settings["start"] + days.astype("timedelta64[D]")
+        bet_players = day_players
+        columns = {
+            "bet_size": np.add.reduceat(bet_sizes, day_starts) if len(days) else bet_sizes,
+            "payout_size": np.add.reduceat(payout_sizes, day_starts) if len(days) else payout_sizes,
+            "bet_count": day_bet_counts,
+        }
+    else:
+        # spread each day's bets over the day, in time order
+        seconds = rng.integers(0, 24 * 60 * 60, len(bet_days))
+        order = np.lexsort((seconds, bet_days))
+        bet_times = (settings["start"] + days[bet_days[order]].astype("timedelta64[D]")) + seconds[order].astype("timedelta64[s]")
+        bet_players = day_players[bet_days]
+        columns = {"bet_size": bet_sizes[order], "payout_size": payout_sizes[order]}
+
+    transactions = pd.DataFrame(
+        {
+            "player_id": pd.Categorical.from_codes(player_numbers[bet_players], categories=player_names),
+            "bet_time": bet_times.astype("datetime64[ns]"),
+            **columns,
+        }
+    )
+    return transactions
+
+
+def summarise_dgapp_providers(player_bets, providers, game_types=['coinflip','onedice','twodice','roll'], per_game=False):
     """
     Create a table containing summary data for providers using a collection of player bets. Summary includes the number of unique users and games, the total value of bets and payouts, the starting and ending block numbers, and the time the starting and ending blocks ocurred.
+    The bets are only grouped once (by provider, game type, and player), and the summaries of each provider (and each game) are combined from the groups.
+    Providers (and games) without any bets have no users, games, bets, or payouts, and no blocks or times.
 
     Args:
         player_bets (Dataframe): Dataframe containing bets to a gambling application.
         providers (List): Values to group in the 'provider' column.
         game_types (List): Values to check in the 'game_type' column.
+        per_game (Boolean): Whether or not to also return a table summarising each game type of each provider (with a column for each provider and game type), default is False.
 
     """
+    selected_bets = player_bets[player_bets['provider'].isin(providers) & player_bets['game_type'].isin(game_types)]
 
-    all_summaries = pd.DataFrame()
-    for provider in providers:
-        provider_bets = player_bets[(player_bets['provider'] == provider) & (player_bets['game_type'].isin(game_types))]
+    # reduce the bets to one row per player of each game of each provider
+    player_games = selected_bets.groupby(['provider', 'game_type', 'player_id'], sort=False, dropna=False).agg(
+        start_block=('block_number', 'min'),
+        end_block=('block_number', 'max'),
+        start=('bet_time', 'min'),
+        end=('bet_time', 'max'),
+    ).reset_index()
 
-        users = len(set(provider_bets["player_id"].values))
-        games = len(set(provider_bets["game_type"].values))
-        bets = provider_bets["bet_size"].sum()
-        payouts = provider_bets["payout_size"].sum()
-        start_block = provider_bets["block_number"].min()
-        end_block = provider_bets["block_number"].max()
-        start = provider_bets["bet_time"].min()
-        end = provider_bets["bet_time"].max()
+    all_summaries = _summarise_player_games(selected_bets, player_games, ['provider'], providers)
+    if not per_game:
+        return all_summaries
 
-        summary = pd.DataFrame()
-        summary['values'] = ['Unique Users', 'Games','Bet Value','Payout Value','Start Block','End Block','Start Time','End Time']
-        summary[provider] = [users, games, bets, payouts, int(start_block), int(end_block), start, end]
+    games = [(provider, game_type) for provider in providers for game_type in game_types]
+    game_summaries = _summarise_player_games(selected_bets, player_games, ['provider', 'game_type'], games)
+    game_summaries.columns = pd.MultiIndex.from_tuples(game_summaries.columns, names=['provider', 'game_type'])
+    return all_summaries, game_summaries
 
 
-        all_summaries['values'] = summary['values']
-        all_summaries[provider] = summary[provider]
+def _summarise_player_games(selected_bets, player_games, groups, columns):
+    """
+    Combines the bets of each player in each game into the summary table of :meth:`summarise_dgapp_providers`, with one column for each group.
+    """
+    summaries = player_games.groupby(groups, sort=False).agg(
+        users=('player_id', 'nunique'),
+        games=('game_type', 'nunique'),
+        start_block=('start_block', 'min'),
+        end_block=('end_block', 'max'),
+        start=('start', 'min'),
+        end=('end', 'max'),
+    )
+    # each group's bets are summed in their original order, so the totals are exactly those of summing the group's rows on their own
+    sums = selected_bets.groupby(groups, sort=False)[['bet_size', 'payout_size']].agg(lambda values: values.sum())
+
+    all_summaries = pd.DataFrame()
+    all_summaries['values'] = ['Unique Users', 'Games','Bet Value','Payout Value','Start Block','End Block','Start Time','End Time']
+    for column in columns:
+        if column not in summaries.index:
+            all_summaries[column] = [0, 0, 0.0, 0.0, None, None, pd.NaT, pd.NaT]
+            continue
+        summary = summaries.loc[column]
+        all_summaries[column] = [
+            int(summary['users']),
+            int(summary['games']),
+            sums.loc[column, 'bet_size'],
+            sums.loc[column, 'payout_size'],
+            int(summary['start_block']),
+            int(summary['end_block']),
+            summary['start'],
+            summary['end'],
+        ]
 
     all_summaries.set_index('values', inplace=True)
     return all_summaries
@@ -358,55 +1319,22 @@ def summarise_dgapp_providers(player_bets, providers, game_types=['coinflip','on
 # Plotting Functions for the Data Module
 # =========================================================
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-plt.style.use('gamba')
-
 def plot_player_career(player_df, savename=None):
     """
         Creates a candlestick-style plot of a players betting activity over the course of their career.
         This works best on regularly-spaced sequential data but can also provide insight into intra-session win/loss patterns.
 
     Args:
-        player_df (Dataframe): Collection of player bets, must include columns 'bet_size','payout_size','bet_time', and 'payout_time'.
+        player_df (Dataframe or TransactionTable): Collection of player bets (e.g. from :meth:`TransactionTable.player`), must include columns 'bet_size' and 'payout_size'.
         savename (String): If given, saves the resulting plot to the name supplied, e.g. 'player_bets.png'.
 
     Returns:
         Matplotlib.pyplot plot object.
 
     """
-    plt.figure(figsize=[5, 3])
-    previous_y_end = 0
-    for i, bet in player_df.iterrows():
-        bet_size = bet["bet_size"]
-        payout_size = bet["payout_size"]
-        bet_time = bet["bet_time"]
-        payout_time = bet["payout_time"]
-
-        start_y = previous_y_end
-        end_y = 0
-
-        # if bet loses
-        if payout_size < bet_size:
-            end_y = start_y - bet_size
-            # plt.plot([2*i, 2*i + 1], [bet_size, payout_size], marker='o', color='red')
-            plt.plot(
-                [i, i], [start_y, end_y], marker="o", color="#d30505", markersize=12
-            )
-        else:
-            end_y = start_y + payout_size
-            # plt.plot([2*i, 2*i + 1], [bet_size, payout_size], marker='o', color='green')
-            plt.plot(
-                [i, i], [start_y, end_y], marker="o", color="#00B007", markersize=12
-            )
-
-        previous_y_end = end_y
-
-    plt.xlabel(None)
-    if savename != None:
-        plt.savefig(savename, dpi=200, transparent=True)
-
-    return plt
+    return gamba.plotting.plot_player_career(
+        np.asarray(player_df["bet_size"]), np.asarray(player_df["payout_size"]), savename=savename
+    )
 
 
 def plot_player_career_split(player_df):
@@ -415,83 +1343,31 @@ def plot_player_career_split(player_df):
     A cumulative value line is also plotted between the two.
 
     Args:
-        player_df (Dataframe): Collection of player bets, must include columns 'bet_size','payout_size','bet_time', and 'payout_time'.
+        player_df (Dataframe or TransactionTable): Collection of player bets (e.g. from :meth:`TransactionTable.player`), must include columns 'bet_size' and 'payout_size'.
         
     Returns:
         Matplotlib.pyplot plot object.
 
     """
-    plt.figure()
-
-    previous_y_end = 0
-    for i, bet in player_df.iterrows():
-        bet_size = bet["bet_size"]
-        payout_size = bet["payout_size"]
-        bet_time = bet["bet_time"]
-        payout_time = bet["payout_time"]
-
-        start_y = previous_y_end
-        end_y = 0
-
-        # if bet loses
-        if payout_size < bet_size:
-            end_y = start_y - bet_size
-            # plt.plot([2*i, 2*i + 1], [bet_size, payout_size], marker='o', color='red')
-            plt.plot([i, i], [start_y, end_y], marker="o", color="red")
-        else:
-            end_y = start_y + payout_size
-            # plt.plot([2*i, 2*i + 1], [bet_size, payout_size], marker='o', color='green')
-            plt.plot([i, i], [start_y, end_y], marker="o", color="green")
-
-        previous_y_end = end_y
-
-    bets = player_df["bet_size"].values
-    payouts = player_df["payout_size"].values
-    plt.plot(
-        range(len(bets)),
-        np.cumsum(-bets),
-        marker="o",
-        color="red",
-        label="Cumulative Bets",
-    )
-    plt.plot(
-        range(len(payouts)),
-        np.cumsum(payouts),
-        marker="o",
-        color="green",
-        label="Cumulative Payouts",
+    return gamba.plotting.plot_player_career_split(
+        np.asarray(player_df["bet_size"]), np.asarray(player_df["payout_size"])
     )
-    plt.legend()
-    plt.xlim(0, len(bets) * 1.02)
-    plt.ylim(-max([sum(bets), sum(payouts)]), max([sum(bets), sum(payouts)]))
-    return plt
 
 
 def visualise_provider_dates(player_bets, providers, provider_labels=None):
     """
     Visualises the start and end dates of bets from one or more providers.
 
-    TODO: finish docs here
+    Args:
+        player_bets (Dataframe): Bets from one or more providers, with the columns 'provider' and 'bet_time'.
+        providers (List of Strings): The providers to plot, from top to bottom.
+        provider_labels (List of Strings): A label for each of the providers, default is None (use the providers' names).
+
+    Returns:
+        Matplotlib.pyplot plot object.
 
     """
-    fig = plt.figure(figsize=[8,1.5])
-    
-    for i, provider in enumerate(providers):
-        print(provider)
-        provider_bets = player_bets[(player_bets['provider'] == provider)]
-        start = provider_bets["bet_time"].min()
-        end = provider_bets["bet_time"].max()
-        
-        plt.plot([start, end], [i,i], label=provider)
-        plt.scatter([start, end], [i,i], s=100, marker='|')
-    
-    ax = fig.axes[0]
-    ax.xaxis.set_major_locator(mdates.MonthLocator([1,4,7,10])) # ticks on first day of each quarter
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y')) # format of only month (3 letter abbr)
+    provider_dates = player_bets.groupby("provider")["bet_time"].agg(["min", "max"]).reindex(providers)
     if provider_labels == None:
-        plt.yticks([0,1,2], providers)
-    else:
-        plt.yticks(range(len(providers)), provider_labels)
-    plt.ylim(-0.5, len(providers)-0.5)
-    plt.grid(True)
-    return plt
\ No newline at end of file
+        provider_labels = providers
+    return gamba.plotting.plot_provider_dates(provider_dates["min"].values, provider_dates["max"].values, provider_labels)
@@ -4,6 +4,7 @@
 # behavioural measures
 
 import numpy as np
+import gamba.reporting
 
 
 def top_split(measures_table, split_by, percentile=95, loud=False):
@@ -36,13 +37,13 @@ def top_split(measures_table, split_by, percentile=95, loud=False):
     ] = 1
 
     if loud:
-        print(
+        gamba.reporting.message(
             "top count:",
             len(
                 labelled_measures_table[labelled_measures_table["top_" + split_by] == 1]
             ),
         )
-        print(
+        gamba.reporting.message(
             "other count:",
             len(
                 labelled_measures_table[labelled_measures_table["top_" + split_by] == 0]
@@ -104,7 +105,7 @@ def spending_portions(measures_table):
 
         top_one_amount = label_members["total_wagered"].sum()
 
-        print(
+        gamba.reporting.message(
             "top",
             percentage,
             "% of players account for",
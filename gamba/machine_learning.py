@@ -4,7 +4,7 @@ import numpy as np, pandas as pd
 from sklearn.cluster import KMeans
 from sklearn.cluster import AgglomerativeClustering
 import statistics
-import matplotlib.pyplot as plt
+import gamba.plotting, gamba.profiling, gamba.reporting
 
 import statsmodels.api as sm
 from sklearn.linear_model import LogisticRegression
@@ -15,6 +15,7 @@ from sklearn.ensemble import RandomForestClassifier
 # statsquest on youtube is useful
 
 
+@gamba.profiling.profiled
 def k_means(measures_table, clusters=4, data_only=False, plot=False, loud=False):
 	"""
 	Applies the k-means clustering algorithm to a measures table.
@@ -63,34 +64,21 @@ def k_means(measures_table, clusters=4, data_only=False, plot=False, loud=False)
 	clustered_data["cluster"] = Kmean.labels_
 
 	if loud:
-		print("variables:", variables)
-		print("centers:", Kmean.cluster_centers_)
-		print("inertia:", Kmean.inertia_)
-		print("silhouette:", silhouette)
+		gamba.reporting.message("variables:", variables)
+		gamba.reporting.message("centers:", Kmean.cluster_centers_)
+		gamba.reporting.message("inertia:", Kmean.inertia_)
+		gamba.reporting.message("silhouette:", silhouette)
 
 	if plot:
-		bars = []
-		heights = []
-		for label in set(sorted(Kmean.labels_)):
-			bars.append(label)
-			heights.append(list(Kmean.labels_).count(label))
-
-		colors = ["C0", "C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9"]
-		plt.bar(bars, heights, color=colors[: len(bars)])
-		plt.title(
-			"\nClusters: "
-			+ str(len(bars))
-			+ "\nInertia: "
+		title = (
+			"Clusters: "
+			+ str(clusters)
+			+ ", Inertia: "
 			+ str(round(Kmean.inertia_))
-			+ "\nIterations: "  # Kmean.inertia_ is the sum of squared distances of samples to their closest cluster center
-			+ str(Kmean.n_iter_),
-			x=1.01,
-			y=0.5,
-			ha="left",
+			+ ", Iterations: "  # Kmean.inertia_ is the sum of squared distances of samples to their closest cluster center
+			+ str(Kmean.n_iter_)
 		)
-		plt.xlabel("Cluster ID")
-		plt.ylabel("Number of Members")
-		plt.show()
+		gamba.plotting.plot_cluster_sizes(Kmean.labels_, title=title).show()
 
 	if data_only:
 		return clustered_data
@@ -98,6 +86,7 @@ def k_means(measures_table, clusters=4, data_only=False, plot=False, loud=False)
 	return clustered_data, Kmean.inertia_, silhouette
 
 
+@gamba.profiling.profiled
 def k_means_range(measures_table, min_clusters=2, max_clusters=13):
 	"""
 	Computes the k_means calculation above across a range of cluster counts, returning their goodness of fit measures (inertia and silhouette).
@@ -130,6 +119,7 @@ def k_means_range(measures_table, min_clusters=2, max_clusters=13):
 	return inertias, silhouettes
 
 
+@gamba.profiling.profiled
 def k_means_ensemble(measures_table, ensemble_size=100, min_clusters=2, max_clusters=13):
 	"""
 	Computes the k_means clustering algorithm across a range of cluster counts, a number of times.
@@ -178,6 +168,7 @@ def k_means_ensemble(measures_table, ensemble_size=100, min_clusters=2, max_clus
 	return ensemble_inertias, ensemble_silhouettes
 
 
+@gamba.profiling.profiled
 def agglomerative_cluster(measures_table, distance_threshold=0, n_clusters=None):
 	"""
 	Performs sklearn's agglomerative clustering algorithm on a dataframe of behavioural measures.
@@ -240,6 +231,7 @@ def describe_clusters(clustered_measures_table, cluster_col="cluster"):
 	return descriptive_table
 
 
+@gamba.profiling.profiled
 def logistic_regression(train_measures, test_measures, label):
 	"""
 	Performs a logistic regression using the `statsmodels library <https://www.statsmodels.org/stable/index.html>`_, returning the predicted labels rounded to the nearest integer.
@@ -276,6 +268,7 @@ def logistic_regression(train_measures, test_measures, label):
 	#print(fit_model.summary())
 	return predicted_labels
 
+@gamba.profiling.profiled
 def lasso_logistic_regression(train_measures, test_measures, label):
 	"""
 	Performs a 'lasso' (optimizes a least-square problem with L1 penalty) logistic regression using `sklearn's linear_model <https://scikit-learn.org/stable/modules/classes.html#module-sklearn.linear_model>`_.
@@ -312,6 +305,7 @@ def lasso_logistic_regression(train_measures, test_measures, label):
 	return predicted_labels
 
 
+@gamba.profiling.profiled
 def svm_eps_regression(train_measures, test_measures, label):
 	"""
 	Creates and trains a support vector machine for epsilon-support vector regression using the sklearn library's implementation.
@@ -348,6 +342,7 @@ def svm_eps_regression(train_measures, test_measures, label):
 	
 	return predicted_labels
 
+@gamba.profiling.profiled
 def svm_c_classification(train_measures, test_measures, label):
 	"""
 
@@ -381,6 +376,7 @@ def svm_c_classification(train_measures, test_measures, label):
 	
 	return predicted_labels
 
+@gamba.profiling.profiled
 def svm_one_classification(train_measures, test_measures, label):
 	"""
 
@@ -418,6 +414,7 @@ def svm_one_classification(train_measures, test_measures, label):
 	return predicted_labels
 
 
+@gamba.profiling.profiled
 def rf_regression(train_measures, test_measures, label):
 
 	"""
@@ -458,6 +455,7 @@ def rf_regression(train_measures, test_measures, label):
 
 	return predicted_labels
 
+@gamba.profiling.profiled
 def rf_classification(train_measures, test_measures, label):
 	"""
 
@@ -548,8 +546,32 @@ def compute_performance(method_name, actual, predicted):
 # =========================================================
 
 
-import scipy.cluster.hierarchy as sch
-import scipy.ndimage.filters as snf
+def linkage_matrix(model):
+	"""
+	Converts a trained agglomerative clustering model into the linkage matrix used by scipy's hierarchical clustering functions, e.g. for :meth:`plot_agglomeration_dendrogram`.
+
+	Args:
+		model (sklearn.cluster model): A trained sklearn.cluster.AgglomerativeClustering model, with its distances computed (e.g. trained with distance_threshold set).
+
+	Returns:
+		2D array with one row per merge, containing the two merged nodes, the distance between them, and the number of players below the merge.
+
+	"""
+	# create the counts of samples under each node
+	counts = np.zeros(model.children_.shape[0])
+	n_samples = len(model.labels_)
+	for i, merge in enumerate(model.children_):
+		current_count = 0
+		for child_idx in merge:
+			if child_idx < n_samples:
+				current_count += 1  # leaf node
+			else:
+				current_count += counts[child_idx - n_samples]
+		counts[i] = current_count
+
+	return np.column_stack(
+		[model.children_, model.distances_, counts]
+	).astype(float)
 
 
 def plot_cluster_sizes(model):
@@ -564,20 +586,8 @@ def plot_cluster_sizes(model):
 		Matplotlib.pyplot plot object.
 
 	"""
-	plt.figure()
-	cluster_ids = list(set(list(model.labels_)))
-	cluster_sizes = [list(model.labels_).count(x) for x in cluster_ids]
-	plt.bar(
-		cluster_ids,
-		cluster_sizes,
-		color=plt.rcParams["axes.prop_cycle"].by_key()["color"],
-	)
-	locs, labels = plt.xticks()
-	plt.xticks(range(len(cluster_ids)), cluster_ids)
-	plt.xlabel("Cluster ID")
-	plt.ylabel("Number of Players per Cluster")
-	plt.grid(axis="x")
-	return plt
+	return gamba.plotting.plot_cluster_sizes(model.labels_)
+
 
 def plot_agglomeration_dendrogram(model, dt_cutoff=None, **kwargs):
 	"""
@@ -592,31 +602,4 @@ def plot_agglomeration_dendrogram(model, dt_cutoff=None, **kwargs):
 		Matplotlib.pyplot plot object.
 
 	"""
-	# Create linkage matrix and then plot the sch.dendrogram
-	# create the counts of samples under each node
-	counts = np.zeros(model.children_.shape[0])
-	n_samples = len(model.labels_)
-	for i, merge in enumerate(model.children_):
-		current_count = 0
-		for child_idx in merge:
-			if child_idx < n_samples:
-				current_count += 1  # leaf node
-			else:
-				current_count += counts[child_idx - n_samples]
-		counts[i] = current_count
-
-	linkage_matrix = np.column_stack(
-		[model.children_, model.distances_, counts]
-	).astype(float)
-
-	# Plot the corresponding dendrogram
-	plt.figure(figsize=(12, 4))
-	plt.title("Hierarchical Clustering dendrogram")
-	sch.dendrogram(linkage_matrix, truncate_mode="level", p=3)
-	if dt_cutoff != None:
-		plt.plot(list(plt.xlim()), [dt_cutoff, dt_cutoff], linestyle="--", color="grey")
-	plt.xlabel("Number of points in node (or index of point if no parenthesis).")
-	plt.ylabel("Distance threshold")
-	plt.grid(False)
-	return plt
-
+	return gamba.plotting.plot_agglomeration_dendrogram(linkage_matrix(model), dt_cutoff=dt_cutoff, **kwargs)
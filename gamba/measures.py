@@ -2,15 +2,16 @@
 
 # dependencies
 import datetime, pandas as pd, numpy as np
-from sklearn.linear_model import LinearRegression
-import scipy.stats
-from tqdm import tqdm
+import concurrent.futures, contextlib, pickle, types
+from gamba.data import TransactionTable
+import gamba.cache
+import gamba.plotting, gamba.profiling, gamba.reporting
 # data checking
 
 
 def check_measure_data(player_bets, required_columns):
 	"""
-	Compares the columns found in a dataframe of player bets to a supplied list of column names.
+	Compares the columns found in a dataframe (or :class:`gamba.data.TransactionTable`) of player bets to a supplied list of column names.
 	If any of the required_column names are not found, an exception is raised reporting the error.
 
 	:param required_columns: The names of columns needed for further calculations.
@@ -24,6 +25,24 @@ def check_measure_data(player_bets, required_columns):
 			raise Exception(exception_string)
 
 
+def _bet_days(bet_times):
+	"""
+	Converts a column of bet times into integer day numbers (days since the epoch), using the same calendar dates as datetime's date method.
+	"""
+	if bet_times.dt.tz is not None:
+		bet_times = bet_times.dt.tz_localize(None)
+	return bet_times.values.astype("datetime64[D]").astype(np.int64)
+
+
+def _player_bet_days(player_bets):
+	"""
+	The day number of each bet in a dataframe or transaction table, using the table's cached days where possible.
+	"""
+	if isinstance(player_bets, TransactionTable):
+		return player_bets.bet_days
+	return _bet_days(player_bets["bet_time"])
+
+
 def standardise_measures_table(measures_table):
 	"""
 	Standardises all measures columns in a measures table by applying the scipy.stats.zscore function to each column.
@@ -37,6 +56,8 @@ def standardise_measures_table(measures_table):
 	"""
 	colnames = list(measures_table.columns)[1:]
 
+	import scipy.stats
+
 	standardised_table = pd.DataFrame()
 	standardised_table["player_id"] = measures_table["player_id"].values
 	for col in colnames:
@@ -61,7 +82,7 @@ def split_measures_table(measures_table, frac=0.7, loud=False):
 	test_table = measures_table.drop(train_table.index)
 
 	if loud:
-		print('train:test\n', len(train_table),':',len(test_table), 'ready')
+		gamba.reporting.message('train:test\n', len(train_table),':',len(test_table), 'ready')
 	
 	return train_table, test_table
 
@@ -74,13 +95,9 @@ def duration(player_bets):
 	The number of days between the first bet and the last.
 	"""
 	check_measure_data(player_bets, ["bet_time"])
-	player_bets.sort_values("bet_time", inplace=True)
-	player_bets.reset_index(drop=True, inplace=True)
-
-	first_day = player_bets.iloc[0]["bet_time"]
-	last_day = player_bets.iloc[len(player_bets) - 1]["bet_time"]
+	bet_days = _player_bet_days(player_bets)
 	# add one to make it interpret as 'days where betting has occurred'
-	age_in_days = (last_day.date() - first_day.date()).days + 1
+	age_in_days = int(bet_days.max() - bet_days.min()) + 1
 	return age_in_days
 
 
@@ -89,24 +106,40 @@ def frequency(player_bets):
 	The percentage of days within the :meth:`duration` that included at least one bet.
 	"""
 	check_measure_data(player_bets, ["bet_time"])
-	player_bets.sort_values("bet_time", inplace=True)
-	player_bets.reset_index(drop=True, inplace=True)
 	age_in_days = duration(player_bets)
 
-	player_bets["bet_date"] = player_bets["bet_time"].dt.date
-	first_day = player_bets.iloc[0]["bet_time"]
-
-	betting_days = 0
-	for day in range(age_in_days):
-		current_date = (first_day + datetime.timedelta(days=day)).date()
-		bets_today = player_bets.iloc[player_bets["bet_date"].values == current_date]
-		if len(bets_today) != 0:
-			betting_days += 1
+	betting_days = len(np.unique(_player_bet_days(player_bets)))
 
 	frequency_percentage = (betting_days / age_in_days) * 100
 	return frequency_percentage
 
 
+def duration_batch(all_player_bets):
+	"""
+	The :meth:`duration` of every player in a dataframe of bets, computed in a single pass.
+
+	Args:
+		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
+
+	Returns:
+		Series of durations indexed by player_id.
+	"""
+	return calculate_measures(all_player_bets, ["duration"]).set_index("player_id")["duration"]
+
+
+def frequency_batch(all_player_bets):
+	"""
+	The :meth:`frequency` of every player in a dataframe of bets, computed in a single pass.
+
+	Args:
+		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
+
+	Returns:
+		Series of frequencies indexed by player_id.
+	"""
+	return calculate_measures(all_player_bets, ["frequency"]).set_index("player_id")["frequency"]
+
+
 def number_of_bets(player_bets):
 	"""
 	The total number of bets made.
@@ -209,55 +242,64 @@ def average_bet_size_daily(player_bets):
 
 # braverman measures
 
-def intensity_daily(player_bets):
+def _first_window_bets(player_bets, window=30):
 	"""
-	Mean number of bets per active betting day in first month, if data set contains daily aggregate data.
+	The bets made within a number of days of the player's first bet (inclusive), default is 30 (the first month).
 	"""
+	if isinstance(player_bets, TransactionTable):
+		bet_times = player_bets["bet_time"]
+		last_day = bet_times[0] + np.timedelta64(window, "D")
+		return player_bets.head(np.searchsorted(bet_times, last_day, side="right"))
 
 	first_day = player_bets.iloc[0]["bet_time"]
-	one_month_later = first_day + datetime.timedelta(days=+30)
-	first_month_bets = player_bets[player_bets["bet_time"] <= one_month_later]
+	last_day = first_day + datetime.timedelta(days=window)
+	return player_bets[player_bets["bet_time"] <= last_day]
+
+
+def intensity_daily(player_bets, window=30):
+	"""
+	Mean number of bets per active betting day in first month, if data set contains daily aggregate data.
+	The length of the first 'month' can be changed using the window parameter (in days).
+	"""
+
+	first_month_bets = _first_window_bets(player_bets, window)
 	result = first_month_bets["bet_count"].mean()
 	return result
 
 
-def frequency_daily(player_bets):
+def frequency_daily(player_bets, window=30):
 	"""
 	Number of active betting days in first month, if data set contains daily aggregate data.
 	"""
 
-	first_day = player_bets.iloc[0]["bet_time"]
-	one_month_later = first_day + datetime.timedelta(days=+30)
-	first_month_bets = player_bets[player_bets["bet_time"] <= one_month_later]
+	first_month_bets = _first_window_bets(player_bets, window)
 
 	return len(first_month_bets)
 
 
-def variability_daily(player_bets):
+def variability_daily(player_bets, window=30):
 	"""
 	Standard deviation of stake size in first month, if data set contains daily aggregate data.
 	"""
 
-	first_day = player_bets.iloc[0]["bet_time"]
-	one_month_later = first_day + datetime.timedelta(days=+30)
-	first_month_bets = player_bets[player_bets["bet_time"] <= one_month_later]
+	first_month_bets = _first_window_bets(player_bets, window)
 
-	return first_month_bets["bet_size"].std()
+	return pd.Series(first_month_bets["bet_size"]).std()
 
 
-def trajectory_daily(player_bets, plot=False):
+def trajectory_daily(player_bets, plot=False, window=30):
 	"""
 	Gradient of a linear regression fitted to the sequence of daily aggredated bet sizes.
 	"""
 
-	first_day = player_bets.iloc[0]["bet_time"]
-	one_month_later = first_day + datetime.timedelta(days=+30)
-	first_month_bets = player_bets[player_bets["bet_time"] <= one_month_later]
+	first_month_bets = _first_window_bets(player_bets, window)
 
 	# first_month_bets['mean_bet_size'] = first_month_bets['bet_size'] / first_month_bets['bet_count']
 
 	x = np.array(range(len(first_month_bets))).reshape((-1, 1)) + 1
-	y = first_month_bets["bet_size"].values
+	y = np.asarray(first_month_bets["bet_size"])
+
+	from sklearn.linear_model import LinearRegression
 
 	model = LinearRegression().fit(x, y)
 	r_sq = model.score(x, y)
@@ -266,10 +308,7 @@ def trajectory_daily(player_bets, plot=False):
 	model_y = model.coef_ * x + model.intercept_
 
 	if plot:
-		plt.figure()
-		plt.scatter(x, y)
-		plt.plot(model_x, model_y, color="r")
-		plt.show()
+		gamba.plotting.plot_trajectory(x.ravel(), y, model_y.ravel()).show()
 
 	trajectory = model.coef_[0]
 	return model.coef_[0]
@@ -277,85 +316,573 @@ def trajectory_daily(player_bets, plot=False):
 
 
 
+# =========================================================
+# Segment Reduction Engine for Collections of Players
+# =========================================================
+
+# every measure which can be calculated for a whole cohort of players at once, see register_measure
+_measure_registry = {}
+
+
+def _reduceat(ufunc, values, starts, stops):
+	"""
+	Applies a numpy ufunc's reduceat method to the rows between each start and stop, which must be non-empty and must not overlap.
+	"""
+	indices = np.empty(2 * len(starts), dtype=np.intp)
+	indices[0::2] = starts
+	indices[1::2] = stops
+	# reduceat runs the last segment to the end of the array by itself
+	if len(indices) != 0 and indices[-1] == len(values):
+		indices = indices[:-1]
+	return ufunc.reduceat(values, indices)[0::2]
+
+
+def _segment_sum(values, starts, stops):
+	return _reduceat(np.add, values, starts, stops)
+
+
+def _segment_count(values, starts, stops):
+	return stops - starts
+
+
+def _segment_min(values, starts, stops):
+	return _reduceat(np.minimum, values, starts, stops)
+
+
+def _segment_max(values, starts, stops):
+	return _reduceat(np.maximum, values, starts, stops)
+
+
+def _segment_first(values, starts, stops):
+	return values[starts]
+
+
+def _segment_last(values, starts, stops):
+	return values[stops - 1]
+
+
+def _segment_mean(values, starts, stops):
+	return _segment_sum(values, starts, stops) / (stops - starts)
+
+
+def _segment_std(values, starts, stops):
+	# sample standard deviation (as pandas' std), which is undefined for a single value
+	counts = stops - starts
+	means = _segment_mean(values, starts, stops)
+	block_lengths = np.diff(np.append(starts, len(values)))
+	squared_deviations = (values - np.repeat(means, block_lengths)) ** 2
+	with np.errstate(divide="ignore", invalid="ignore"):
+		variances = _segment_sum(squared_deviations, starts, stops) / (counts - 1)
+	variances[counts < 2] = np.nan
+	return np.sqrt(variances)
+
+
+def _segment_distinct_days(values, starts, stops):
+	if np.issubdtype(values.dtype, np.datetime64):
+		values = values.astype("datetime64[D]")
+	new_value = np.ones(len(values), dtype=bool)
+	new_value[1:] = values[1:] != values[:-1]
+	new_value[starts] = True
+	return _reduceat(np.add, new_value.astype(np.int64), starts, stops)
+
+
+def _segment_slope(values, starts, stops):
+	# gradient of the least squares line through each segment's values against their positions 1, 2, ..., n (as in trajectory_daily),
+	# computed from the sums of x, y, xy, and x squared instead of fitting a model to each segment
+	block_lengths = np.diff(np.append(starts, len(values)))
+	positions = np.arange(1, len(values) + 1) - np.repeat(starts, block_lengths)
+
+	n = (stops - starts).astype(np.float64)
+	sum_x = n * (n + 1) / 2
+	sum_x_squared = n * (n + 1) * (2 * n + 1) / 6
+	sum_y = _segment_sum(values.astype(np.float64), starts, stops)
+	sum_xy = _segment_sum(positions * values.astype(np.float64), starts, stops)
+
+	numerator = n * sum_xy - sum_x * sum_y
+	denominator = n * sum_x_squared - sum_x ** 2
+	# a single value has no trend, which a linear regression reports as a gradient of zero
+	with np.errstate(divide="ignore", invalid="ignore"):
+		slopes = np.where(denominator != 0, numerator / denominator, 0.0)
+	return slopes
+
+
+_segment_reductions = {
+	"sum": _segment_sum,
+	"count": _segment_count,
+	"min": _segment_min,
+	"max": _segment_max,
+	"first": _segment_first,
+	"last": _segment_last,
+	"mean": _segment_mean,
+	"std": _segment_std,
+	"distinct_days": _segment_distinct_days,
+	"slope": _segment_slope,
+}
+
+
+def register_measure(name, reduction=None, column=None, window=None, function=None, requires=None):
+	"""
+	Registers a measure so that it can be calculated for every player at once using :meth:`calculate_measures`.
+	A measure is either a reduction over a column of each player's time-sorted bets, or a function of other registered measures.
+
+	Reductions can be one of 'sum', 'count', 'min', 'max', 'first', 'last', 'mean', 'std', 'distinct_days', or 'slope'.
+	A custom reduction can also be given as a function taking a column's values (a numpy array sorted by player then bet time) and the arrays of start and stop rows of each player, returning one value per player.
+	The column 'bet_day' is also available to reductions, containing the day number of each bet.
+
+	Args:
+		name (String): The name of the measure, e.g. 'total_wagered'.
+		reduction (String or Function): The reduction to apply to each player's values of the column.
+		column (String): The column to reduce, e.g. 'bet_size'.
+		window (Integer): If given, only reduce over bets made within this many days of the player's first bet (inclusive), e.g. 30 for the first month.
+		function (Function): For measures derived from other measures, a function taking a dictionary of the required measures' values (one array per measure) and returning the new measure's values.
+		requires (List of Strings): The names of the registered measures the function needs.
+
+	"""
+	if (reduction is None) == (function is None):
+		raise Exception("Measure '" + name + "' needs either a reduction or a function.")
+	if isinstance(reduction, str) and reduction not in _segment_reductions:
+		raise Exception("Reduction '" + reduction + "' is not a known reduction.")
+
+	_measure_registry[name] = {
+		"reduction": reduction,
+		"column": column,
+		"window": window,
+		"function": function,
+		"requires": list(requires or []),
+	}
+
+
+@gamba.profiling.profiled
+def calculate_measures(all_player_bets, measures, workers=1, window=None, cache=None, players=None):
+	"""
+	Calculates a collection of registered measures for every player in a dataframe of bets.
+	The bets are sorted once by player and bet time (unless a :class:`gamba.data.TransactionTable` is given), and each measure is then evaluated as a reduction over every player's block of rows at once.
+
+	If more than one worker is requested, players are split into shards by a hash of their player_id and each shard is calculated in its own process.
+	The result is identical to calculating all players in a single process.
+	Custom measures need to be registered when their module is imported for worker processes to find them on platforms which spawn new processes (Windows and macOS).
+
+	Args:
+		all_player_bets (Dataframe or TransactionTable): All of the bets made by all of the players in the data set.
+		measures (List of Strings or Dictionary): The names of the registered measures to calculate, or a dictionary mapping the desired column names to the names of registered measures.
+		workers (Integer): The number of processes to calculate the measures with, default is 1.
+		window (Integer): If given, the number of days used by every windowed measure instead of the window it was registered with.
+		cache (Boolean or String): Whether or not to reuse measures tables previously calculated from identical bets, or the directory to cache them in (see :mod:`gamba.cache`), default is None (no caching). Measures which use objects other than functions, literals, arrays and tables are always recalculated.
+		players (List): The ids of the players to calculate the measures for, default is None (every player). A table's bets are found using its :class:`gamba.data.PlayerIndex` instead of searching every bet.
+
+	Returns:
+		Dataframe with a 'player_id' column and one column per measure, with one row per player in the order of the table's players (sorted by player_id when a dataframe is given), whatever the number of workers.
+
+	"""
+	if not isinstance(measures, dict):
+		measures = {name: name for name in measures}
+
+	if players is not None:
+		if isinstance(all_player_bets, TransactionTable):
+			all_player_bets = all_player_bets.select_players(players)
+		else:
+			check_measure_data(all_player_bets, ["player_id"])
+			all_player_bets = all_player_bets[all_player_bets["player_id"].isin(players)]
+
+	if cache:
+		try:
+			definitions = {column_name: _measure_definition(name) for column_name, name in measures.items()}
+		except _UncacheableMeasure as error:
+			gamba.reporting.message(str(error), "Calculating them without the cache.")
+			return calculate_measures(all_player_bets, measures, workers=workers, window=window)
+		cache_dir = cache if isinstance(cache, str) else None
+		with gamba.profiling.stage("load_cache"):
+			key = gamba.cache.cache_key(gamba.cache.fingerprint(all_player_bets), definitions, {"window": window})
+			measures_table = gamba.cache.load(key, cache_dir)
+		if measures_table is None:
+			measures_table = calculate_measures(all_player_bets, measures, workers=workers, window=window)
+			with gamba.profiling.stage("store_cache"):
+				gamba.cache.store(key, measures_table, cache_dir)
+		return measures_table
+
+	if workers > 1:
+		return _calculate_measures_in_parallel(all_player_bets, measures, workers, window)
+
+	if isinstance(all_player_bets, TransactionTable):
+		table = all_player_bets
+	else:
+		check_measure_data(all_player_bets, ["player_id", "bet_time"])
+		with gamba.profiling.stage("sort"):
+			table = TransactionTable(all_player_bets)
+	starts = table.starts
+	player_stops = table.stops
+
+	window_stops = {}
+	columns = {}
+	values = {}
+
+	def get_column(name):
+		if name == "bet_day":
+			return table.bet_days
+		if name not in columns:
+			check_measure_data(table, [name])
+			column = table[name]
+			# compact columns (see gamba.data.compact_transactions) are widened once so that reductions don't overflow or lose precision
+			if column.dtype.kind in "iuf" and column.dtype.itemsize < 8:
+				column = column.astype(np.float64 if column.dtype.kind == "f" else np.int64)
+			columns[name] = column
+		return columns[name]
+
+	def get_stops(measure_window):
+		if measure_window is None:
+			return player_stops
+		if window is not None:
+			measure_window = window
+		if measure_window not in window_stops:
+			window_stops[measure_window] = _window_stops(get_column("bet_time"), starts, player_stops, measure_window)
+		return window_stops[measure_window]
+
+	def reduce(measure):
+		reduction = measure["reduction"]
+		if isinstance(reduction, str):
+			reduction = _segment_reductions[reduction]
+		return reduction(get_column(measure["column"]), starts, get_stops(measure["window"]))
+
+	measures_table = pd.DataFrame({"player_id": table.player_ids})
+	with gamba.reporting.stage("calculate_measures", unit="measures") as progress:
+		for column_name, name in measures.items():
+			with gamba.profiling.stage("measure:" + name):
+				measures_table[column_name] = _evaluate_measure(name, values, reduce)
+			progress.update()
+		progress.update(0, rows=len(table), players=len(starts))
+
+	return measures_table
+
+
+def _measure_definition(name):
+	"""
+	Describes how a registered measure (and every measure it requires) is calculated, in a form which stays the same between sessions.
+	"""
+	if name not in _measure_registry:
+		raise Exception("Measure '" + name + "' has not been registered.")
+	measure = _measure_registry[name]
+
+	definition = []
+	for part in ["reduction", "column", "window", "function"]:
+		value = measure[part]
+		if callable(value):
+			value = _function_definition(value, set())
+		definition.append(value)
+	definition.append([_measure_definition(required_name) for required_name in measure["requires"]])
+	return repr(definition)
+
+
+def _code_definition(code):
+	"""
+	The bytecode, constants, and names of a code object and the code objects nested inside it (e.g. comprehensions).
+	"""
+	constants = [_code_definition(constant) if isinstance(constant, types.CodeType) else repr(constant) for constant in code.co_consts]
+	return (code.co_code, constants, code.co_names)
+
+
+def _code_names(code):
+	"""
+	Every global (or attribute) name used by a code object or the code objects nested inside it.
+	"""
+	names = set(code.co_names)
+	for constant in code.co_consts:
+		if isinstance(constant, types.CodeType):
+			names |= _code_names(constant)
+	return names
+
+
+class _UncacheableMeasure(Exception):
+	"""
+	Raised when a measure uses a value which can't be described the same way in every session, so its results can't be cached.
+	"""
+
+
+# values which are described by their repr, which is the same in every session and includes all of their contents
+_literal_types = (type(None), bool, int, float, complex, str, bytes, np.generic)
+
+
+def _value_definition(value, seen):
+	"""
+	Describes a value used by a measure's function, following functions into their own definitions and hashing the contents of arrays and tables.
+	Raises an _UncacheableMeasure exception for any other object, whose repr may be shortened or include its memory address.
+	"""
+	if isinstance(value, types.FunctionType):
+		return _function_definition(value, seen)
+	if isinstance(value, types.ModuleType):
+		return ("module", value.__name__)
+	if isinstance(value, _literal_types):
+		return repr(value)
+	if isinstance(value, (tuple, list, set, frozenset)):
+		items = [_value_definition(item, seen) for item in value]
+		return (type(value).__name__, sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+	if isinstance(value, dict):
+		return ("dict", sorted((repr(key), _value_definition(item, seen)) for key, item in value.items()))
+	if isinstance(value, np.ndarray):
+		return ("ndarray", str(value.dtype), value.shape, gamba.cache.fingerprint(pd.DataFrame({"values": value.reshape(-1)})))
+	if isinstance(value, (pd.Series, pd.Index)):
+		return (type(value).__name__, repr(value.name), _value_definition(value.to_numpy(), seen), _value_definition(getattr(value, "index", None), seen))
+	if isinstance(value, pd.DataFrame):
+		return ("DataFrame", gamba.cache.fingerprint(value), _value_definition(value.index, seen))
+	if isinstance(value, type) or (callable(value) and not isinstance(value, types.MethodType) and hasattr(value, "__qualname__")):
+		# classes, builtins and numpy ufuncs are described by their name
+		return (getattr(value, "__module__", None), value.__qualname__)
+	raise _UncacheableMeasure("A measure uses " + type(value).__name__ + " objects, whose results can't be cached.")
+
+
+def _function_definition(function, seen):
+	"""
+	Describes a function by its code, its defaults, the values in its closure, and the globals it uses, including (recursively) the code of any helper functions it calls.
+	A function which is already being described (e.g. a recursive helper) is only described by its name.
+	"""
+	if not isinstance(function, types.FunctionType):
+		return _value_definition(function, seen)
+	if function in seen:
+		return (function.__module__, function.__qualname__)
+	seen.add(function)
+
+	code = function.__code__
+	closure = [_value_definition(cell.cell_contents, seen) for cell in function.__closure__ or []]
+	used_globals = {
+		global_name: _value_definition(function.__globals__[global_name], seen)
+		for global_name in sorted(_code_names(code))
+		if global_name in function.__globals__
+	}
+	defaults = _value_definition(function.__defaults__ or (), seen)
+	return (function.__module__, function.__qualname__, _code_definition(code), defaults, closure, used_globals)
+
+
+def _window_stops(bet_times, starts, stops, window):
+	"""
+	Finds the row after the last bet made within a number of days of each player's first bet.
+	Each player's bets are sorted by time, so the bets in their window are the first rows of their block, and counting them for every player at once gives the stops.
+	"""
+	times = bet_times.view(np.int64)
+	time_unit = np.datetime_data(bet_times.dtype)[0]
+	window_length = np.timedelta64(window, "D").astype("timedelta64[" + time_unit + "]").astype(np.int64)
+	offsets = times - np.repeat(times[starts], stops - starts)
+	return starts + _segment_sum((offsets <= window_length).astype(np.intp), starts, stops)
+
+
+def _evaluate_measure(name, values, reduce):
+	"""
+	Evaluates a registered measure, storing it and any measures it requires in the values dictionary.
+	Measures defined by a reduction are computed by calling the reduce function with the measure's registered definition.
+	"""
+	if name not in values:
+		if name not in _measure_registry:
+			raise Exception("Measure '" + name + "' has not been registered.")
+		measure = _measure_registry[name]
+		if measure["function"] is not None:
+			required = {required_name: _evaluate_measure(required_name, values, reduce) for required_name in measure["requires"]}
+			values[name] = measure["function"](required)
+		else:
+			values[name] = reduce(measure)
+	return values[name]
+
+
+def _calculate_measures_in_parallel(all_player_bets, measures, workers, window):
+	"""
+	Calculates measures for shards of players (split by a hash of their player_id) in a pool of processes, concatenating the results in the same player order as a single process would.
+	"""
+	check_measure_data(all_player_bets, ["player_id"])
+	if isinstance(all_player_bets, TransactionTable):
+		player_hashes = pd.util.hash_array(all_player_bets.player_ids)
+	else:
+		player_hashes = pd.util.hash_pandas_object(all_player_bets["player_id"], index=False).values
+	shards = player_hashes % np.uint64(workers)
+
+	shard_tables = []
+	shard_positions = []
+	with concurrent.futures.ProcessPoolExecutor(max_workers=workers, **gamba.reporting.worker_options()) as executor:
+		futures = {}
+		for shard in range(workers):
+			if isinstance(all_player_bets, TransactionTable):
+				shard_bets = all_player_bets.select(shards == shard)
+			else:
+				shard_bets = all_player_bets[shards == shard]
+			if len(shard_bets) != 0:
+				futures[executor.submit(calculate_measures, shard_bets, measures, window=window)] = (shard, len(shard_bets))
+
+		with gamba.reporting.stage("calculate_measures", total=len(futures), unit="shards") as progress:
+			for future in concurrent.futures.as_completed(futures):
+				shard, rows = futures[future]
+				shard_table = future.result()
+				shard_tables.append(shard_table)
+				if isinstance(all_player_bets, TransactionTable):
+					# a shard keeps the order of its players in the table, so its rows go back to their positions in the table
+					shard_positions.append(np.flatnonzero(shards == shard))
+				progress.update(players=len(shard_table), rows=rows)
+
+	if not shard_tables:
+		return calculate_measures(all_player_bets, measures, window=window)
+
+	measures_table = pd.concat(shard_tables, ignore_index=True)
+	if isinstance(all_player_bets, TransactionTable):
+		measures_table = measures_table.iloc[np.argsort(np.concatenate(shard_positions), kind="stable")]
+	else:
+		# a dataframe is sorted by player_id before a single process calculates its measures
+		measures_table = measures_table.sort_values("player_id", kind="mergesort")
+	return measures_table.reset_index(drop=True)
+
+
+def _betting_days(measures):
+	# recover the betting days from the frequency in the same way as the single player measures do
+	return (measures["frequency"] / 100) * measures["duration"]
+
+
+register_measure("first_bet_time", reduction="first", column="bet_time")
+register_measure("last_bet_time", reduction="last", column="bet_time")
+register_measure("first_bet_day", reduction="first", column="bet_day")
+register_measure("last_bet_day", reduction="last", column="bet_day")
+register_measure("distinct_betting_days", reduction="distinct_days", column="bet_day")
+register_measure("total_payout", reduction="sum", column="payout_size")
+
+register_measure("duration", function=lambda m: m["last_bet_day"] - m["first_bet_day"] + 1, requires=["first_bet_day", "last_bet_day"])
+register_measure("frequency", function=lambda m: (m["distinct_betting_days"] / m["duration"]) * 100, requires=["distinct_betting_days", "duration"])
+register_measure("number_of_bets", reduction="count", column="bet_time")
+register_measure("number_of_bets_daily", reduction="sum", column="bet_count")
+register_measure("average_bets_per_day", function=lambda m: m["number_of_bets"] / _betting_days(m), requires=["number_of_bets", "frequency", "duration"])
+register_measure("average_bets_per_day_daily", function=lambda m: m["number_of_bets_daily"] / _betting_days(m), requires=["number_of_bets_daily", "frequency", "duration"])
+register_measure("total_wagered", reduction="sum", column="bet_size")
+register_measure("average_bet_size", function=lambda m: m["total_wagered"] / m["number_of_bets"], requires=["total_wagered", "number_of_bets"])
+register_measure("average_bet_size_daily", function=lambda m: m["total_wagered"] / m["number_of_bets_daily"], requires=["total_wagered", "number_of_bets_daily"])
+register_measure("net_loss", function=lambda m: m["total_wagered"] - m["total_payout"], requires=["total_wagered", "total_payout"])
+register_measure("percent_loss", function=lambda m: (m["net_loss"] / m["total_wagered"]) * 100, requires=["net_loss", "total_wagered"])
+
+register_measure("intensity_daily", reduction="mean", column="bet_count", window=30)
+register_measure("frequency_daily", reduction="count", column="bet_time", window=30)
+register_measure("variability_daily", reduction="std", column="bet_size", window=30)
+register_measure("trajectory_daily", reduction="slope", column="bet_size", window=30)
+
+# the measures calculated over each player's first window (the first month by default)
+_first_window_measure_names = {
+	"intensity": "intensity_daily",
+	"frequency": "frequency_daily",
+	"variability": "variability_daily",
+	"trajectory": "trajectory_daily",
+}
+
+
+
+
+@gamba.profiling.profiled
+def calculate_first_window_measures(all_player_bets, window=30, workers=1, players=None):
+	"""
+	Calculates every first window measure (intensity, frequency, variability, and trajectory) for every player at once.
+	Each player's window is found once, and all of the measures are computed from the same slice of their bets.
+
+	Args:
+		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
+		window (Integer): The length of the window after each player's first bet in days, default is 30 (the first month).
+		workers (Integer): The number of processes to calculate the measures with, default is 1 (see :meth:`calculate_measures`).
+		players (List): The ids of the players to calculate the measures for, default is None (every player).
+
+	Returns:
+		Dataframe of first window measures, in the same player order as :meth:`calculate_measures`.
+	"""
+	return calculate_measures(all_player_bets, _first_window_measure_names, workers=workers, window=window, players=players)
+
+
+def trajectory_daily_batch(all_player_bets):
+	"""
+	The :meth:`trajectory_daily` of every player in a dataframe of bets, computed in a single pass from grouped sums instead of fitting a linear regression per player.
+	Use :meth:`trajectory_daily` to plot the fit for a single player.
+
+	Args:
+		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
+
+	Returns:
+		Series of trajectories indexed by player_id.
+	"""
+	return calculate_measures(all_player_bets, ["trajectory_daily"]).set_index("player_id")["trajectory_daily"]
+
+
+
+
 # =========================================================
 # Collections of Measures from Published Studies
 # =========================================================
 
 
-def calculate_labrie_measures(all_player_bets, savedir="", filename="gamba_labrie_measures.csv", loud=False, daily=True,):
+def labrie_measure_names(daily=True):
+	"""
+	The LaBrie measures table's column names mapped to the registered measures which calculate them, which can be passed to :meth:`calculate_measures` to calculate the table without saving it.
+
+	Args:
+		daily (Boolean): Whether to use the daily aggregate versions of the measures, default is True.
+
+	Returns:
+		Dictionary of column names and registered measure names.
+
+	"""
+	labrie_measures = {
+		"duration": "duration",
+		"frequency": "frequency",
+		"num_bets": "number_of_bets",
+		"average_bets_per_day": "average_bets_per_day",
+		"average_bet_size": "average_bet_size",
+		"total_wagered": "total_wagered",
+		"net_loss": "net_loss",
+		"percent_loss": "percent_loss",
+	}
+	if daily:
+		labrie_measures["num_bets"] = "number_of_bets_daily"
+		labrie_measures["average_bets_per_day"] = "average_bets_per_day_daily"
+		labrie_measures["average_bet_size"] = "average_bet_size_daily"
+	return labrie_measures
+
+
+@gamba.profiling.profiled
+def calculate_labrie_measures(all_player_bets, savedir="", filename="gamba_labrie_measures.csv", loud=False, daily=True, workers=1, cache=None, players=None):
 	"""
 	Calculates the set of measures described in LaBrie et al's work in 2008 on casino gamblers.
 	These measures include the durations, frequencies, number of bets, bets per day, value per bet (eth), total amount wagered, net loss, and percent loss for each player.
 	As this method sits in the studies module, it accepts a list of dataframes representing each player's bets as input.
 	By default, this method saves the resulting dataframe of each player's measures to 'gamba_labrie_measures.csv'.
-	Be advised: this method can take some time for large numbers of players, the 'loud' parameter can be set to True to print out updates every 200 players.
+	The measures are calculated for every player at once using :meth:`calculate_measures`, so large data sets can be processed in a single pass.
 
 	Args:
 		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
 		savedir (String): The directory in which to save the resulting labrie measures dataframe, default is ''.
+		filename (String): The name of the file to save the resulting labrie measures dataframe to, default is 'gamba_labrie_measures.csv'.
 		loud (Boolean): Whether or not to output status updates as the function progresses, default is False.
+		daily (Boolean): Whether the bets are daily aggregates (with a 'bet_count' column) or individual transactions, default is True.
+		workers (Integer): The number of processes to calculate the measures with, default is 1 (see :meth:`calculate_measures`).
+		cache (Boolean or String): Whether or not to reuse a previously calculated table for identical bets, or the directory to cache it in (see :meth:`calculate_measures`), default is None.
+		players (List): The ids of the players to calculate the measures for, default is None (every player).
 
 	"""
+	labrie_measures = calculate_measures(all_player_bets, labrie_measure_names(daily), workers=workers, cache=cache, players=players)
+	with gamba.profiling.stage("to_csv"):
+		labrie_measures.to_csv(savedir + filename, index=False)
 
-	# load in all files (can take some time)
-
-	player_id = []
-	all_duration = []
-	all_frequency = []
-	all_number_of_bets = []
-	all_average_bets_per_day = []
-	all_average_bet_size = []
-	all_total_wagered = []
-	all_net_loss = []
-	all_percent_loss = []
+	if loud:
+		gamba.reporting.message("LaBrie measures saved")
 
-	unique_players = list(set(all_player_bets["player_id"]))
+	return labrie_measures
 
-	print(
-		"calculating LaBrie measures for",
-		len(unique_players),
-		"players, this may take some time...",
-	)
 
-	for i in tqdm(range(len(unique_players))):
-		player_bets = all_player_bets[all_player_bets["player_id"] == unique_players[i]]
-		player_id.append(player_bets.iloc[0]["player_id"])
-		all_duration.append(duration(player_bets))
-		all_frequency.append(frequency(player_bets))
-		if daily:
-			all_number_of_bets.append(number_of_bets_daily(player_bets))
-			all_average_bets_per_day.append(average_bets_per_day_daily(player_bets))
-			all_average_bet_size.append(average_bet_size_daily(player_bets))
-		else:
-			all_number_of_bets.append(number_of_bets(player_bets))
-			all_average_bets_per_day.append(average_bets_per_day(player_bets))
-			all_average_bet_size.append(average_bet_size(player_bets))
-		all_total_wagered.append(total_wagered(player_bets))
-		all_net_loss.append(net_loss(player_bets))
-		all_percent_loss.append(percent_loss(player_bets))
-
-	labrie_dict = {
-		"player_id": player_id,
-		"duration": all_duration,
-		"frequency": all_frequency,
-		"num_bets": all_number_of_bets,
-		"average_bets_per_day": all_average_bets_per_day,
-		"average_bet_size": all_average_bet_size,
-		"total_wagered": all_total_wagered,
-		"net_loss": all_net_loss,
-		"percent_loss": all_percent_loss,
-	}
+def braverman_measure_names():
+	"""
+	The Braverman measures table's column names mapped to the registered measures which calculate them, which can be passed to :meth:`calculate_measures` to calculate the table without saving it.
 
-	labrie_measures = pd.DataFrame.from_dict(labrie_dict)
-	labrie_measures.to_csv(savedir + filename, index=False)
+	Returns:
+		Dictionary of column names and registered measure names.
 
-	if loud:
-		print("LaBrie measures saved")
+	"""
+	return {
+		**_first_window_measure_names,
+		"sum_of_stakes": "total_wagered",
+		"total_num_bets": "number_of_bets_daily",
+		"average_bet_size": "average_bet_size_daily",
+		"duration": "duration",
+		"net_loss": "net_loss",
+	}
 
-	return labrie_measures
 
 
-def calculate_braverman_measures(all_player_bets, savedir="", loud=False):
+@gamba.profiling.profiled
+def calculate_braverman_measures(all_player_bets, savedir="", loud=False, workers=1, window=30, cache=None, players=None):
 	"""
 	Calculates the set of measures described in Braverman and Shaffer's work in 2010 on high risk internet gamblers.
 	These measures include the frequency, intensity, variability, and trajectories of each player.
@@ -366,55 +893,25 @@ def calculate_braverman_measures(all_player_bets, savedir="", loud=False):
 		all_player_bets (Dataframe): All of the bets made by all of the players in the data set.
 		savedir (String): The directory in which to save the resulting Braverman measures dataframe, default is ''.
 		loud (Boolean): Whether or not to output status updates as the function progresses, default is False.
+		workers (Integer): The number of processes to calculate the measures with, default is 1 (see :meth:`calculate_measures`).
+		window (Integer): The length of the first 'month' used by the intensity, frequency, variability, and trajectory measures in days, default is 30.
+		cache (Boolean or String): Whether or not to reuse a previously calculated table for identical bets, or the directory to cache it in (see :meth:`calculate_measures`), default is None.
+		players (List): The ids of the players to calculate the measures for, default is None (every player).
 
 	"""
-	player_id = []
-
-	intensity = []
-	variability = []
-	frequency = []
-	trajectory = []
-
-	sum_of_stakes = []
-	total_num_bets = []
-	average_bet_size = []
-	duration = []
-	net_loss = []
-
-	unique_players = list(set(all_player_bets["player_id"]))
-
-	for i in tqdm(range(len(unique_players))):
-		player_bets = all_player_bets[all_player_bets["player_id"] == unique_players[i]]
-
-		player_id.append(player_bets.iloc[0]["player_id"])
-		intensity.append(intensity_daily(player_bets))
-		frequency.append(frequency_daily(player_bets))
-		variability.append(variability_daily(player_bets))
-		trajectory.append(trajectory_daily(player_bets))
-
-		sum_of_stakes.append(player_bets["bet_size"].sum())
-		total_num_bets.append(player_bets["bet_count"].sum())
-		average_bet_size.append(
-			player_bets["bet_size"].sum() / player_bets["bet_count"].sum()
-		)
-		duration.append(duration(player_bets))
-		net_loss.append(net_loss(player_bets))
-
-	braverman_dict = {
-		"player_id": player_id,
-		"intensity": intensity,
-		"frequency": frequency,
-		"variability": variability,
-		"trajectory": trajectory,
-		"sum_of_stakes": sum_of_stakes,
-		"total_num_bets": total_num_bets,
-		"average_bet_size": average_bet_size,
-		"duration": duration,
-		"net_loss": net_loss,
-	}
+	braverman_measures = calculate_measures(
+		all_player_bets,
+		braverman_measure_names(),
+		workers=workers,
+		window=window,
+		cache=cache,
+		players=players,
+	)
+	with gamba.profiling.stage("to_csv"):
+		braverman_measures.to_csv(savedir + "gamba_braverman_measures.csv", index=False)
 
-	braverman_measures = pd.DataFrame.from_dict(braverman_dict)
-	braverman_measures.to_csv(savedir + "gamba_braverman_measures.csv", index=False)
+	if loud:
+		gamba.reporting.message("Braverman measures saved")
 
 	return braverman_measures
 
@@ -422,259 +919,330 @@ def calculate_braverman_measures(all_player_bets, savedir="", loud=False):
 
 
 # =========================================================
-# Plotting Functions for the Measures Module
+# Incremental Measures for Growing Data Sets
 # =========================================================
 
-import matplotlib.pyplot as plt
-plt.style.use('gamba')
 
-
-def plot_measure_hist(measures, name):
+class MeasureAccumulator:
 	"""
-	Plots a histogram for a named measure from a dataframe of measures.
+	Keeps a compact running summary of each player's bets so that the LaBrie measures table can be updated with new batches of bets (e.g. each new day of data), without recalculating over the full history.
+	The summary holds each player's first and last bet times, a bitmap of the days they bet on, and the sums and counts needed by the measures.
 
-	Args:
-		measures (Dataframe): Collection of behavioural measures for a cohort of players.
-		name (String): The name of the measure to plot, e.g. 'duration'.
-
-	Returns:
-		Matplotlib.pyplot plot object.
+	Example:
+		accumulator = MeasureAccumulator()
+		accumulator.update(yesterdays_bets)
+		labrie_measures = accumulator.labrie_measures()
+		accumulator.save('labrie_state.pkl')
 
 	"""
 
-	plt.figure()
-
-	plt.style.use('gamba')
-	data = measures[name].values
-	n, bins, patches = plt.hist(data, bins=50, alpha=0.5, label="data")
-	xmin, xmax, ymin, ymax = plt.axis()
-	plt.plot([data.mean(), data.mean()], [ymin, ymax * 0.95], label="mean")
-	plt.plot(
-		[np.median(data), np.median(data)],
-		[ymin, ymax * 0.95],
-		label="median",
-		color="green",
-	)
-	plt.legend()
-	plt.xlim(min(data), max(data))
-	plt.xlabel(name)
-	plt.ylim(min(n), max(n))
-	return plt
-
-
-def plot_measure_centile(measures, name, top_heavy=False):
+	# the registered measures kept for each player, from which the LaBrie measures are derived
+	_summary_measures = [
+		"first_bet_time",
+		"last_bet_time",
+		"number_of_bets",
+		"total_wagered",
+		"total_payout",
+	]
+
+	def __init__(self):
+		self.players = pd.DataFrame()
+		self.daily = None
+		self._betting_days = {}
+
+	def update(self, player_bets):
+		"""
+		Adds a batch of bets to the running summary.
+		The time taken depends on the size of the batch and the number of players, not the number of bets seen before.
+
+		Args:
+			player_bets (Dataframe or TransactionTable): A batch of bets made by any number of players, with the same columns as each previous batch.
+
+		"""
+		check_measure_data(player_bets, ["player_id", "bet_time", "bet_size", "payout_size"])
+		if len(player_bets) == 0:
+			return
+
+		daily = "bet_count" in player_bets.columns
+		if self.daily is None:
+			self.daily = daily
+		elif self.daily != daily:
+			raise Exception("Column 'bet_count' must be present in every batch or none of them.")
+
+		summary_measures = list(self._summary_measures)
+		if self.daily:
+			summary_measures.append("number_of_bets_daily")
+		table = player_bets if isinstance(player_bets, TransactionTable) else TransactionTable(player_bets)
+		batch = calculate_measures(table, summary_measures).set_index("player_id")
+		batch["distinct_betting_days"] = self._add_betting_days(table)
+
+		known = batch.index.isin(self.players.index)
+		if known.any():
+			updated = batch[known].copy()
+			previous = self.players.loc[updated.index]
+			updated["first_bet_time"] = np.minimum(previous["first_bet_time"].values, updated["first_bet_time"].values)
+			updated["last_bet_time"] = np.maximum(previous["last_bet_time"].values, updated["last_bet_time"].values)
+			for column in updated.columns:
+				if column not in ["first_bet_time", "last_bet_time"]:
+					updated[column] = previous[column].values + updated[column].values
+			self.players.loc[updated.index, updated.columns] = updated
+
+		self.players = pd.concat([self.players, batch[~known]])
+
+	def _add_betting_days(self, table):
+		"""
+		Records the days each player bet on in a transaction table, returning the number of days which had not been seen before for each player.
+		Each player's days are kept as a bitmap with one bit per day from their earliest bet day, so the summary grows with the number of days players bet across, not the number of bets.
+		"""
+		new_day = np.ones(len(table), dtype=bool)
+		new_day[1:] = table.bet_days[1:] != table.bet_days[:-1]
+		new_day[table.starts] = True
+		days = table.bet_days[new_day]
+		# the position of each player's first distinct day (days are sorted within each player's block of rows)
+		day_starts = np.searchsorted(np.flatnonzero(new_day), table.starts)
+		day_stops = np.append(day_starts[1:], len(days)).astype(np.intp) if len(day_starts) != 0 else day_starts
+
+		new_days = np.zeros(len(table.starts), dtype=np.int64)
+		for player_number, player_id in enumerate(table.player_ids.tolist()):
+			player_days = days[day_starts[player_number] : day_stops[player_number]]
+			first_day, bitmap = self._betting_days.get(player_id, (int(player_days[0]), np.zeros(0, dtype=np.uint8)))
+			if player_days[0] < first_day:
+				# move the bitmap back a whole number of bytes to make room for the earlier days
+				shift = -(-(first_day - int(player_days[0])) // 8)
+				bitmap = np.concatenate([np.zeros(shift, dtype=np.uint8), bitmap])
+				first_day -= 8 * shift
+			offsets = player_days - first_day
+			length = int(offsets[-1]) // 8 + 1
+			if length > len(bitmap):
+				bitmap = np.concatenate([bitmap, np.zeros(length - len(bitmap), dtype=np.uint8)])
+
+			positions, bits = offsets >> 3, (1 << (offsets & 7)).astype(np.uint8)
+			new_days[player_number] = np.count_nonzero((bitmap[positions] & bits) == 0)
+			np.bitwise_or.at(bitmap, positions, bits)
+			self._betting_days[player_id] = (first_day, bitmap)
+		return new_days
+
+	def labrie_measures(self, daily=None):
+		"""
+		Creates the LaBrie measures table (see :meth:`calculate_labrie_measures`) from the bets added so far.
+
+		Args:
+			daily (Boolean): Whether to use the daily aggregate versions of the measures, default is to use them if the bets had a 'bet_count' column.
+
+		Returns:
+			Dataframe of LaBrie measures sorted by player_id.
+
+		"""
+		if daily is None:
+			daily = bool(self.daily)
+		if daily and not self.daily:
+			raise Exception("Column 'bet_count' missing from the accumulated bets.")
+
+		players = self.players.sort_index(kind="mergesort")
+		values = {column: players[column].values for column in players.columns}
+		values["first_bet_day"] = _bet_days(players["first_bet_time"])
+		values["last_bet_day"] = _bet_days(players["last_bet_time"])
+
+		def reduce(measure):
+			raise Exception("Measure can not be calculated from the accumulated summary.")
+
+		labrie_measures = pd.DataFrame({"player_id": players.index.values})
+		for column_name, name in labrie_measure_names(daily).items():
+			labrie_measures[column_name] = _evaluate_measure(name, values, reduce)
+		return labrie_measures
+
+	def save(self, filename):
+		"""
+		Saves the running summary to a file so that it can be loaded by a later run using :meth:`MeasureAccumulator.load`.
+
+		Args:
+			filename (String): The name of the file to save to, e.g. 'labrie_state.pkl'.
+
+		"""
+		state = {"players": self.players, "daily": self.daily, "betting_days": self._betting_days}
+		with open(filename, "wb") as state_file:
+			pickle.dump(state, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+	@classmethod
+	def load(cls, filename):
+		"""
+		Loads a running summary previously saved using :meth:`MeasureAccumulator.save`.
+
+		Args:
+			filename (String): The name of the file to load, e.g. 'labrie_state.pkl'.
+
+		Returns:
+			MeasureAccumulator containing the saved summary.
+
+		"""
+		with open(filename, "rb") as state_file:
+			state = pickle.load(state_file)
+
+		accumulator = cls()
+		accumulator.players = state["players"]
+		accumulator.daily = state["daily"]
+		accumulator._betting_days = state["betting_days"]
+		return accumulator
+
+
+
+
+@gamba.profiling.profiled
+def calculate_labrie_measures_chunked(file, savedir="", filename="gamba_labrie_measures.csv", loud=False, daily=True, chunksize=1000000, memory_limit=None, delimiter=",", trace_memory=False):
 	"""
-	Plots centiles of a single named measure from a dataframe of measures.
+	Calculates the LaBrie measures (see :meth:`calculate_labrie_measures`) from a CSV file of bets which is too large to load into memory.
+	The file is read in chunks, each of which is added to a :meth:`MeasureAccumulator`, so players whose bets span several chunks are combined correctly.
+	Memory use depends on the chunk size, the number of players, and the number of days they bet across (one bit per player per day), not the number of bets in the file.
 
 	Args:
-		measures (Dataframe): Collection of behavioural measures for a cohort of players.
-		name (String): The name of the measure to plot, e.g. 'duration'.
-		top_heavy (Boolean): Whether to plot each centile (100), or to plot every 5 up to 95 followed by 96-100 as individual percentiles (discontinuous x axis). Default is False (plot 100 bars).
+		file (String): The CSV file containing the bets of all players, with columns 'player_id', 'bet_time', 'bet_size', 'payout_size' (and 'bet_count' if daily).
+		savedir (String): The directory in which to save the resulting labrie measures dataframe, default is ''.
+		filename (String): The name of the file to save the resulting labrie measures dataframe to, default is 'gamba_labrie_measures.csv'.
+		loud (Boolean): Whether or not to output status updates as the function progresses, default is False.
+		daily (Boolean): Whether the bets are daily aggregates (with a 'bet_count' column) or individual transactions, default is True.
+		chunksize (Integer): The number of rows to read at a time, default is 1000000.
+		memory_limit (Integer): If given, a memory budget in megabytes used to choose the chunk size instead of the chunksize parameter.
+		delimiter (String): The delimiter used in the file being read, default is ',' (CSV format).
+		trace_memory (Boolean): Whether to trace memory allocations (see :meth:`gamba.profiling.profile`) and report the peak when loud, which slows down reading, default is False.
 
 	Returns:
-		Matplotlib.pyplot plot object.
+		Dataframe of LaBrie measures sorted by player_id.
 
 	"""
+	if memory_limit is not None:
+		chunksize = _chunksize_for_memory_limit(file, memory_limit, delimiter)
+
+	# a profile of its own measures the peak without resetting the peaks of any profile already recording
+	profiler = gamba.profiling.profile(memory=True) if trace_memory else contextlib.nullcontext()
+	with profiler as memory_profile:
+		with gamba.profiling.stage("chunks"):
+			accumulator = MeasureAccumulator()
+			chunks = pd.read_csv(file, parse_dates=["bet_time"], delimiter=delimiter, chunksize=chunksize)
+			with gamba.reporting.stage("calculate_labrie_measures_chunked", unit="chunks") as progress:
+				for chunk_number, chunk in enumerate(chunks):
+					with gamba.profiling.stage("update"):
+						accumulator.update(chunk)
+					progress.update(rows=len(chunk))
+					if loud:
+						gamba.reporting.message("chunk", chunk_number + 1, "added,", len(accumulator.players), "players so far")
+
+			labrie_measures = accumulator.labrie_measures(daily=daily)
+			with gamba.profiling.stage("to_csv"):
+				labrie_measures.to_csv(savedir + filename, index=False)
 
-	plt.figure(figsize=(9, 4))
+	if loud:
+		status = ["LaBrie measures calculated for", len(labrie_measures), "players in chunks of", chunksize, "rows"]
+		if trace_memory:
+			peak_memory = memory_profile.stages["chunks"]["peak_memory"]
+			status += ["(peak memory:", round(peak_memory, 1), "MB)"]
+		gamba.reporting.message(*status)
 
-	values = measures[name].values
+	return labrie_measures
 
-	percentile_values = []
 
-	percentiles = np.array(range(1, 101))
+def _chunksize_for_memory_limit(file, memory_limit, delimiter):
+	"""
+	Estimates how many rows of a CSV file can be processed at once within a memory budget (in megabytes), from the memory used by a sample of its rows.
+	"""
+	sample = pd.read_csv(file, parse_dates=["bet_time"], delimiter=delimiter, nrows=10000)
+	bytes_per_row = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+	# sorting and reducing a chunk needs several copies of it at once
+	working_copies = 4
+	return max(int(memory_limit * 1024 ** 2 / (bytes_per_row * working_copies)), 1)
 
-	if top_heavy:
-		percentiles = list(range(5, 100, 5))
-		percentiles.extend(list(range(96, 101)))
 
-	previous_cutoff = 0
-	for percentile_group in percentiles:
-		cutoff = np.percentile(values, percentile_group)
 
-		this_group = [value for value in values if previous_cutoff <= value < cutoff]
-		previous_cutoff = cutoff
 
-		mean_value = 0
-		if len(this_group) > 0:
-			mean_value = np.mean(this_group)
+# =========================================================
+# Plotting Functions for the Measures Module
+# =========================================================
 
-		percentile_values.append(mean_value)
+def measure_centiles(measures, name, top_heavy=False):
+	"""
+	Calculates the mean value of a single named measure in each centile of a dataframe of measures, e.g. for :meth:`plot_measure_centile`.
+	Each centile contains the values from the previous centile's cutoff (or zero) up to, but not including, its own.
 
-	# the +0.5 here shifts all bars down the x axis so that ticks line up with the start of the percentile
-	if top_heavy:
-		plt.bar(
-			np.array(range(len(percentiles))[:19]) + 0.5,
-			percentile_values[:19],
-			alpha=0.5,
-			edgecolor="black",
-			linewidth=1,
-			width=1,
-			label="5% Group",
-		)
-		plt.bar(
-			np.array(range(len(percentiles))[19:]) + 0.5,
-			percentile_values[19:],
-			alpha=0.5,
-			color="C1",
-			edgecolor="black",
-			linewidth=1,
-			width=1,
-			label="1% Group",
-		)
-		plt.legend()
+	Args:
+		measures (Dataframe): Collection of behavioural measures for a cohort of players.
+		name (String): The name of the measure, e.g. 'duration'.
+		top_heavy (Boolean): Whether to use each centile (100), or every 5 up to 95 followed by 96-100 as individual percentiles. Default is False (100 centiles).
 
-	else:
-		plt.bar(
-			np.array(range(len(percentiles))) + 0.5,
-			percentile_values,
-			alpha=0.5,
-			edgecolor="black",
-			linewidth=1,
-			width=1,
-		)
+	Returns:
+		Tuple containing the list of centiles and an array of the mean value in each.
+
+	"""
+	values = np.sort(np.asarray(measures[name].values, dtype=float))
 
+	centiles = list(range(1, 101))
 	if top_heavy:
-		plt.xticks(np.array(range(len(percentiles))) + 1, percentiles)
-		plt.xlim(0, len(percentiles))
-		plt.grid(False)
-	else:
-		# plt.xticks(percentiles)
-		plt.xlim(0, len(percentiles))
+		centiles = list(range(5, 100, 5))
+		centiles.extend(list(range(96, 101)))
 
-	plt.ylim(0, max(percentile_values) * 1.12)
-	plt.ylabel("Mean " + name.replace("_", " ").title())
-	plt.xlabel("Percentile")
+	cutoffs = np.percentile(values, centiles)
+	lower_cutoffs = np.concatenate([[0], cutoffs[:-1]])
+	# the values in each centile are a slice of the sorted values
+	starts = np.searchsorted(values, lower_cutoffs, side="left")
+	stops = np.searchsorted(values, cutoffs, side="left")
 
-	return plt
+	centile_values = np.zeros(len(centiles))
+	for i, (start, stop) in enumerate(zip(starts, stops)):
+		if stop > start:
+			centile_values[i] = values[start:stop].mean()
 
+	return centiles, centile_values
 
-def plot_measure_pair_plot(measures, label_override=None, thermal=False, figsize=(14, 14)):
 
+def plot_measure_hist(measures, name):
 	"""
-	Plots centiles of a single named measure from a dataframe of measures.
+	Plots a histogram for a named measure from a dataframe of measures.
 
 	Args:
 		measures (Dataframe): Collection of behavioural measures for a cohort of players.
-		label_override (List of Strings): List of axis labels, if None, the column names directly from the measures dataframe will be used.
-		thermal (Boolean): Show 2D histograms instead of scatter plots (better for perceiving density).
-		figsize (Tuple of Integers (2)): Size of the resulting plot, (14,14) is good for large numbers of measures (5+).
+		name (String): The name of the measure to plot, e.g. 'duration'.
 
 	Returns:
 		Matplotlib.pyplot plot object.
 
 	"""
-	colnames = list(measures.columns)[1:]
-	plt.rcParams["figure.figsize"] = figsize
-
-	num_measures = len(colnames)
-
-	fig, ax = plt.subplots(nrows=num_measures, ncols=num_measures)
-
-	for y, row in enumerate(ax):
-		for x, col in enumerate(row):
-
-			if x != y:
-				col.scatter(measures[colnames[x]].values, measures[colnames[y]].values)
-
-				if thermal:
-					xlim = col.get_xlim()
-					ylim = col.get_ylim()
-					x_increment = (xlim[1] - xlim[0]) / 25.0
-					y_increment = (ylim[1] - ylim[0]) / 25.0
-					xrange = np.arange(xlim[0], xlim[1] + x_increment, x_increment)
-					yrange = np.arange(ylim[0], ylim[1] + y_increment, y_increment)
-					heatmap_raw, xedges, yedges = np.histogram2d(
-						measures[colnames[x]].values,
-						measures[colnames[y]].values,
-						bins=(xrange, yrange),
-					)
-					heatmap = snf.gaussian_filter(heatmap_raw, sigma=2)
-					img = heatmap.T
-					X, Y = np.meshgrid(xedges, yedges)
-					col.pcolormesh(X, Y, img, cmap=cm.jet)
-					col.set_xlim(xlim)
-					col.set_ylim(ylim)
-			else:
-				col.hist(measures[colnames[x]], color="C2", bins=25)
-
-			if y != len(colnames) - 1:
-				col.axes.xaxis.set_ticklabels([])
-				col.xaxis.set_ticks_position("none")
-			if x != 0:
-				col.axes.yaxis.set_ticklabels([])
-				col.yaxis.set_ticks_position("none")
-
-			if x == 0:
-				if label_override == None:
-					col.set_ylabel(colnames[y])
-				else:
-					col.set_ylabel(label_override[y])
-			if y == len(colnames) - 1:
-				if label_override == None:
-					col.set_xlabel(colnames[x])
-				else:
-					col.set_xlabel(label_override[x])
+	return gamba.plotting.plot_measure_hist(measures[name].values, name)
 
-	fig.subplots_adjust(wspace=0.1, hspace=0.1)
-	return plt
 
-
-def plot_player_radar(values, lims=(-1, 1), loud=False):
+def plot_measure_centile(measures, name, top_heavy=False):
 	"""
-	Creates a radar chart from a list of values, this is useful for visualising differences between 'typical' players in clusters or cohorts. 
-	Values should be normalised (zscore). 
-	[bug: first axis is not always at 12 o'clock]
+	Plots centiles of a single named measure from a dataframe of measures.
 
 	Args:
-		values (List of Floats): The values to be plotted on the radar chart, values start at 12 o'clock on the radar and are plotted in clockwise order.
-		lims (Tuple of Integers (2)): The inner and outer limits of the radar axes (all axes are the same as values shoud be normalised.).
-	
+		measures (Dataframe): Collection of behavioural measures for a cohort of players.
+		name (String): The name of the measure to plot, e.g. 'duration'.
+		top_heavy (Boolean): Whether to plot each centile (100), or to plot every 5 up to 95 followed by 96-100 as individual percentiles (discontinuous x axis). Default is False (plot 100 bars).
+
 	Returns:
 		Matplotlib.pyplot plot object.
 
 	"""
+	centiles, centile_values = measure_centiles(measures, name, top_heavy=top_heavy)
+	return gamba.plotting.plot_measure_centile(centiles, centile_values, name, top_heavy=top_heavy)
 
-	values.append(values[0])
-	N = len(values) - 1
-	pi = math.pi
-	# What will be the angle of each axis in the plot? (we divide the plot / number of variable)
 
-	angle = 2 * pi / float(N)
-	angles = [angle * n for n in reversed(range(N))]
-	# rotate everything round 1/4 turn to put 0 at the top
-	angles = [angle + (3 / 8 * 2 * pi) for angle in angles]
-
-	for i, angle in enumerate(angles):
-		if angle > 2 * pi:
-			angles[i] = angles[i] - 2 * pi
-
-	angles += angles[:1]
-
-	# Initialise the spider plot
-	fig = plt.figure()
-	fig.patch.set_facecolor("white")
-	ax = plt.subplot(111, polar=True)
-	# plt.yticks([.25, .5, .75], [".25", ".5", ".75"], color="grey", size=7)
-	plt.ylim(lims)
-
-	# Draw one axis per variable + add labels labels yet
-	tick_labels = ["(a)", "(b)", "(c)", "(d)", "(e)", "(f)", "(g)", "(h)", "(i)", "(j)"]
-	plt.xticks(angles[:-1], tick_labels[: len(variable_names)], color="grey", size=8)
-
-	ax.tick_params(pad=5)  # move the axis labels out a bit
-	for label in ax.get_xticklabels() + ax.get_yticklabels():
-		label.set_fontsize(13)
+def plot_measure_pair_plot(measures, label_override=None, thermal=False, figsize=(14, 14)):
 
-	# Draw ylabels
-	ax.set_rlabel_position(0)  # degrees from horisontal to mark the ticks
-	# Plot data
-	ax.plot(angles, values, linewidth=1, linestyle="solid", color="blue")
-	# Fill area
-	ax.fill(angles, values, "b", alpha=0.1)
+	"""
+	Plots every pair of measures from a dataframe of measures against each other.
 
-	return plt
+	Args:
+		measures (Dataframe): Collection of behavioural measures for a cohort of players.
+		label_override (List of Strings): List of axis labels, if None, the column names directly from the measures dataframe will be used.
+		thermal (Boolean): Show 2D histograms instead of scatter plots (better for perceiving density).
+		figsize (Tuple of Integers (2)): Size of the resulting plot, (14,14) is good for large numbers of measures (5+).
 
+	Returns:
+		Matplotlib.pyplot plot object.
 
+	"""
+	colnames = list(measures.columns)[1:]
+	labels = colnames if label_override == None else label_override
+	return gamba.plotting.plot_measure_pair_plot(measures[colnames].values, labels, thermal=thermal, figsize=figsize)
 
 
+# the radar chart already takes a list of values
+plot_player_radar = gamba.plotting.plot_player_radar
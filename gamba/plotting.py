@@ -0,0 +1,501 @@
+# plotting module
+
+# this module draws the plots for each of the other gamba modules, which calculate the values
+# being plotted - each function here takes those values as arrays, so a calculation can be plotted
+# several ways without being repeated, and matplotlib is only imported when the first plot is made
+
+# dependencies
+import os, sys, numpy as np
+
+_pyplot = None
+
+# the style file shipped with gamba, used if the style hasn't been installed into matplotlib
+_style_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gamba.mplstyle")
+
+
+def _has_display():
+	"""
+	Whether an interactive matplotlib backend could be used, which on Linux needs an X11 or Wayland display.
+	"""
+	if not sys.platform.startswith("linux"):
+		return True
+	return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def pyplot():
+	"""
+	Imports matplotlib's pyplot and applies the gamba style (if it is installed or shipped with gamba), only the first time it's called.
+	When no display is available, such as on a compute node, the non-interactive 'Agg' backend is used so plots can still be saved to files.
+	A backend chosen using the MPLBACKEND environment variable, or by importing pyplot before gamba, is always kept.
+
+	Returns:
+		The matplotlib.pyplot module.
+
+	"""
+	global _pyplot
+	if _pyplot is None:
+		import matplotlib
+
+		if "matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND") and not _has_display():
+			matplotlib.use("Agg")
+
+		import matplotlib.pyplot as plt
+
+		# the style is applied once, so styles and settings changed after the first plot are kept
+		if "gamba" in plt.style.available:
+			plt.style.use("gamba")
+		elif os.path.exists(_style_file):
+			plt.style.use(_style_file)
+		_pyplot = plt
+
+	return _pyplot
+
+
+def _career_steps(bet_sizes, payout_sizes):
+	"""
+	The start and end of each bet's line on a career plot, where losing bets step down by the bet size and winning bets step up by the payout.
+	"""
+	bet_sizes = np.asarray(bet_sizes, dtype=float)
+	payout_sizes = np.asarray(payout_sizes, dtype=float)
+	steps = np.where(payout_sizes < bet_sizes, -bet_sizes, payout_sizes)
+	ends = np.cumsum(steps)
+	return ends - steps, ends
+
+
+def _vertical_lines(x, starts, ends):
+	"""
+	Joins a number of vertical lines into a single line broken by NaNs, which matplotlib draws much faster than one line per bet.
+	"""
+	x = np.repeat(np.asarray(x, dtype=float), 3)
+	y = np.column_stack([starts, ends, np.full(len(starts), np.nan)]).ravel()
+	x[2::3] = np.nan
+	return x, y
+
+
+# =========================================================
+# Data Plots
+# =========================================================
+
+
+def plot_player_career(bet_sizes, payout_sizes, savename=None):
+	"""
+	Creates a candlestick-style plot of a players betting activity over the course of their career.
+	Each bet is drawn as a red line down by its size if it lost, or a green line up by its payout if it won, starting where the previous bet ended.
+
+	Args:
+		bet_sizes (Array of Floats): The size of each of the player's bets, in the order they were made.
+		payout_sizes (Array of Floats): The payout of each of the player's bets.
+		savename (String): If given, saves the resulting plot to the name supplied, e.g. 'player_bets.png'.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	starts, ends = _career_steps(bet_sizes, payout_sizes)
+	x = np.arange(len(starts))
+	lost = ends < starts
+
+	plt.figure(figsize=[5, 3])
+	for bets, color in [(lost, "#d30505"), (~lost, "#00B007")]:
+		plt.plot(*_vertical_lines(x[bets], starts[bets], ends[bets]), marker="o", color=color, markersize=12)
+
+	plt.xlabel(None)
+	if savename != None:
+		plt.savefig(savename, dpi=200, transparent=True)
+
+	return plt
+
+
+def plot_player_career_split(bet_sizes, payout_sizes):
+	"""
+	Plot a player's betting and payout trajectory on a single plot, with green indicating payouts (top) and red indicating bets (bottom).
+	A cumulative value line is also plotted between the two.
+
+	Args:
+		bet_sizes (Array of Floats): The size of each of the player's bets, in the order they were made.
+		payout_sizes (Array of Floats): The payout of each of the player's bets.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	bet_sizes = np.asarray(bet_sizes, dtype=float)
+	payout_sizes = np.asarray(payout_sizes, dtype=float)
+	starts, ends = _career_steps(bet_sizes, payout_sizes)
+	x = np.arange(len(starts))
+	lost = ends < starts
+
+	plt.figure()
+	for bets, color in [(lost, "red"), (~lost, "green")]:
+		plt.plot(*_vertical_lines(x[bets], starts[bets], ends[bets]), marker="o", color=color)
+
+	plt.plot(x, np.cumsum(-bet_sizes), marker="o", color="red", label="Cumulative Bets")
+	plt.plot(x, np.cumsum(payout_sizes), marker="o", color="green", label="Cumulative Payouts")
+	plt.legend()
+	plt.xlim(0, len(bet_sizes) * 1.02)
+	limit = max([bet_sizes.sum(), payout_sizes.sum()])
+	plt.ylim(-limit, limit)
+	return plt
+
+
+def plot_provider_dates(start_dates, end_dates, provider_labels):
+	"""
+	Plots the dates of the first and last bets with each of a number of providers as a horizontal line per provider.
+
+	Args:
+		start_dates (Array of Datetimes): The date of the first bet with each provider.
+		end_dates (Array of Datetimes): The date of the last bet with each provider.
+		provider_labels (List of Strings): The name of each provider, shown on the y axis.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	import matplotlib.dates as mdates
+
+	fig = plt.figure(figsize=[8, 1.5])
+	for i, (start, end) in enumerate(zip(start_dates, end_dates)):
+		plt.plot([start, end], [i, i], label=provider_labels[i])
+		plt.scatter([start, end], [i, i], s=100, marker="|")
+
+	ax = fig.axes[0]
+	ax.xaxis.set_major_locator(mdates.MonthLocator([1, 4, 7, 10]))  # ticks on first day of each quarter
+	ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))  # format of only month (3 letter abbr)
+	plt.yticks(range(len(provider_labels)), provider_labels)
+	plt.ylim(-0.5, len(provider_labels) - 0.5)
+	plt.grid(True)
+	return plt
+
+
+# =========================================================
+# Measures Plots
+# =========================================================
+
+
+def plot_measure_hist(values, name):
+	"""
+	Plots a histogram of the values of a measure, marking their mean and median.
+
+	Args:
+		values (Array of Floats): The value of the measure for each player.
+		name (String): The name of the measure, used to label the x axis, e.g. 'duration'.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	data = np.asarray(values)
+
+	plt.figure()
+	n, bins, patches = plt.hist(data, bins=50, alpha=0.5, label="data")
+	xmin, xmax, ymin, ymax = plt.axis()
+	plt.plot([data.mean(), data.mean()], [ymin, ymax * 0.95], label="mean")
+	plt.plot(
+		[np.median(data), np.median(data)],
+		[ymin, ymax * 0.95],
+		label="median",
+		color="green",
+	)
+	plt.legend()
+	plt.xlim(data.min(), data.max())
+	plt.xlabel(name)
+	plt.ylim(min(n), max(n))
+	return plt
+
+
+def plot_measure_centile(centiles, centile_values, name, top_heavy=False):
+	"""
+	Plots the mean value of a measure in each of a number of centiles as a bar chart.
+
+	Args:
+		centiles (List of Integers): The upper percentile of each group, e.g. 1 to 100.
+		centile_values (Array of Floats): The mean value of the measure in each group, see :meth:`gamba.measures.measure_centiles`.
+		name (String): The name of the measure, used to label the y axis, e.g. 'duration'.
+		top_heavy (Boolean): Whether the centiles are every 5 up to 95 followed by 96-100 individually, which are plotted in different colours on a discontinuous x axis. Default is False.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	centile_values = list(centile_values)
+
+	plt.figure(figsize=(9, 4))
+
+	# the +0.5 here shifts all bars down the x axis so that ticks line up with the start of the percentile
+	if top_heavy:
+		plt.bar(
+			np.array(range(len(centiles))[:19]) + 0.5,
+			centile_values[:19],
+			alpha=0.5,
+			edgecolor="black",
+			linewidth=1,
+			width=1,
+			label="5% Group",
+		)
+		plt.bar(
+			np.array(range(len(centiles))[19:]) + 0.5,
+			centile_values[19:],
+			alpha=0.5,
+			color="C1",
+			edgecolor="black",
+			linewidth=1,
+			width=1,
+			label="1% Group",
+		)
+		plt.legend()
+		plt.xticks(np.array(range(len(centiles))) + 1, centiles)
+		plt.xlim(0, len(centiles))
+		plt.grid(False)
+
+	else:
+		plt.bar(
+			np.array(range(len(centiles))) + 0.5,
+			centile_values,
+			alpha=0.5,
+			edgecolor="black",
+			linewidth=1,
+			width=1,
+		)
+		plt.xlim(0, len(centiles))
+
+	plt.ylim(0, max(centile_values) * 1.12)
+	plt.ylabel("Mean " + name.replace("_", " ").title())
+	plt.xlabel("Percentile")
+
+	return plt
+
+
+def plot_measure_pair_plot(values, labels, thermal=False, figsize=(14, 14)):
+	"""
+	Plots every pair of measures against each other as a grid of scatter plots, with a histogram of each measure along the diagonal.
+
+	Args:
+		values (2D Array of Floats): The measures of each player, one row per player and one column per measure.
+		labels (List of Strings): The name of each measure, used to label the axes.
+		thermal (Boolean): Show 2D histograms instead of scatter plots (better for perceiving density).
+		figsize (Tuple of Integers (2)): Size of the resulting plot, (14,14) is good for large numbers of measures (5+).
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	values = np.asarray(values)
+	num_measures = values.shape[1]
+
+	fig, ax = plt.subplots(nrows=num_measures, ncols=num_measures, figsize=figsize, squeeze=False)
+
+	for y, row in enumerate(ax):
+		for x, col in enumerate(row):
+
+			if x != y:
+				col.scatter(values[:, x], values[:, y])
+
+				if thermal:
+					from scipy.ndimage import gaussian_filter
+
+					xlim = col.get_xlim()
+					ylim = col.get_ylim()
+					x_increment = (xlim[1] - xlim[0]) / 25.0
+					y_increment = (ylim[1] - ylim[0]) / 25.0
+					xrange = np.arange(xlim[0], xlim[1] + x_increment, x_increment)
+					yrange = np.arange(ylim[0], ylim[1] + y_increment, y_increment)
+					heatmap_raw, xedges, yedges = np.histogram2d(values[:, x], values[:, y], bins=(xrange, yrange))
+					heatmap = gaussian_filter(heatmap_raw, sigma=2)
+					X, Y = np.meshgrid(xedges, yedges)
+					col.pcolormesh(X, Y, heatmap.T, cmap="jet")
+					col.set_xlim(xlim)
+					col.set_ylim(ylim)
+			else:
+				col.hist(values[:, x], color="C2", bins=25)
+
+			if y != num_measures - 1:
+				col.axes.xaxis.set_ticklabels([])
+				col.xaxis.set_ticks_position("none")
+			if x != 0:
+				col.axes.yaxis.set_ticklabels([])
+				col.yaxis.set_ticks_position("none")
+
+			if x == 0:
+				col.set_ylabel(labels[y])
+			if y == num_measures - 1:
+				col.set_xlabel(labels[x])
+
+	fig.subplots_adjust(wspace=0.1, hspace=0.1)
+	return plt
+
+
+def plot_player_radar(values, lims=(-1, 1), loud=False):
+	"""
+	Creates a radar chart from a list of values, this is useful for visualising differences between 'typical' players in clusters or cohorts.
+	Values should be normalised (zscore).
+	[bug: first axis is not always at 12 o'clock]
+
+	Args:
+		values (List of Floats): The values to be plotted on the radar chart, values start at 12 o'clock on the radar and are plotted in clockwise order.
+		lims (Tuple of Integers (2)): The inner and outer limits of the radar axes (all axes are the same as values shoud be normalised.).
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	values = list(values)
+	values.append(values[0])
+	N = len(values) - 1
+	pi = np.pi
+	# What will be the angle of each axis in the plot? (we divide the plot / number of variable)
+
+	angle = 2 * pi / float(N)
+	angles = [angle * n for n in reversed(range(N))]
+	# rotate everything round 1/4 turn to put 0 at the top
+	angles = [angle + (3 / 8 * 2 * pi) for angle in angles]
+
+	for i, angle in enumerate(angles):
+		if angle > 2 * pi:
+			angles[i] = angles[i] - 2 * pi
+
+	angles += angles[:1]
+
+	# Initialise the spider plot
+	fig = plt.figure()
+	fig.patch.set_facecolor("white")
+	ax = plt.subplot(111, polar=True)
+	plt.ylim(lims)
+
+	# Draw one axis per variable + add labels labels yet
+	tick_labels = ["(a)", "(b)", "(c)", "(d)", "(e)", "(f)", "(g)", "(h)", "(i)", "(j)"]
+	plt.xticks(angles[:-1], tick_labels[:N], color="grey", size=8)
+
+	ax.tick_params(pad=5)  # move the axis labels out a bit
+	for label in ax.get_xticklabels() + ax.get_yticklabels():
+		label.set_fontsize(13)
+
+	# Draw ylabels
+	ax.set_rlabel_position(0)  # degrees from horisontal to mark the ticks
+	# Plot data
+	ax.plot(angles, values, linewidth=1, linestyle="solid", color="blue")
+	# Fill area
+	ax.fill(angles, values, "b", alpha=0.1)
+
+	return plt
+
+
+def plot_trajectory(days, bet_sizes, fitted_bet_sizes):
+	"""
+	Plots a player's daily bet sizes with the linear regression fitted to them (see :meth:`gamba.measures.trajectory_daily`).
+
+	Args:
+		days (Array of Integers): The day of each bet size, starting from 1.
+		bet_sizes (Array of Floats): The total size of the bets made on each day.
+		fitted_bet_sizes (Array of Floats): The bet size predicted by the regression on each day.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	plt.figure()
+	plt.scatter(days, bet_sizes)
+	plt.plot(days, fitted_bet_sizes, color="r")
+	return plt
+
+
+# =========================================================
+# Tests Plots
+# =========================================================
+
+
+def plot_color_matrix(values, labels, cmap):
+	"""
+	Creates a shaded matrix based on a color map, such as a matrix of correlation coefficients between measures.
+
+	Args:
+		values (2D Array of Floats): The values to shade, between -1 and 1, NaNs are left white.
+		labels (List of Strings): The name of each row (and column) of the matrix.
+		cmap (String): The name of the matplotlib color map to use, e.g. 'RdBu'.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	import matplotlib
+
+	current_cmap = matplotlib.colormaps[cmap].with_extremes(bad="white")
+	plt.imshow(np.asarray(values, dtype=float) * 100, cmap=current_cmap)
+	plt.yticks(range(len(labels)), list(labels))
+	plt.xticks(range(len(labels)), list(labels))
+	plt.xticks(rotation=90)
+	cbar = plt.colorbar()
+	cbar.set_ticks([-100, -80, -60, -40, -20, 0, 20, 40, 60, 80, 100])
+	cbar.set_ticklabels([-1, -0.8, -0.6, -0.4, -0.2, 0, 0.2, 0.4, 0.6, 0.8, 1])
+	plt.ylabel("test")
+	return plt
+
+
+# =========================================================
+# Machine Learning Plots
+# =========================================================
+
+
+def plot_cluster_sizes(labels, title=None):
+	"""
+	Create a bar chart of the number of players in each cluster of a clustering.
+
+	Args:
+		labels (Array of Integers): The cluster each player belongs to, e.g. the labels_ of a trained sklearn clustering model.
+		title (String): A title for the plot, default is None (no title).
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	cluster_ids, cluster_sizes = np.unique(np.asarray(labels), return_counts=True)
+
+	plt.figure()
+	plt.bar(
+		cluster_ids,
+		cluster_sizes,
+		color=plt.rcParams["axes.prop_cycle"].by_key()["color"],
+	)
+	plt.xticks(range(len(cluster_ids)), cluster_ids)
+	plt.xlabel("Cluster ID")
+	plt.ylabel("Number of Players per Cluster")
+	plt.grid(axis="x")
+	if title != None:
+		plt.title(title)
+	return plt
+
+
+def plot_agglomeration_dendrogram(linkage_matrix, dt_cutoff=None, **kwargs):
+	"""
+	Create a dendrogram visualising a heirarchical clustering method (agglomerative clustering).
+	A horisontal line can be added using the dt_cutoff parameter to visualise the number of clusters at a given distance threshold.
+
+	Args:
+		linkage_matrix (2D Array of Floats): The clustering as a scipy linkage matrix, see :meth:`gamba.machine_learning.linkage_matrix`.
+		dt_cutoff (Integer): The distance threshold value at which to mark a grey dashed horisontal line.
+
+	Returns:
+		Matplotlib.pyplot plot object.
+
+	"""
+	plt = pyplot()
+	import scipy.cluster.hierarchy as sch
+
+	plt.figure(figsize=(12, 4))
+	plt.title("Hierarchical Clustering dendrogram")
+	sch.dendrogram(linkage_matrix, truncate_mode="level", p=3, **kwargs)
+	if dt_cutoff != None:
+		plt.plot(list(plt.xlim()), [dt_cutoff, dt_cutoff], linestyle="--", color="grey")
+	plt.xlabel("Number of points in node (or index of point if no parenthesis).")
+	plt.ylabel("Distance threshold")
+	plt.grid(False)
+	return plt
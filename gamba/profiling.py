@@ -0,0 +1,181 @@
+# profiling module
+
+# this module records how long each stage of an analysis takes, how many times it runs, and the most
+# memory it allocates, so slow runs can be traced to loading, sorting, a particular measure, or saving
+
+# stages are only recorded inside a 'with gamba.profile():' block, outside of which they do nothing
+
+# dependencies
+import contextlib, functools, json, time, tracemalloc, datetime, platform
+
+# the profiles currently recording stages, innermost last
+_active_profiles = []
+
+
+class Profile:
+	"""
+	The stages recorded by :meth:`profile`, with the number of times each ran, their total wall time, and the most memory each allocated.
+	Stages inside other stages are named by their path, e.g. 'calculate_labrie_measures/calculate_measures/measure:duration'.
+
+	"""
+
+	def __init__(self, memory=True):
+		self.memory = memory
+		self.stages = {}
+		self.total_time = 0.0
+		self._open_stages = []
+
+	def _enter(self, name, traced_memory):
+		path = name if not self._open_stages else self._open_stages[-1]["path"] + "/" + name
+		# stages are added when they first start, so they're reported in the order they ran
+		self.stages.setdefault(path, {"calls": 0, "time": 0.0, "peak_memory": 0.0})
+		stage = {"path": path, "start_time": time.perf_counter(), "start_memory": 0, "peak_memory": 0}
+		if self.memory and traced_memory is not None:
+			current, peak = traced_memory
+			# the peak since the last reset belongs to every stage that is still open
+			for open_stage in self._open_stages:
+				open_stage["peak_memory"] = max(open_stage["peak_memory"], peak)
+			stage["start_memory"] = stage["peak_memory"] = current
+		self._open_stages.append(stage)
+
+	def _exit(self, traced_memory):
+		stage = self._open_stages.pop()
+		duration = time.perf_counter() - stage["start_time"]
+		if self.memory and traced_memory is not None:
+			stage["peak_memory"] = max(stage["peak_memory"], traced_memory[1])
+			if self._open_stages:
+				self._open_stages[-1]["peak_memory"] = max(self._open_stages[-1]["peak_memory"], stage["peak_memory"])
+
+		record = self.stages[stage["path"]]
+		record["calls"] += 1
+		record["time"] += duration
+		record["peak_memory"] = max(record["peak_memory"], (stage["peak_memory"] - stage["start_memory"]) / 1024 ** 2)
+
+	def to_dataframe(self):
+		"""
+		The recorded stages as a dataframe, in the order they first started.
+
+		Returns:
+			Dataframe with the columns 'stage', 'calls', 'time' (total seconds), 'mean_time' (seconds per call), 'percent_time' (of the whole profile), and 'peak_memory' (the most megabytes allocated during a single call, or NaN if memory wasn't traced).
+
+		"""
+		import pandas as pd
+
+		results = pd.DataFrame(
+			[{"stage": path, **record} for path, record in self.stages.items()],
+			columns=["stage", "calls", "time", "peak_memory"],
+		)
+		results.insert(3, "mean_time", results["time"] / results["calls"])
+		results.insert(4, "percent_time", 100 * results["time"] / self.total_time if self.total_time else 0.0)
+		if not self.memory:
+			results["peak_memory"] = float("nan")
+		return results
+
+	def to_json(self, filename):
+		"""
+		Saves the recorded stages to a JSON file, along with details of the machine they were recorded on, so runs can be compared.
+
+		Args:
+			filename (String): The name of the file to save, e.g. 'labrie_profile.json'.
+
+		"""
+		report = {
+			"date": datetime.datetime.now().isoformat(timespec="seconds"),
+			"python": platform.python_version(),
+			"platform": platform.platform(),
+			"total_time": self.total_time,
+			"stages": self.to_dataframe().to_dict(orient="records"),
+		}
+		with open(filename, "w") as json_file:
+			json.dump(report, json_file, indent=1)
+
+
+@contextlib.contextmanager
+def profile(filename=None, memory=True):
+	"""
+	Records the wall time, number of calls, and peak memory of each stage of gamba's loaders, measures, and machine learning methods called inside the block.
+	Each measure calculated is recorded as its own stage, e.g. 'measure:duration'.
+	Stages run by worker processes (e.g. calculate_measures with workers > 1) are recorded as a single stage in the main process.
+
+	Example:
+		with gb.profile("labrie_profile.json") as profiler:
+			gb.calculate_labrie_measures(bets)
+		profiler.to_dataframe()
+
+	Args:
+		filename (String): If given, the results are saved to this JSON file at the end of the block (see :meth:`Profile.to_json`).
+		memory (Boolean): Whether to trace memory allocations with tracemalloc, which slows down code that allocates many small objects, default is True.
+
+	Returns:
+		A :class:`Profile` which holds the results once the block ends.
+
+	"""
+	profiler = Profile(memory=memory)
+	started_tracing = memory and not tracemalloc.is_tracing()
+	if started_tracing:
+		tracemalloc.start()
+
+	_active_profiles.append(profiler)
+	start_time = time.perf_counter()
+	try:
+		yield profiler
+	finally:
+		profiler.total_time = time.perf_counter() - start_time
+		_active_profiles.remove(profiler)
+		if started_tracing:
+			tracemalloc.stop()
+
+	if filename is not None:
+		profiler.to_json(filename)
+
+
+@contextlib.contextmanager
+def stage(name):
+	"""
+	Records the code inside the block as a named stage of any active :meth:`profile`, and does nothing otherwise.
+
+	Args:
+		name (String): The name of the stage, e.g. 'to_csv'.
+
+	"""
+	if not _active_profiles:
+		yield
+		return
+
+	profilers = list(_active_profiles)
+	traced_memory = _traced_memory()
+	for profiler in profilers:
+		profiler._enter(name, traced_memory)
+	try:
+		yield
+	finally:
+		traced_memory = _traced_memory()
+		for profiler in reversed(profilers):
+			profiler._exit(traced_memory)
+
+
+def _traced_memory():
+	"""
+	The current and peak traced memory (as :meth:`tracemalloc.get_traced_memory`) since the last stage started or ended, or None if memory isn't being traced.
+	The peak is then reset, so the profiles recording a stage (which may be nested) all see the same peak.
+	"""
+	if not tracemalloc.is_tracing():
+		return None
+	traced_memory = tracemalloc.get_traced_memory()
+	tracemalloc.reset_peak()
+	return traced_memory
+
+
+def profiled(function):
+	"""
+	Decorates a function so that each call is recorded as a stage (named after the function) of any active :meth:`profile`.
+	"""
+
+	@functools.wraps(function)
+	def profiled_function(*args, **kwargs):
+		if not _active_profiles:
+			return function(*args, **kwargs)
+		with stage(function.__name__):
+			return function(*args, **kwargs)
+
+	return profiled_function
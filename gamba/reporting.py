@@ -0,0 +1,407 @@
+# reporting module
+
+# this module passes the progress of long-running methods (and their status messages) to a reporter,
+# which can show them as progress bars, write them to a log, save them as JSON lines, or ignore them
+
+# each event is a dictionary, e.g. {'event': 'progress', 'stage': 'split_individual_transactions', 'done': 10, 'total': 100, ...}
+# with one of four types - 'start' and 'end' when a stage starts and ends, 'progress' as it
+# works through players or chunks, and 'message' for status updates which used to be printed
+
+# dependencies
+import contextlib, json, logging, pickle, time
+
+
+class Reporter:
+	"""
+	Receives the events emitted by gamba's methods, subclasses decide what to do with them by overriding :meth:`event`.
+	Progress events from the same stage are sent at most once every interval seconds (and always when the stage is done), so reporters don't slow down the work they report on.
+
+	"""
+
+	# whether events are created at all, which is only False for the NullReporter
+	enabled = True
+
+	# the least time in seconds between two progress events from the same stage
+	interval = 1.0
+
+	def event(self, event):
+		"""
+		Handles a single event.
+
+		Args:
+			event (Dictionary): The event, see the top of this module for its fields.
+
+		"""
+		raise NotImplementedError
+
+	def close(self):
+		"""
+		Releases anything held by the reporter (e.g. an open file).
+		Called by :meth:`report_to` at the end of its block for a reporter it created, :meth:`set_reporter` leaves closing the reporter it replaces to its caller.
+		"""
+		pass
+
+	def worker_reporter(self):
+		"""
+		The reporter that worker processes use in place of this one (see :meth:`worker_options`), by default a copy of this one.
+		"""
+		return self
+
+
+class NullReporter(Reporter):
+	"""
+	Ignores every event. Stages do nothing at all while this reporter is in use, so loops which report their progress run as fast as they would without reporting it.
+	"""
+
+	enabled = False
+
+	def event(self, event):
+		pass
+
+
+class TqdmReporter(Reporter):
+	"""
+	Shows the progress of each stage as a tqdm progress bar, and prints messages (the default reporter).
+	"""
+
+	interval = 0.1
+
+	def __init__(self):
+		self._bars = {}
+
+	def event(self, event):
+		from tqdm import tqdm
+
+		if event["event"] == "message":
+			tqdm.write(event["message"])
+		elif event["event"] == "progress":
+			if event["id"] not in self._bars:
+				self._bars[event["id"]] = tqdm(total=event["total"], desc=event["stage"], unit=event["unit"])
+			bar = self._bars[event["id"]]
+			bar.update(event["done"] - bar.n)
+		elif event["event"] == "end" and event["id"] in self._bars:
+			self._bars.pop(event["id"]).close()
+
+	def close(self):
+		for bar in self._bars.values():
+			bar.close()
+		self._bars = {}
+
+	def worker_reporter(self):
+		# every worker would draw its own bars over the main process's, which already show the progress of the work given to the workers
+		return NullReporter()
+
+
+class LoggingReporter(Reporter):
+	"""
+	Writes each event as a line of text to a python logger.
+
+	Args:
+		logger (String or logging.Logger): The logger (or the name of the logger) to write to, default is 'gamba'.
+		level (Integer): The level to log events at, default is logging.INFO.
+		interval (Float): The least time in seconds between two progress lines from the same stage, default is 10.
+
+	"""
+
+	def __init__(self, logger="gamba", level=logging.INFO, interval=10.0):
+		self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+		self.level = level
+		self.interval = interval
+
+	def event(self, event):
+		self.logger.log(self.level, describe_event(event))
+
+
+class JsonLinesReporter(Reporter):
+	"""
+	Writes each event to a file as a single line of JSON, which can be read back using pandas.read_json(filename, lines=True).
+
+	Args:
+		file (String or file object): The name of the file to append events to, or an open file.
+		interval (Float): The least time in seconds between two progress events from the same stage, default is 1.
+
+	"""
+
+	def __init__(self, file, interval=1.0):
+		self._opened = isinstance(file, str)
+		self.file = open(file, "a") if self._opened else file
+		self.interval = interval
+
+	def event(self, event):
+		self.file.write(json.dumps(event, default=str) + "\n")
+		self.file.flush()
+
+	def close(self):
+		if self._opened:
+			self.file.close()
+
+	def __getstate__(self):
+		# a copy in a worker process appends to the same file, one whole line at a time
+		if not self._opened:
+			raise TypeError("A JsonLinesReporter writing to an open file can't be copied to another process.")
+		return {"file": self.file.name, "interval": self.interval}
+
+	def __setstate__(self, state):
+		self.__init__(state["file"], interval=state["interval"])
+
+
+class CallbackReporter(Reporter):
+	"""
+	Passes each event to a function, for example to update a dashboard or a job scheduler.
+
+	Args:
+		callback (Function): Called with each event dictionary.
+		interval (Float): The least time in seconds between two progress events from the same stage, default is 1.
+
+	"""
+
+	def __init__(self, callback, interval=1.0):
+		self.callback = callback
+		self.interval = interval
+
+	def event(self, event):
+		self.callback(event)
+
+
+def describe_event(event):
+	"""
+	Describes an event in a single line of text, as written by the :class:`LoggingReporter`.
+
+	Args:
+		event (Dictionary): The event to describe.
+
+	Returns:
+		String.
+
+	"""
+	if event["event"] == "message":
+		return event["message"]
+	if event["event"] == "start":
+		return event["stage"] + " started"
+
+	description = event["stage"]
+	if event["event"] == "progress":
+		description += ": " + str(event["done"]) + ("/" + str(event["total"]) if event["total"] is not None else "") + " " + event["unit"]
+	else:
+		description += " finished in {:.2f}s".format(event["elapsed"])
+		if event.get("error"):
+			description += " with an error: " + event["error"]
+
+	rates = ["{:,.0f} {}/s".format(event[unit + "_per_second"], unit) for unit in ["rows", "players"] if event.get(unit + "_per_second")]
+	if event.get("eta") is not None:
+		rates.append("ETA {:.0f}s".format(event["eta"]))
+	if rates:
+		description += " (" + ", ".join(rates) + ")"
+	return description
+
+
+_reporter_names = {
+	"null": NullReporter,
+	"tqdm": TqdmReporter,
+	"logging": LoggingReporter,
+}
+
+_reporter = TqdmReporter()
+
+
+def set_reporter(reporter):
+	"""
+	Sets the reporter that every gamba method sends its progress and status messages to.
+
+	Args:
+		reporter (Reporter, String, or Function): A :class:`Reporter`, the name of one ('null', 'tqdm', or 'logging'), a '.jsonl' filename to write events to (see :class:`JsonLinesReporter`), or a function to call with each event.
+
+	Returns:
+		The previous reporter.
+
+	"""
+	global _reporter
+	if isinstance(reporter, str):
+		if reporter in _reporter_names:
+			reporter = _reporter_names[reporter]()
+		elif reporter.endswith(".jsonl"):
+			reporter = JsonLinesReporter(reporter)
+		else:
+			raise Exception("Reporter '" + reporter + "' is not one of 'null', 'tqdm', 'logging', or a '.jsonl' filename.")
+	elif not isinstance(reporter, Reporter):
+		if not callable(reporter):
+			raise Exception("A reporter must be a Reporter, the name of one, or a function.")
+		reporter = CallbackReporter(reporter)
+
+	previous_reporter = _reporter
+	_reporter = reporter
+	return previous_reporter
+
+
+def get_reporter():
+	"""
+	The reporter currently receiving events, see :meth:`set_reporter`.
+	"""
+	return _reporter
+
+
+def worker_options():
+	"""
+	The keyword arguments which give the worker processes of a pool the current reporter, e.g.
+
+		concurrent.futures.ProcessPoolExecutor(max_workers=workers, **gamba.reporting.worker_options())
+
+	Workers started by spawning a new process (the default on Windows and macOS) would otherwise use the default reporter, whatever was set in the main process.
+	Workers use the reporter's :meth:`Reporter.worker_reporter`, so a :class:`TqdmReporter` is replaced by the :class:`NullReporter` rather than drawing more progress bars on the same terminal.
+	A reporter which can't be copied to another process (e.g. a function, or a file opened by the caller) is also replaced by the :class:`NullReporter`.
+
+	Returns:
+		Dictionary with the 'initializer' and 'initargs' for the pool.
+
+	"""
+	reporter = _reporter.worker_reporter()
+	try:
+		pickle.dumps(reporter)
+	except Exception:
+		reporter = NullReporter()
+	return {"initializer": set_reporter, "initargs": (reporter,)}
+
+
+@contextlib.contextmanager
+def report_to(reporter):
+	"""
+	Sends events to a reporter until the end of the block, then goes back to the previous reporter (which is closed if it was created here).
+
+	Example:
+		with gb.report_to("null"):
+			gb.split_individual_transactions(bets, "individuals/")
+
+	Args:
+		reporter (Reporter, String, or Function): Anything accepted by :meth:`set_reporter`.
+
+	"""
+	previous_reporter = set_reporter(reporter)
+	try:
+		yield _reporter
+	finally:
+		current_reporter = set_reporter(previous_reporter)
+		if current_reporter is not reporter:
+			current_reporter.close()
+
+
+def message(*values):
+	"""
+	Sends a status message to the reporter, joining the values with spaces as print does.
+	"""
+	if _reporter.enabled:
+		_reporter.event({"event": "message", "time": time.time(), "message": " ".join(str(value) for value in values)})
+
+
+class Stage:
+	"""
+	Reports the start, progress, and end of one stage of a method, along with its throughput and estimated time remaining.
+	Created by :meth:`stage`, and used as a context manager.
+
+	"""
+
+	enabled = True
+
+	_next_id = 0
+
+	def __init__(self, reporter, name, total=None, unit="players"):
+		self.reporter = reporter
+		self.name = name
+		self.total = total
+		self.unit = unit
+		self.done = 0
+		self.rows = 0
+		self.players = 0
+		Stage._next_id += 1
+		self.id = Stage._next_id
+
+	def __enter__(self):
+		self.start_time = time.perf_counter()
+		self.last_event_time = self.start_time
+		self._event("start")
+		return self
+
+	def __exit__(self, error_type, error, traceback):
+		fields = {"error": repr(error)} if error is not None else {}
+		self._event("end", **fields)
+		return False
+
+	def update(self, done=1, rows=0, players=0):
+		"""
+		Records that more of the stage has been done, sending a progress event if the reporter's interval has passed (or the stage is complete).
+
+		Args:
+			done (Integer): The number of units (e.g. players, files, or chunks) finished since the last update, default is 1.
+			rows (Integer): The number of rows (bets) processed since the last update, default is 0.
+			players (Integer): The number of players processed since the last update, default is 0.
+
+		"""
+		self.done += done
+		self.rows += rows
+		self.players += players
+		now = time.perf_counter()
+		if now - self.last_event_time >= self.reporter.interval or self.done == self.total:
+			self.last_event_time = now
+			self._event("progress")
+
+	def _event(self, kind, **fields):
+		elapsed = time.perf_counter() - self.start_time
+		event = {
+			"event": kind,
+			"stage": self.name,
+			"id": self.id,
+			"time": time.time(),
+			"elapsed": elapsed,
+			"done": self.done,
+			"total": self.total,
+			"unit": self.unit,
+			"rows": self.rows,
+			"players": self.players,
+			"rows_per_second": self.rows / elapsed if elapsed > 0 else None,
+			"players_per_second": self.players / elapsed if elapsed > 0 else None,
+			"eta": elapsed * (self.total - self.done) / self.done if self.total and self.done else None,
+		}
+		event.update(fields)
+		self.reporter.event(event)
+
+
+class _NullStage:
+	"""
+	Stands in for a :class:`Stage` when the :class:`NullReporter` is in use, doing nothing.
+	"""
+
+	enabled = False
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, error_type, error, traceback):
+		return False
+
+	def update(self, done=1, rows=0, players=0):
+		pass
+
+
+_null_stage = _NullStage()
+
+
+def stage(name, total=None, unit="players"):
+	"""
+	Creates a stage which reports its start, progress, and end to the current reporter, e.g.
+
+		with gamba.reporting.stage("split_individual_transactions", total=len(players)) as progress:
+			for player in players:
+				...
+				progress.update(rows=len(player_bets), players=1)
+
+	Args:
+		name (String): The name of the stage, usually the method's name.
+		total (Integer): The number of units the stage will work through, if known, used to estimate the time remaining.
+		unit (String): What the stage works through, e.g. 'players', 'files', or 'chunks', default is 'players'.
+
+	Returns:
+		A :class:`Stage`, or an object which does nothing if the :class:`NullReporter` is in use.
+
+	"""
+	if not _reporter.enabled:
+		return _null_stage
+	return Stage(_reporter, name, total, unit)
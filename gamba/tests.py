@@ -2,6 +2,7 @@
 
 import pandas as pd, numpy as np, math
 from scipy import stats
+import gamba.plotting, gamba.reporting
 
 
 def descriptive_table(measures_table, loud=False, extended=False):
@@ -31,7 +32,7 @@ def descriptive_table(measures_table, loud=False, extended=False):
         stats.iqrs.append(stats.iqr(measures_table[measure].values))
 
     if loud:
-        print("calculating descriptive statistics for LaBrie measures")
+        gamba.reporting.message("calculating descriptive statistics for LaBrie measures")
 
     descriptive_df = pd.DataFrame(columns=["measure", "mean", "std", "median"])
 
@@ -185,7 +186,9 @@ def spearmans_r(measures_table, loud=False):
 
     # now for string manipulation (get the dataframe in a more readable format)
     coef_df.replace(0, "", inplace=True)
-    np.fill_diagonal(coef_df.values, "-")
+    coef_values = coef_df.to_numpy(dtype=object)
+    np.fill_diagonal(coef_values, "-")
+    coef_df = pd.DataFrame(coef_values, columns=labels, index=labels)
 
     p_values = p_df.values
     results_size = len(coef_df.columns)
@@ -236,7 +239,7 @@ def calculate_walker_matrix(measures_tables, labels, measure="frequency", loud=F
     coefs = []
     p_values = []
     if loud:
-        print("num tests:", len(data) * len(data))
+        gamba.reporting.message("num tests:", len(data) * len(data))
     for toprow in data:
         for siderow in data:
             coef, p = stats.ks_2samp(toprow, siderow)
@@ -258,7 +261,9 @@ def calculate_walker_matrix(measures_tables, labels, measure="frequency", loud=F
 
     # now for string manipulation to get the dataframe in a more readable format
     coef_df.replace(0, "", inplace=True)
-    np.fill_diagonal(coef_df.values, "-")
+    coef_values = coef_df.to_numpy(dtype=object)
+    np.fill_diagonal(coef_values, "-")
+    coef_df = pd.DataFrame(coef_values, columns=labels, index=labels)
 
     p_values = p_df.values
     clean_results = np.empty((len(coef_df.columns), len(coef_df.columns)), dtype=object)
@@ -321,9 +326,10 @@ def label_overlap_table(measures_table, labels):
         first_diagonal_values.append(table_entry)
 
     left_side = np.zeros((len(first_diagonal_values), len(first_diagonal_values)))
-    left_side = (pd.DataFrame(left_side)).applymap(str)
+    left_side = left_side.astype(str).astype(object)
 
-    np.fill_diagonal(left_side.values, first_diagonal_values)
+    np.fill_diagonal(left_side, first_diagonal_values)
+    left_side = pd.DataFrame(left_side)
     left_side.index = labels
     left_side.replace("0.0", "-", inplace=True)
 
@@ -391,7 +397,7 @@ def label_overlap_table(measures_table, labels):
             records_meeting_all_labels[label] == 1
         ]
 
-    combination_df = combination_df.applymap(str)
+    combination_df = combination_df.astype(str)
     combination_df.replace("0.0", "-", inplace=True)
 
     combination_df.columns = combination_columns
@@ -454,42 +460,27 @@ def add_tables(t1, t2, same_columns=False):
 # Plotting Functions for the Tests Module
 # =========================================================
 
-import matplotlib.cm as cm
-
 def color_matrix(matrix, cmap):
     """
-    Creates a shaded matrix based on a color map.
+    Creates a shaded matrix based on a color map, from a table of correlation coefficients such as the one returned by :meth:`spearmans_r`.
+    Coefficients marked as significant with a '*' are shaded by their value, the diagonal ('-') is shaded as 1, and empty cells are left white.
 
-    Better docs needed.
-    
-    """
+    Args:
+        matrix (Dataframe): A square table of correlation coefficients, with the same row and column names.
+        cmap (String): The name of the matplotlib color map to use, e.g. 'RdBu'.
+
+    Returns:
+        Matplotlib.pyplot plot object.
 
-    results_size = len(correlations.columns)
-    values = np.empty((results_size, results_size), dtype=object)
-    for r, row in enumerate(correlations.values):
+    """
+    values = np.empty(matrix.shape)
+    for r, row in enumerate(matrix.values):
         for e, element in enumerate(row):
             if element == "-":
-                values[r, e] = 100
-                continue
-            if element == "":
+                values[r, e] = 1
+            elif element == "":
                 values[r, e] = np.nan
-                continue
-            if "*" in str(element):
-                value = element.replace("*", "")
-                values[r, e] = float(value) * 100
             else:
-                values[r, e] = element * 100
-
-    current_cmap = cm.get_cmap(cmap)
-    current_cmap.set_bad(color="white")
-    plt.imshow(np.array(values).astype(np.float), cmap=current_cmap)
-    plt.yticks(range(len(correlations.columns)), list(correlations.columns))
-    plt.xticks(range(len(correlations.columns)), list(correlations.columns))
-    plt.xticks(rotation=90)
-    cbar = plt.colorbar()
-    cbar.set_ticks([-100, -80, -60, -40, -20, 0, 20, 40, 60, 80, 100])
-    cbar.set_ticklabels([-1, -0.8, -0.6, -0.4, -0.2, 0, 0.2, 0.4, 0.6, 0.8, 1])
-    plt.ylabel("test")
-    return plt
-
+                values[r, e] = float(str(element).replace("*", ""))
 
+    return gamba.plotting.plot_color_matrix(values, list(matrix.columns), cmap)
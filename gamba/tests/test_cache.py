@@ -0,0 +1,117 @@
+import pytest
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import datetime
+
+import gamba.cache as gc
+import gamba.measures as gm
+
+
+player_bets = pd.DataFrame()
+player_bets["player_id"] = ["a", "a", "b"]
+player_bets["bet_time"] = [
+    datetime.datetime(2020, 1, 1),
+    datetime.datetime(2020, 1, 3),
+    datetime.datetime(2020, 1, 2),
+]
+player_bets["bet_size"] = [2.0, 3.0, 4.0]
+player_bets["payout_size"] = [0.0, 6.0, 1.0]
+
+
+def test_fingerprint_changes_with_bets():
+    changed_bets = player_bets.copy()
+    changed_bets.loc[2, "bet_size"] = 5.0
+    assert gc.fingerprint(player_bets) == gc.fingerprint(player_bets.copy())
+    assert gc.fingerprint(player_bets) != gc.fingerprint(changed_bets)
+
+
+def test_calculate_measures_cache(tmp_path):
+    cache_dir = str(tmp_path)
+    first = gm.calculate_measures(player_bets, ["duration", "net_loss"], cache=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    second = gm.calculate_measures(player_bets, ["duration", "net_loss"], cache=cache_dir)
+    pd.testing.assert_frame_equal(first, second)
+
+    gm.calculate_measures(player_bets, ["duration", "net_loss"], window=7, cache=cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
+
+    gc.clear_cache(cache_dir)
+    assert len(os.listdir(cache_dir)) == 0
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    gc.store("old", player_bets, cache_dir)
+    os.utime(os.path.join(cache_dir, "old.pkl"), (0, 0))
+    gc.store("new", player_bets, cache_dir, max_size=1.5 * os.path.getsize(os.path.join(cache_dir, "old.pkl")) / 1024 ** 2)
+
+    assert gc.load("old", cache_dir) is None
+    pd.testing.assert_frame_equal(gc.load("new", cache_dir), player_bets)
+
+
+def offset_wagered(total_wagered):
+    return total_wagered + 1
+
+
+@pytest.fixture
+def measure_registry(monkeypatch):
+    # measures are registered in a copy of the registry, so they're gone once the test ends
+    monkeypatch.setattr(gm, "_measure_registry", dict(gm._measure_registry))
+
+
+def test_cache_key_follows_measure_functions(tmp_path, monkeypatch, measure_registry):
+    cache_dir = str(tmp_path)
+    gm.register_measure("transformed_wagered", function=lambda m: np.log(m["total_wagered"]), requires=["total_wagered"])
+    logged = gm.calculate_measures(player_bets, ["transformed_wagered"], cache=cache_dir)
+
+    # the same bytecode calling a different numpy function
+    gm.register_measure("transformed_wagered", function=lambda m: np.sqrt(m["total_wagered"]), requires=["total_wagered"])
+    rooted = gm.calculate_measures(player_bets, ["transformed_wagered"], cache=cache_dir)
+    assert list(logged["transformed_wagered"]) == pytest.approx(list(np.log([5.0, 4.0])))
+    assert list(rooted["transformed_wagered"]) == pytest.approx(list(np.sqrt([5.0, 4.0])))
+
+    # the same function with a different value in its closure
+    def scaled(factor):
+        return lambda m: m["total_wagered"] * factor
+
+    gm.register_measure("transformed_wagered", function=scaled(2), requires=["total_wagered"])
+    assert list(gm.calculate_measures(player_bets, ["transformed_wagered"], cache=cache_dir)["transformed_wagered"]) == [10.0, 8.0]
+    gm.register_measure("transformed_wagered", function=scaled(3), requires=["total_wagered"])
+    assert list(gm.calculate_measures(player_bets, ["transformed_wagered"], cache=cache_dir)["transformed_wagered"]) == [15.0, 12.0]
+
+    # the same function calling a helper which has changed
+    gm.register_measure("transformed_wagered", function=lambda m: offset_wagered(m["total_wagered"]), requires=["total_wagered"])
+    definition = gm._measure_definition("transformed_wagered")
+    monkeypatch.setattr(sys.modules[__name__], "offset_wagered", lambda total_wagered: total_wagered + 2)
+    assert gm._measure_definition("transformed_wagered") != definition
+
+
+weights = np.zeros(2000)
+
+
+class Weights:
+    factor = 2
+
+
+def test_cache_key_hashes_global_values(tmp_path, monkeypatch, measure_registry):
+    cache_dir = str(tmp_path)
+    gm.register_measure("weighted_wagered", function=lambda m: m["total_wagered"] + weights[1000], requires=["total_wagered"])
+    assert list(gm.calculate_measures(player_bets, ["weighted_wagered"], cache=cache_dir)["weighted_wagered"]) == [5.0, 4.0]
+
+    # a change in the middle of a large array, which numpy leaves out of its repr
+    changed_weights = weights.copy()
+    changed_weights[1000] = 1
+    assert repr(changed_weights) == repr(weights)
+    monkeypatch.setattr(sys.modules[__name__], "weights", changed_weights)
+    assert list(gm.calculate_measures(player_bets, ["weighted_wagered"], cache=cache_dir)["weighted_wagered"]) == [6.0, 5.0]
+
+    # other objects can't be described the same way in every session, so their measures aren't cached
+    weighting = Weights()
+    gm.register_measure("weighted_wagered", function=lambda m: m["total_wagered"] * weighting.factor, requires=["total_wagered"])
+    files = sorted(os.listdir(cache_dir))
+    assert list(gm.calculate_measures(player_bets, ["weighted_wagered"], cache=cache_dir)["weighted_wagered"]) == [10.0, 8.0]
+    assert sorted(os.listdir(cache_dir)) == files
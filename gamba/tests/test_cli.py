@@ -0,0 +1,136 @@
+import pytest
+
+import json
+import pandas as pd
+
+import gamba.cli
+import gamba.data as gd
+import gamba.measures as gm
+
+
+all_player_bets = gd.generate_transactions(players=30, daily=True, random_state=0)
+
+
+@pytest.fixture
+def transactions_file(tmp_path):
+    filename = str(tmp_path / "transactions.csv")
+    all_player_bets.to_csv(filename, index=False)
+    return filename
+
+
+def test_measures_pipeline(tmp_path, transactions_file, capsys):
+    out = str(tmp_path / "measures.csv")
+    exit_code = gamba.cli.main(
+        [
+            "measures",
+            "--input", transactions_file,
+            "--study", "labrie",
+            "--out", out,
+            "--top", "total_wagered:90",
+            "--top", "duration",
+            "--clusters", "3",
+            "--reporter", "null",
+        ]
+    )
+    assert exit_code == 0
+
+    measures = pd.read_csv(out)
+    assert len(measures) == 30
+    assert list(measures.columns[-3:]) == ["top_total_wagered", "top_duration", "cluster"]
+    assert set(measures["cluster"]) <= {0, 1, 2}
+    assert measures["top_total_wagered"].sum() == 3
+
+    expected = gm.calculate_measures(all_player_bets, gm.labrie_measure_names(daily=True))
+    assert list(measures.columns[:-3]) == list(expected.columns)
+    assert measures["total_wagered"].values == pytest.approx(expected["total_wagered"].values)
+
+    timings = capsys.readouterr().err.splitlines()
+    assert [line.split()[0] for line in timings] == ["load", "measures", "labels", "clusters", "write", "total"]
+
+
+def test_measures_pipeline_streams_chunks(tmp_path, transactions_file):
+    out = str(tmp_path / "measures.parquet")
+    profile = str(tmp_path / "profile.json")
+    exit_code = gamba.cli.main(
+        [
+            "measures",
+            "--input", transactions_file,
+            "--study", "braverman",
+            "--chunksize", "100",
+            "--out", out,
+            "--profile", profile,
+            "--reporter", "null",
+            "--temp-dir", str(tmp_path),
+        ]
+    )
+    assert exit_code == 0
+
+    measures = pd.read_parquet(out)
+    expected = gm.calculate_measures(all_player_bets, gm.braverman_measure_names(), window=30)
+    assert list(measures.columns) == list(expected.columns)
+    assert list(measures["player_id"]) == list(expected["player_id"])
+    assert measures["net_loss"].values == pytest.approx(expected["net_loss"].values)
+
+    # the temporary binary store is removed once the measures are calculated
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["measures.parquet", "profile.json", "transactions.csv"]
+
+    with open(profile) as json_file:
+        stages = [stage["stage"] for stage in json.load(json_file)["stages"]]
+    assert "load/save_transaction_chunks/convert_store" in stages
+    assert "measures/calculate_measures" in stages
+
+
+def test_measures_pipeline_error(tmp_path, transactions_file, capsys):
+    exit_code = gamba.cli.main(
+        [
+            "measures",
+            "--input", transactions_file,
+            "--study", "labrie",
+            "--out", str(tmp_path / "measures.csv"),
+            "--top", "not_a_measure",
+            "--reporter", "null",
+        ]
+    )
+    assert exit_code == 1
+    assert capsys.readouterr().err.startswith("gamba: error:")
+
+
+def test_measures_pipeline_clusters_braverman(tmp_path, transactions_file):
+    out = str(tmp_path / "measures.csv")
+    exit_code = gamba.cli.main(
+        [
+            "measures",
+            "--input", transactions_file,
+            "--study", "braverman",
+            "--workers", "2",
+            "--out", out,
+            "--top", "duration",
+            "--clusters", "3",
+            "--reporter", "null",
+        ]
+    )
+    assert exit_code == 0
+
+    # players who only bet on one day have no variability, so they have no cluster
+    measures = pd.read_csv(out)
+    missing = measures["variability"].isna()
+    assert missing.any()
+    assert measures.loc[missing, "cluster"].isna().all()
+    assert set(measures.loc[~missing, "cluster"]) <= {0, 1, 2}
+
+
+def test_measures_pipeline_saves_measures_when_clustering_fails(tmp_path, transactions_file, capsys):
+    out = str(tmp_path / "measures.csv")
+    exit_code = gamba.cli.main(
+        [
+            "measures",
+            "--input", transactions_file,
+            "--study", "labrie",
+            "--out", out,
+            "--clusters", "100",
+            "--reporter", "null",
+        ]
+    )
+    assert exit_code == 1
+    assert "without clusters" in capsys.readouterr().err
+    assert len(pd.read_csv(out)) == 30
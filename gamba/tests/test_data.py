@@ -0,0 +1,255 @@
+import pytest
+
+import glob
+import numpy as np
+import pandas as pd
+import datetime
+
+import gamba.data as gd
+
+
+# create some example transactions for two players
+all_player_bets = pd.DataFrame()
+all_player_bets["player_id"] = ["a", "b", "a", "c", "b"]
+all_player_bets["bet_time"] = [
+    datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=x) for x in range(5)
+]
+all_player_bets["bet_size"] = [1.0, 2.0, 3.0, 4.0, 5.0]
+all_player_bets["payout_size"] = [0.0, 4.0, 0.0, 8.0, 0.0]
+
+
+def sort_bets(bets):
+    return bets.sort_values(["player_id", "bet_time"]).reset_index(drop=True)
+
+
+def test_store(tmp_path):
+    pytest.importorskip("pyarrow")
+    savedir = str(tmp_path / "store")
+    gd.save_store(all_player_bets.iloc[:3], savedir, partitions=4)
+    gd.save_store(all_player_bets.iloc[3:], savedir, append=True)
+
+    loaded = gd.load_store(savedir)
+    pd.testing.assert_frame_equal(sort_bets(loaded), sort_bets(all_player_bets))
+
+    subset = gd.load_store(savedir, players=["b"], columns=["bet_size"])
+    assert list(subset.columns) == ["bet_size"]
+    assert sorted(subset["bet_size"]) == [2.0, 5.0]
+
+    categorical_dir = str(tmp_path / "categorical_store")
+    categorical_bets = all_player_bets.astype({"player_id": "category"})
+    gd.save_store(categorical_bets, categorical_dir, partitions=4)
+    for part_file in glob.glob(categorical_dir + "/partition_*/*.parquet"):
+        part_bets = pd.read_parquet(part_file)
+        assert set(part_bets["player_id"].cat.categories) == set(part_bets["player_id"])
+
+
+def test_split_individual_transactions(tmp_path):
+    savedir = str(tmp_path) + "/individuals/"
+    gd.split_individual_transactions(all_player_bets.iloc[:3], savedir)
+    gd.split_individual_transactions(all_player_bets.iloc[3:], savedir, append=True)
+
+    player_a = pd.read_csv(savedir + "a.csv", parse_dates=["bet_time"])
+    player_b = pd.read_csv(savedir + "b.csv", parse_dates=["bet_time"])
+    assert list(player_a["bet_size"]) == [1.0, 3.0]
+    assert list(player_b["bet_size"]) == [2.0, 5.0]
+
+    gd.split_individual_transactions(all_player_bets.iloc[3:], savedir)
+    assert sorted(glob.glob(savedir + "*.csv")) == [savedir + "b.csv", savedir + "c.csv"]
+
+
+def test_load_directory(tmp_path):
+    savedir = str(tmp_path) + "/"
+    gd.split_individual_transactions(all_player_bets, savedir)
+
+    player_files = gd.load_directory(savedir, workers=2)
+    assert [len(player_bets) for player_bets in player_files] == [2, 2, 1]
+
+    all_bets, player_index = gd.load_directory(savedir, workers=2, concatenate=True)
+    pd.testing.assert_frame_equal(all_bets, sort_bets(all_player_bets))
+    assert player_index["b"] == (2, 4)
+
+    table = gd.load_directory(savedir, workers=2, as_table=True)
+    assert list(table.player_ids) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_directory_mixed_files(tmp_path, workers):
+    savedir = str(tmp_path) + "/"
+    (tmp_path / "a.csv").write_text("player_id,bet_time,bet_size,payout_size,bet_count\na,2020-01-01 10:00:00,1.0,0.0,1\na,2020-01-02 10:00:00,2.0,3.0,\n")
+    (tmp_path / "b.csv").write_text("player_id,bet_time,bet_size,payout_size,bet_count\nb,01/03/2020 09:30,4.0,0.0,2\n")
+
+    # each file is read as it would be on its own, whatever the other files in the batch contain
+    player_files = gd.load_directory(savedir, workers=workers)
+    for player_bets in player_files:
+        expected = pd.read_csv(savedir + player_bets["player_id"][0] + ".csv")
+        expected["bet_time"] = pd.to_datetime(expected["bet_time"])
+        pd.testing.assert_frame_equal(player_bets, expected)
+    assert player_files[0]["bet_count"].isna().tolist() == [False, True]
+    assert player_files[1]["bet_time"][0] == pd.Timestamp("2020-01-03 09:30")
+
+    table = gd.load_directory(savedir, workers=workers, as_table=True)
+    assert list(table.player_ids) == ["a", "b"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_empty_directory(tmp_path, workers):
+    savedir = str(tmp_path) + "/"
+    assert gd.load_directory(savedir, workers=workers) == []
+    with pytest.raises(Exception, match="No bets found"):
+        gd.load_directory(savedir, workers=workers, concatenate=True)
+    with pytest.raises(Exception, match="No bets found"):
+        gd.load_directory(savedir, workers=workers, as_table=True)
+
+
+def test_binary_store(tmp_path):
+    savedir = str(tmp_path) + "/binary/"
+    gd.save_binary_store(all_player_bets, savedir)
+
+    table = gd.open_store(savedir)
+    assert list(table.player_ids) == ["a", "b", "c"]
+    assert list(table.player("b")["bet_size"]) == [2.0, 5.0]
+
+    expected = gd.TransactionTable(all_player_bets).to_dataframe()
+    pd.testing.assert_frame_equal(table.to_dataframe(), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("output_format", ["csv", "store", "binary"])
+def test_prepare_braverman_data_in_chunks(tmp_path, output_format):
+    if output_format != "csv":
+        pytest.importorskip("pyarrow")
+    filename = str(tmp_path / "raw.txt")
+    raw_data = all_player_bets.rename(columns={"bet_time": "TimeDATE"})
+    raw_data["bet_count"] = 1
+    raw_data.to_csv(filename, sep="\t", index=False)
+
+    expected = gd.prepare_braverman_data(filename, output=str(tmp_path / "whole.csv"))
+    output = gd.prepare_braverman_data(
+        filename, chunksize=2, output_format=output_format, output=str(tmp_path / "chunked")
+    )
+
+    if output_format == "csv":
+        converted = sort_bets(pd.read_csv(output, parse_dates=["bet_time"]))
+    elif output_format == "store":
+        converted = sort_bets(gd.load_store(output))
+        # the chunks are saved together, so each partition gets a single file
+        partition_dirs = glob.glob(output + "/partition_*")
+        assert len(glob.glob(output + "/partition_*/*.parquet")) == len(partition_dirs)
+    else:
+        # a binary store's players are sorted by player_id, as in a transaction table
+        converted = gd.open_store(output).to_dataframe()
+    pd.testing.assert_frame_equal(converted, sort_bets(expected), check_dtype=False)
+
+    with pytest.raises(Exception, match="compacted"):
+        gd.prepare_braverman_data(filename, chunksize=2, compact=True, output_format=output_format, output=str(tmp_path / "compact"))
+
+
+def test_sort_binary_store(tmp_path):
+    # a table with its players in the reverse of player_id order
+    table = gd.TransactionTable(all_player_bets)
+    order = [2, 1, 0]
+    arrays = {column: np.concatenate([table[column][table.starts[i] : table.stops[i]] for i in order]) for column in table.columns}
+    gd.save_binary_store(gd.TransactionTable.from_arrays(arrays), str(tmp_path / "reversed"))
+    assert list(gd.open_store(str(tmp_path / "reversed")).player_ids) == ["c", "b", "a"]
+
+    # a batch smaller than a player's bets still copies one player at a time
+    gd._sort_binary_store(str(tmp_path / "reversed"), str(tmp_path / "sorted"), batch_rows=1)
+    sorted_table = gd.open_store(str(tmp_path / "sorted"))
+    assert list(sorted_table.player_ids) == ["a", "b", "c"]
+    pd.testing.assert_frame_equal(sorted_table.to_dataframe(), table.to_dataframe(), check_dtype=False)
+
+
+def test_player_index():
+    table = gd.TransactionTable(all_player_bets)
+    assert table.player_index["b"] == (2, 4)
+    assert "d" not in table.player_index
+
+    starts, stops = table.player_index.rows(["c", "a"])
+    assert list(starts) == [4, 0] and list(stops) == [5, 2]
+    assert [len(player) for player in table.players(["c", "a"])] == [1, 2]
+
+    subset = table.select_players(["c", "a"])
+    assert list(subset.player_ids) == ["a", "c"]
+    with pytest.raises(Exception):
+        table.player("d")
+
+
+def test_summarise_dgapp_providers():
+    provider_bets = all_player_bets.copy()
+    provider_bets["provider"] = ["x", "x", "y", "x", "y"]
+    provider_bets["game_type"] = ["roll", "coinflip", "roll", "roll", "other"]
+    provider_bets["block_number"] = [10, 11, 12, 13, 14]
+
+    summary, game_summary = gd.summarise_dgapp_providers(provider_bets, ["x", "y"], per_game=True)
+    assert list(summary["x"]) == [3, 2, 7.0, 12.0, 10, 13, provider_bets["bet_time"][0], provider_bets["bet_time"][3]]
+    assert list(summary["y"].iloc[:6]) == [1, 1, 3.0, 0.0, 12, 12]
+    assert len(game_summary.columns) == 8
+    assert list(game_summary[("x", "roll")].iloc[:4]) == [2, 1, 5.0, 8.0]
+    assert list(game_summary[("y", "coinflip")].iloc[:4]) == [0, 0, 0.0, 0.0]
+
+
+def summarise_providers_one_by_one(player_bets, providers, game_types=["coinflip", "onedice", "twodice", "roll"]):
+    # the original implementation, which selects each provider's bets in turn
+    all_summaries = pd.DataFrame()
+    for provider in providers:
+        provider_bets = player_bets[(player_bets["provider"] == provider) & (player_bets["game_type"].isin(game_types))]
+        all_summaries["values"] = ["Unique Users", "Games", "Bet Value", "Payout Value", "Start Block", "End Block", "Start Time", "End Time"]
+        all_summaries[provider] = [
+            len(set(provider_bets["player_id"].values)),
+            len(set(provider_bets["game_type"].values)),
+            provider_bets["bet_size"].sum(),
+            provider_bets["payout_size"].sum(),
+            int(provider_bets["block_number"].min()),
+            int(provider_bets["block_number"].max()),
+            provider_bets["bet_time"].min(),
+            provider_bets["bet_time"].max(),
+        ]
+    all_summaries.set_index("values", inplace=True)
+    return all_summaries
+
+
+def test_summarise_dgapp_providers_matches_one_by_one():
+    rng = np.random.default_rng(0)
+    bets = 20000
+    provider_bets = pd.DataFrame(
+        {
+            "player_id": rng.integers(0, 500, bets).astype(str),
+            "bet_time": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 10 ** 7, bets), unit="s"),
+            "bet_size": rng.random(bets) * np.exp(rng.normal(0, 5, bets)),
+            "payout_size": rng.random(bets),
+            "provider": rng.choice(["x", "y", "z"], bets),
+            "game_type": rng.choice(["roll", "coinflip", "onedice", "other"], bets),
+            "block_number": rng.integers(0, 10 ** 6, bets),
+        }
+    )
+    summary = gd.summarise_dgapp_providers(provider_bets, ["x", "y", "z", "none"])
+    pd.testing.assert_frame_equal(summary[["x", "y", "z"]], summarise_providers_one_by_one(provider_bets, ["x", "y", "z"]))
+    assert list(summary["none"].iloc[:4]) == [0, 0, 0.0, 0.0]
+
+
+def test_generate_transactions(tmp_path):
+    transactions = gd.generate_transactions(players=20, random_state=0, chunksize=7)
+    assert list(transactions.columns) == ["player_id", "bet_time", "bet_size", "payout_size"]
+    assert transactions["player_id"].nunique() == 20
+    pd.testing.assert_frame_equal(sort_bets(transactions), transactions)
+
+    output = gd.generate_transactions(players=20, random_state=0, chunksize=7, output=str(tmp_path / "bets.csv"))
+    saved = pd.read_csv(output, parse_dates=["bet_time"])
+    pd.testing.assert_series_equal(saved["bet_size"], transactions["bet_size"])
+
+    daily = gd.generate_transactions(players=20, daily=True, random_state=1)
+    assert list(daily.columns) == ["player_id", "bet_time", "bet_size", "payout_size", "bet_count"]
+    assert (daily["bet_count"] >= 1).all()
+    assert not daily.duplicated(["player_id", "bet_time"]).any()
+
+
+def test_generate_transactions_same_for_any_chunksize(tmp_path):
+    transactions = gd.generate_transactions(players=2500, career_length=5, random_state=0, chunksize=100)
+    pd.testing.assert_frame_equal(gd.generate_transactions(players=2500, career_length=5, random_state=0, chunksize=2000), transactions)
+    assert not transactions.equals(gd.generate_transactions(players=2500, career_length=5, random_state=1, chunksize=100))
+
+
+def test_transaction_table_sorts_categories_by_id():
+    categorical_bets = all_player_bets.copy()
+    categorical_bets["player_id"] = pd.Categorical(categorical_bets["player_id"], categories=["c", "b", "a"])
+    table = gd.TransactionTable(categorical_bets)
+    assert list(table.player_ids) == ["a", "b", "c"]
@@ -0,0 +1,73 @@
+import pytest
+
+import os
+import sys
+import json
+import subprocess
+
+import gamba
+
+
+# the longest 'import gamba' should take on its own, in seconds
+import_time_budget = 0.5
+
+# modules which should only be imported once a method that needs them is used
+heavy_modules = ["pandas", "matplotlib", "sklearn", "statsmodels", "scipy", "gamba.data"]
+
+
+def _run_python(code):
+    repository = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=repository,
+    )
+
+
+def test_import_is_fast_and_quiet():
+    result = _run_python(
+        "import time, sys, json\n"
+        "start = time.perf_counter()\n"
+        "import gamba\n"
+        "duration = time.perf_counter() - start\n"
+        "sys.stderr.write(json.dumps([duration, sorted(sys.modules)]))\n"
+    )
+    duration, modules = json.loads(result.stderr)
+
+    assert result.stdout == ""
+    assert duration < import_time_budget
+    for module in heavy_modules:
+        assert module not in modules
+
+
+def test_command_line_help_is_light():
+    result = _run_python(
+        "import sys, json\n"
+        "import gamba.cli\n"
+        "try:\n"
+        "    gamba.cli.main(['measures', '--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "sys.stderr.write(json.dumps(sorted(sys.modules)))\n"
+    )
+    modules = json.loads(result.stderr)
+
+    assert "--clusters" in result.stdout
+    for module in heavy_modules:
+        assert module not in modules
+
+
+def test_lazy_names():
+    import gamba.data as gd
+    import gamba.labels as gl
+
+    assert gamba.read_csv is gd.read_csv
+    assert gamba.top_split is gl.top_split
+    assert gamba.data is gd
+    assert "calculate_labrie_measures" in dir(gamba)
+    assert set(gamba.__all__) <= set(dir(gamba))
+
+    with pytest.raises(AttributeError):
+        gamba.not_a_method
@@ -1,9 +1,12 @@
 import pytest
 
+import numpy as np
 import pandas as pd
 import datetime
 
 import gamba.measures as gb
+import gamba.profiling
+from gamba.data import TransactionTable, compact_transactions
 
 
 # create some example data to compute measures on for testing
@@ -106,3 +109,267 @@ def test_trajectory_daily():
 
 
 
+
+
+# ==========================================
+
+# test collections of measures for multiple players
+
+# ==========================================
+
+other_player_bets = pd.DataFrame()
+other_player_bets["player_id"] = ["other_player"] * 3
+other_player_bets["bet_time"] = [
+    datetime.datetime(2020, 1, 1, 9),
+    datetime.datetime(2020, 1, 1, 18),
+    datetime.datetime(2020, 1, 5, 12),
+]
+other_player_bets["bet_size"] = [5, 1, 2]
+other_player_bets["payout_size"] = [0, 2, 0]
+other_player_bets["bet_count"] = [3, 1, 2]
+
+all_player_bets = pd.concat([other_player_bets, player_bets_daily], ignore_index=True)
+
+
+@pytest.mark.parametrize("daily", [True, False])
+def test_calculate_labrie_measures(tmp_path, daily):
+    measures = gb.calculate_labrie_measures(
+        all_player_bets.sample(frac=1, random_state=1), savedir=str(tmp_path) + "/", daily=daily
+    )
+    assert list(measures["player_id"]) == ["other_player", "test_player"]
+
+    for bets, row in zip([other_player_bets, player_bets_daily], measures.itertuples()):
+        assert row.duration == gb.duration(bets.copy())
+        assert row.frequency == pytest.approx(gb.frequency(bets.copy()))
+        assert row.total_wagered == gb.total_wagered(bets)
+        assert row.net_loss == gb.net_loss(bets)
+        assert row.percent_loss == pytest.approx(gb.percent_loss(bets))
+        if daily:
+            assert row.num_bets == gb.number_of_bets_daily(bets)
+            assert row.average_bets_per_day == pytest.approx(gb.average_bets_per_day_daily(bets.copy()))
+            assert row.average_bet_size == pytest.approx(gb.average_bet_size_daily(bets))
+        else:
+            assert row.num_bets == gb.number_of_bets(bets)
+            assert row.average_bets_per_day == pytest.approx(gb.average_bets_per_day(bets.copy()))
+            assert row.average_bet_size == pytest.approx(gb.average_bet_size(bets))
+
+
+def test_duration_batch():
+    values = gb.duration_batch(all_player_bets)
+    assert values["other_player"] == 5
+    assert values["test_player"] == 4
+
+
+def test_frequency_batch():
+    values = gb.frequency_batch(all_player_bets)
+    assert values["other_player"] == 40
+    assert values["test_player"] == 100
+
+
+def test_calculate_braverman_measures(tmp_path):
+    measures = gb.calculate_braverman_measures(all_player_bets, savedir=str(tmp_path) + "/")
+    test_player = measures.set_index("player_id").loc["test_player"]
+    assert test_player["intensity"] == gb.intensity_daily(player_bets_daily)
+    assert test_player["frequency"] == gb.frequency_daily(player_bets_daily)
+    assert test_player["variability"] == pytest.approx(gb.variability_daily(player_bets_daily))
+    assert test_player["trajectory"] == pytest.approx(gb.trajectory_daily(player_bets_daily))
+    assert test_player["duration"] == 4
+    assert test_player["net_loss"] == -1
+
+
+def test_register_measure(monkeypatch):
+    # measures are registered in a copy of the registry, so they're gone once the test ends
+    monkeypatch.setattr(gb, "_measure_registry", dict(gb._measure_registry))
+    gb.register_measure("largest_bet", reduction="max", column="bet_size")
+    gb.register_measure(
+        "largest_bet_share",
+        function=lambda m: m["largest_bet"] / m["total_wagered"],
+        requires=["largest_bet", "total_wagered"],
+    )
+    measures = gb.calculate_measures(all_player_bets, ["largest_bet", "largest_bet_share"])
+    assert list(measures["largest_bet"]) == [5, 4]
+    assert list(measures["largest_bet_share"]) == [5 / 8, 4 / 11]
+
+
+def test_calculate_measures_workers():
+    names = ["duration", "frequency", "total_wagered", "variability_daily"]
+    serial = gb.calculate_measures(all_player_bets, names)
+    parallel = gb.calculate_measures(all_player_bets, names, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    table = TransactionTable(all_player_bets)
+    pd.testing.assert_frame_equal(serial, gb.calculate_measures(table, names))
+    pd.testing.assert_frame_equal(serial, gb.calculate_measures(table, names, workers=2))
+
+
+def test_measure_accumulator(tmp_path):
+    accumulator = gb.MeasureAccumulator()
+    accumulator.update(all_player_bets.iloc[:4])
+    accumulator.save(str(tmp_path / "state.pkl"))
+
+    accumulator = gb.MeasureAccumulator.load(str(tmp_path / "state.pkl"))
+    accumulator.update(all_player_bets.iloc[4:])
+
+    expected = gb.calculate_labrie_measures(all_player_bets, savedir=str(tmp_path) + "/")
+    pd.testing.assert_frame_equal(accumulator.labrie_measures(), expected, check_dtype=False)
+
+
+def test_measure_accumulator_state_size(tmp_path):
+    # two players betting once a day across the same 100 days, added in batches with the last days first
+    days = [datetime.datetime(2020, 1, 1) + datetime.timedelta(days=day) for day in range(100)]
+    bets = pd.DataFrame(
+        {
+            "player_id": ["a"] * 100 + ["b"] * 100,
+            "bet_time": days + days,
+            "bet_size": 1.0,
+            "payout_size": 0.0,
+        }
+    )
+    first_and_last = bets["bet_time"].isin([days[0], days[-1]])
+    batches = [bets[~first_and_last & (bets["bet_time"].dt.day % 10 == remainder)] for remainder in range(9, -1, -1)]
+
+    accumulator = gb.MeasureAccumulator()
+    accumulator.update(bets[first_and_last])
+    state_size = sum(bitmap.nbytes for _, bitmap in accumulator._betting_days.values())
+    for batch in batches:
+        accumulator.update(batch)
+        assert sum(bitmap.nbytes for _, bitmap in accumulator._betting_days.values()) == state_size
+
+    expected = gb.calculate_labrie_measures(bets, savedir=str(tmp_path) + "/", daily=False)
+    pd.testing.assert_frame_equal(accumulator.labrie_measures(), expected, check_dtype=False)
+
+    # the days before a player's first known day are added at the start of their bitmap
+    accumulator = gb.MeasureAccumulator()
+    for week in range(14, -1, -1):
+        accumulator.update(bets[(bets["bet_time"] - days[0]).dt.days // 7 == week])
+    pd.testing.assert_frame_equal(accumulator.labrie_measures(), expected, check_dtype=False)
+
+
+def test_calculate_labrie_measures_chunked(tmp_path):
+    all_player_bets.to_csv(tmp_path / "bets.csv", index=False)
+    measures = gb.calculate_labrie_measures_chunked(
+        str(tmp_path / "bets.csv"), savedir=str(tmp_path) + "/", chunksize=2
+    )
+    expected = gb.calculate_labrie_measures(all_player_bets, savedir=str(tmp_path) + "/")
+    pd.testing.assert_frame_equal(measures, expected, check_dtype=False)
+
+
+def test_trajectory_daily_batch():
+    values = gb.trajectory_daily_batch(all_player_bets)
+    assert values["test_player"] == pytest.approx(gb.trajectory_daily(player_bets_daily))
+    assert values["other_player"] == pytest.approx(-1.5)
+
+
+@pytest.mark.parametrize("window", [1, 2, 30])
+def test_calculate_first_window_measures(window):
+    measures = gb.calculate_first_window_measures(all_player_bets, window=window)
+    test_player = measures.set_index("player_id").loc["test_player"]
+    assert test_player["intensity"] == gb.intensity_daily(player_bets_daily, window=window)
+    assert test_player["frequency"] == gb.frequency_daily(player_bets_daily, window=window)
+
+
+def test_measures_do_not_change_player_bets():
+    shuffled_bets = player_bets_daily.sample(frac=1, random_state=2)
+    unchanged_bets = shuffled_bets.copy()
+    for measure in [gb.duration, gb.frequency, gb.average_bets_per_day_daily, gb.percent_loss]:
+        measure(shuffled_bets)
+    pd.testing.assert_frame_equal(shuffled_bets, unchanged_bets)
+
+
+@pytest.mark.parametrize(
+    "measure",
+    [
+        gb.duration,
+        gb.frequency,
+        gb.number_of_bets,
+        gb.average_bets_per_day,
+        gb.average_bet_size,
+        gb.total_wagered,
+        gb.net_loss,
+        gb.percent_loss,
+        gb.number_of_bets_daily,
+        gb.average_bets_per_day_daily,
+        gb.average_bet_size_daily,
+        gb.intensity_daily,
+        gb.frequency_daily,
+        gb.variability_daily,
+        gb.trajectory_daily,
+    ],
+)
+def test_measures_accept_transaction_table(measure):
+    table = TransactionTable(all_player_bets)
+    value = measure(table.player("test_player"))
+    assert value == pytest.approx(measure(player_bets_daily))
+
+
+def test_measures_on_compact_transactions(tmp_path):
+    compact_bets = compact_transactions(all_player_bets, loud=False)
+    assert compact_bets["player_id"].dtype == "category"
+    assert compact_bets["bet_size"].dtype == "float32"
+
+    savedir = str(tmp_path) + "/"
+    pd.testing.assert_frame_equal(
+        gb.calculate_labrie_measures(compact_bets, savedir=savedir),
+        gb.calculate_labrie_measures(all_player_bets, savedir=savedir),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        gb.calculate_braverman_measures(compact_bets, savedir=savedir),
+        gb.calculate_braverman_measures(all_player_bets, savedir=savedir),
+        check_dtype=False,
+    )
+    compact_player_bets = compact_bets[compact_bets["player_id"] == "test_player"]
+    assert gb.intensity_daily(compact_player_bets) == gb.intensity_daily(player_bets_daily)
+
+
+def test_calculate_measures_for_some_players():
+    names = ["duration", "total_wagered"]
+    expected = gb.calculate_measures(all_player_bets, names).iloc[1:].reset_index(drop=True)
+    table = TransactionTable(all_player_bets)
+    pd.testing.assert_frame_equal(gb.calculate_measures(table, names, players=["test_player"]), expected)
+    pd.testing.assert_frame_equal(gb.calculate_measures(all_player_bets, names, players=["test_player"]), expected)
+
+
+def test_measures_of_no_bets(tmp_path):
+    no_bets = all_player_bets.iloc[:0]
+    table = TransactionTable(no_bets)
+    assert len(table.starts) == len(table.stops) == 0
+
+    labrie = gb.calculate_labrie_measures(no_bets, savedir=str(tmp_path) + "/", daily=False)
+    assert len(labrie) == 0
+    assert "duration" in labrie.columns
+    assert len(gb.calculate_braverman_measures(table, savedir=str(tmp_path) + "/")) == 0
+
+
+def test_calculate_measures_workers_keep_table_order():
+    names = ["duration", "total_wagered"]
+    # a table whose players are not in player_id order, as in a binary store
+    sorted_table = TransactionTable(all_player_bets)
+    order = [1, 0]
+    arrays = {column: np.concatenate([sorted_table[column][sorted_table.starts[i] : sorted_table.stops[i]] for i in order]) for column in sorted_table.columns}
+    table = TransactionTable.from_arrays(arrays)
+    assert list(table.player_ids) == list(sorted_table.player_ids[order])
+
+    serial = gb.calculate_measures(table, names)
+    assert list(serial["player_id"]) == list(table.player_ids)
+    pd.testing.assert_frame_equal(serial, gb.calculate_measures(table, names, workers=2))
+
+
+def test_calculate_measures_workers_with_no_bets():
+    measures = gb.calculate_measures(all_player_bets.iloc[:0], ["duration", "total_wagered"], workers=2)
+    assert list(measures.columns) == ["player_id", "duration", "total_wagered"]
+    assert len(measures) == 0
+
+
+def test_calculate_labrie_measures_chunked_keeps_profile_memory(tmp_path):
+    all_player_bets.to_csv(tmp_path / "bets.csv", index=False)
+    with gamba.profiling.profile(memory=True) as profiler:
+        with gamba.profiling.stage("outer"):
+            # allocated before the chunked measures, so it must stay in the outer stage's peak
+            allocated = np.ones(2 ** 22)
+            del allocated
+            gb.calculate_labrie_measures_chunked(
+                str(tmp_path / "bets.csv"), savedir=str(tmp_path) + "/", chunksize=2, loud=True, trace_memory=True
+            )
+    assert profiler.stages["outer"]["peak_memory"] >= 32
+    assert profiler.stages["outer/calculate_labrie_measures_chunked/chunks"]["calls"] == 1
@@ -0,0 +1,109 @@
+import pytest
+
+import os
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+
+import gamba.data as gd
+import gamba.measures as gm
+import gamba.tests as gt
+import gamba.machine_learning as gml
+import gamba.plotting as gp
+
+
+measures_table = gd.dummy_measures_table(50)
+
+
+@pytest.fixture(autouse=True)
+def close_figures():
+    yield
+    gp.pyplot().close("all")
+
+
+def test_compute_modules_do_not_import_matplotlib():
+    environment = {name: value for name, value in os.environ.items() if name not in ["DISPLAY", "WAYLAND_DISPLAY", "MPLBACKEND"]}
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, gamba.data, gamba.measures, gamba.tests, gamba.machine_learning\n"
+            "assert not [name for name in sys.modules if name.startswith('matplotlib')]\n"
+            "import gamba.plotting\n"
+            "print(gamba.plotting.pyplot().get_backend())\n",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+    )
+    assert result.stdout.strip().lower() == "agg"
+
+
+def test_measure_centiles():
+    values = measures_table["duration"].values
+    for top_heavy in [False, True]:
+        centiles, centile_values = gm.measure_centiles(measures_table, "duration", top_heavy=top_heavy)
+
+        previous_cutoff = 0
+        for centile, centile_value in zip(centiles, centile_values):
+            cutoff = np.percentile(values, centile)
+            group = values[(values >= previous_cutoff) & (values < cutoff)]
+            previous_cutoff = cutoff
+            assert centile_value == pytest.approx(group.mean() if len(group) > 0 else 0)
+
+    assert len(gm.measure_centiles(measures_table, "duration")[0]) == 100
+    assert len(gm.measure_centiles(measures_table, "duration", top_heavy=True)[0]) == 24
+
+
+def test_plot_player_career(tmp_path):
+    player_bets = gd.generate_transactions(players=1, career_length=10, random_state=0)
+    savename = str(tmp_path / "career.png")
+    gd.plot_player_career(gd.TransactionTable(player_bets), savename=savename)
+    assert os.path.exists(savename)
+
+    plot = gd.plot_player_career_split(player_bets)
+    cumulative_bets = plot.gca().get_lines()[-2].get_ydata()
+    assert cumulative_bets[-1] == pytest.approx(-player_bets["bet_size"].sum())
+
+
+def test_plot_measures():
+    gm.plot_measure_hist(measures_table, "frequency")
+    gm.plot_measure_centile(measures_table, "frequency", top_heavy=True)
+    gm.plot_measure_pair_plot(measures_table[["player_ids", "duration", "frequency"]], thermal=True, figsize=(4, 4))
+    gm.plot_player_radar([0.5, -0.5, 0.2])
+
+
+def test_plot_tests_and_clusters():
+    gt.color_matrix(gt.spearmans_r(measures_table[["player_ids", "duration", "frequency", "num_bets"]]), "RdBu")
+
+    from sklearn.cluster import AgglomerativeClustering
+
+    model = AgglomerativeClustering(distance_threshold=0, n_clusters=None)
+    model.fit(measures_table[["duration", "frequency"]].values)
+    linkage = gml.linkage_matrix(model)
+    assert linkage.shape == (len(measures_table) - 1, 4)
+    assert linkage[-1, 3] == len(measures_table)
+
+    gml.plot_agglomeration_dendrogram(model, dt_cutoff=1)
+    gp.plot_cluster_sizes(np.array([0, 1, 1, 2]), title="clusters")
+
+
+def test_pyplot_applies_style_once(monkeypatch):
+    plt = gp.pyplot()
+    styles = []
+    monkeypatch.setattr(plt.style, "use", styles.append)
+    monkeypatch.setattr(gp, "_pyplot", None)
+    monkeypatch.setattr(gp, "_style_file", os.path.join("missing", "gamba.mplstyle"))
+
+    # a missing style is not applied
+    monkeypatch.setattr(plt.style, "available", [])
+    assert gp.pyplot() is plt
+    assert styles == []
+
+    monkeypatch.setattr(gp, "_pyplot", None)
+    monkeypatch.setattr(plt.style, "available", ["gamba"])
+    gp.pyplot()
+    gp.pyplot()
+    assert styles == ["gamba"]
@@ -0,0 +1,57 @@
+import pytest
+
+import json
+import numpy as np
+import pandas as pd
+
+import gamba
+import gamba.data as gd
+import gamba.measures as gm
+import gamba.profiling as gp
+
+
+all_player_bets = gd.generate_transactions(players=20, daily=True, random_state=0)
+
+
+def test_profile_measures(tmp_path):
+    filename = str(tmp_path / "profile.json")
+    with gamba.profile(filename) as profiler:
+        gm.calculate_labrie_measures(all_player_bets, savedir=str(tmp_path) + "/")
+        gm.calculate_labrie_measures(all_player_bets, savedir=str(tmp_path) + "/")
+
+    results = profiler.to_dataframe()
+    stages = list(results["stage"])
+    assert stages[:3] == [
+        "calculate_labrie_measures",
+        "calculate_labrie_measures/calculate_measures",
+        "calculate_labrie_measures/calculate_measures/sort",
+    ]
+    assert "calculate_labrie_measures/calculate_measures/measure:net_loss" in stages
+    assert "calculate_labrie_measures/to_csv" in stages
+    assert (results["calls"] == 2).all()
+    assert (results["peak_memory"] > 0).all()
+
+    total = results.set_index("stage").loc["calculate_labrie_measures"]
+    assert total["time"] <= profiler.total_time
+    assert total["peak_memory"] >= results["peak_memory"].max()
+
+    with open(filename) as json_file:
+        report = json.load(json_file)
+    assert [stage["stage"] for stage in report["stages"]] == stages
+
+
+def test_profile_without_memory():
+    with gamba.profile(memory=False) as profiler:
+        gd.compact_transactions(all_player_bets, loud=False)
+    results = profiler.to_dataframe()
+    assert list(results["stage"]) == ["compact_transactions"]
+    assert results["peak_memory"].isna().all()
+
+
+def test_stages_do_nothing_outside_profile():
+    with gp.stage("unused"):
+        pass
+
+    with gamba.profile() as profiler:
+        pass
+    assert len(profiler.to_dataframe()) == 0
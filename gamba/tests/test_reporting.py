@@ -0,0 +1,104 @@
+import pytest
+
+import json
+import logging
+import concurrent.futures
+import multiprocessing
+import pandas as pd
+import datetime
+
+import gamba
+import gamba.data as gd
+import gamba.measures as gm
+import gamba.reporting as gr
+
+
+all_player_bets = pd.DataFrame()
+all_player_bets["player_id"] = ["a", "b", "a", "c", "b"]
+all_player_bets["bet_time"] = [
+    datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=x) for x in range(5)
+]
+all_player_bets["bet_size"] = [1.0, 2.0, 3.0, 4.0, 5.0]
+all_player_bets["payout_size"] = [0.0, 4.0, 0.0, 8.0, 0.0]
+
+
+def test_json_lines_reporter(tmp_path):
+    events_file = str(tmp_path / "events.jsonl")
+    with gamba.report_to(events_file):
+        gd.split_individual_transactions(all_player_bets, str(tmp_path) + "/individuals/")
+
+    events = pd.read_json(events_file, lines=True)
+    split_events = events[events["stage"] == "split_individual_transactions"]
+    assert list(split_events["event"]) == ["start", "progress", "end"]
+
+    end = split_events.iloc[-1]
+    assert end["done"] == end["total"] == 3
+    assert end["players"] == 3
+    assert end["rows"] == 5
+    assert end["players_per_second"] > 0
+    assert "extracting individual transactions for 3 players..." in list(events["message"])
+
+
+def test_callback_reporter():
+    events = []
+    with gamba.report_to(events.append):
+        gm.calculate_measures(all_player_bets, ["duration", "net_loss"])
+
+    assert [event["event"] for event in events] == ["start", "end"]
+    assert events[-1]["stage"] == "calculate_measures"
+    assert events[-1]["done"] == 2
+    assert events[-1]["rows"] == 5
+    assert events[-1]["players"] == 3
+    assert gr.get_reporter() is not events.append
+
+
+def test_null_reporter(tmp_path, capsys):
+    with gamba.report_to("null"):
+        assert gr.stage("unused") is gr.stage("also unused")
+        gd.split_individual_transactions(all_player_bets, str(tmp_path) + "/individuals/")
+        gd.compact_transactions(all_player_bets, loud=True)
+
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == ""
+
+
+def test_logging_reporter(caplog):
+    with caplog.at_level(logging.INFO, logger="gamba"):
+        with gamba.report_to("logging"):
+            with gr.stage("example", total=4, unit="files") as progress:
+                for _ in range(4):
+                    progress.update(rows=10)
+            gr.message("example", "finished")
+
+    assert caplog.messages[0] == "example started"
+    assert caplog.messages[1].startswith("example: 4/4 files (")
+    assert caplog.messages[2].startswith("example finished in ")
+    assert caplog.messages[3] == "example finished"
+
+
+def test_set_reporter():
+    with pytest.raises(Exception):
+        gamba.set_reporter("not a reporter")
+
+    previous = gamba.set_reporter("null")
+    try:
+        assert isinstance(gr.get_reporter(), gr.NullReporter)
+    finally:
+        gamba.set_reporter(previous)
+    assert gr.get_reporter() is previous
+
+
+def test_worker_options(tmp_path):
+    spawn = multiprocessing.get_context("spawn")
+    events_file = str(tmp_path / "events.jsonl")
+    for reporter, expected in [("null", gr.NullReporter), ("tqdm", gr.NullReporter), ("logging", gr.LoggingReporter), (events_file, gr.JsonLinesReporter), (lambda event: None, gr.NullReporter)]:
+        with gamba.report_to(reporter):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn, **gr.worker_options()) as executor:
+                assert isinstance(executor.submit(gr.get_reporter).result(), expected)
+
+    # workers append their events to the same file as the main process
+    with gamba.report_to(events_file):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn, **gr.worker_options()) as executor:
+            executor.submit(gr.message, "from a worker").result()
+    assert "from a worker" in list(pd.read_json(events_file, lines=True)["message"])
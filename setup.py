@@ -25,15 +25,21 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/gamba-dev/gamba",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks"]),
     project_urls=PROJECT_URLS,
     classifiers=CLASSIFIERS,
-    python_requires='>=3.8',
+    python_requires='>=3.9',
     zip_safe=False,
 
+    entry_points={
+        "console_scripts": [
+            "gamba = gamba.cli:main",
+        ],
+    },
+
     install_requires=[
-        "pandas >= 1.0.3",
-        "matplotlib >= 3.2.1",
+        "pandas >= 1.1.0",
+        "matplotlib >= 3.5.0",
         "scikit-learn >= 0.23.0",
         "statsmodels >= 0.11.1",
         "tqdm >= 4.48.2",
@@ -43,6 +49,9 @@ setuptools.setup(
         "dev" : [
             "pytest >= 3.7",
       ],
+        "store" : [
+            "pyarrow >= 1.0.0",
+      ],
 
     },
 )